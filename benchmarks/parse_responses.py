@@ -0,0 +1,100 @@
+"""Compares validating large list responses with building them unvalidated.
+
+Run from the repository root, so ``prosper_api`` is importable from the checkout:
+
+    poetry run python benchmarks/parse_responses.py [--rows 2000] [--repeat 5]
+
+or, outside the Poetry environment:
+
+    PYTHONPATH=. python benchmarks/parse_responses.py [--rows 2000] [--repeat 5]
+
+Each response is a page of ``--rows`` copies of the first result in the matching
+test fixture. "strict" is what the clients do by default, ``model_validate_json``.
+"trusted" is the opt-in ``prosper-api.parsing.trusted`` mode: simplejson decodes
+amounts straight to ``Decimal``, then each model is filled in with
+``model_construct``, converting only what the API doesn't send as the declared type:
+enums, nested models, whole-number amounts, and numbers sent as strings. "decode"
+only decodes the JSON with the standard library, without building any models; no
+unvalidated build can beat it.
+
+With pydantic 2, validation happens in pydantic-core, so "strict" costs little more
+than "decode". Most of the time goes to building the ``Decimal`` amounts, which both
+modes have to do, and the pure-Python "trusted" build comes out slower. That's why
+trusted parsing is off by default; check it against this benchmark before enabling
+it.
+"""
+import argparse
+import json
+from pathlib import Path
+from timeit import repeat
+from typing import Any, Callable
+
+from prosper_api.models import (
+    ListLoansResponse,
+    ListNotesResponse,
+    ListPaymentsResponse,
+    SearchListingsResponse,
+)
+from prosper_api.projection import parse_response
+
+_DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+_RESPONSES = {
+    "search_listings_response": SearchListingsResponse,
+    "list_notes_response": ListNotesResponse,
+    "list_loans_response": ListLoansResponse,
+    "list_payments_response": ListPaymentsResponse,
+}
+
+
+def _page(fixture: str, rows: int) -> str:
+    response = json.loads((_DATA_DIR / f"{fixture}.json").read_text())
+    return json.dumps(
+        {
+            "result": response["result"][:1] * rows,
+            "result_count": rows,
+            "total_count": rows,
+        }
+    )
+
+
+def _best_of(fn: Callable[[], Any], number: int, times: int) -> float:
+    return min(repeat(fn, number=number, repeat=times)) / number
+
+
+def main():
+    """Prints the time taken to parse a page of each response type."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'response':<26}{'strict':>10}{'trusted':>10}{'decode':>10}{'speedup':>10}")
+    for fixture, response_type in _RESPONSES.items():
+        page = _page(fixture, args.rows)
+        # Bound as defaults so each lambda times this iteration's response.
+        strict = _best_of(
+            lambda response_type=response_type, page=page: (
+                response_type.model_validate_json(page)
+            ),
+            3,
+            args.repeat,
+        )
+        trusted = _best_of(
+            lambda response_type=response_type, page=page: parse_response(
+                response_type, page, trusted=True
+            ),
+            3,
+            args.repeat,
+        )
+        decode = _best_of(lambda page=page: json.loads(page), 3, args.repeat)
+        assert parse_response(response_type, page, trusted=True) == (
+            response_type.model_validate_json(page)
+        )
+        print(
+            f"{fixture:<26}{strict * 1000:>8.1f}ms{trusted * 1000:>8.1f}ms"
+            f"{decode * 1000:>8.1f}ms{strict / trusted:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
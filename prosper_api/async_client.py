@@ -0,0 +1,1194 @@
+"""Asyncio client for Prosper.com APIs.
+
+Mirrors ``prosper_api.client.Client`` for use inside an event loop. Requires the
+``httpx`` package, which is installed with the '[async]' extra.
+"""
+import logging
+from decimal import Decimal
+from itertools import count
+from types import TracebackType
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+)
+
+import simplejson
+from backoff import expo, on_exception
+from prosper_shared.omni_config import Config
+
+from prosper_api.auth_token_manager import (
+    AsyncAuthTokenManager,
+    _refresh_margin_from_config,
+)
+from prosper_api.batch import ListingBatch
+from prosper_api.cache import ResponseCache, _request_key
+from prosper_api.client import (
+    _DEFAULT_CHUNK_MAX_TRIES,
+    _BaseClient,
+    _chunk_loan_numbers,
+    _is_client_error,
+    _list_payments_params,
+    _listing_key,
+    _loan_key,
+    _note_key,
+    _order_key,
+    _order_payload,
+    _payment_key,
+    _sort_and_page_params,
+)
+from prosper_api.models import (
+    Account,
+    Listing,
+    ListLoansRequest,
+    ListLoansResponse,
+    ListNotesRequest,
+    ListNotesResponse,
+    ListOrdersRequest,
+    ListOrdersResponse,
+    ListPaymentsRequest,
+    ListPaymentsResponse,
+    Loan,
+    Note,
+    Order,
+    Payment,
+    SearchListingsRequest,
+    SearchListingsResponse,
+)
+from prosper_api.pagination import (
+    fetch_all_async,
+    map_unordered_async,
+    paginate_async,
+)
+from prosper_api.projection import _trusted_parsing_from_config
+from prosper_api.query import SearchListingsQuery, _search_listings_params
+from prosper_api.rate_limit import (
+    RateLimiter,
+    _max_retries_from_config,
+    shared_rate_limiter,
+)
+from prosper_api.scheduler import PriorityScheduler, RequestPriority
+from prosper_api.session import (
+    _CONNECTION_LIFETIME_CONFIG_PATH,
+    _DEFAULT_CONNECTION_LIFETIME,
+    _DEFAULT_POOL_MAXSIZE,
+    _POOL_MAXSIZE_CONFIG_PATH,
+)
+from prosper_api.single_flight import SingleFlight
+from prosper_api.streaming import stream_results_async
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _create_async_session(config: Config) -> "httpx.AsyncClient":
+    import httpx  # noqa: autoimport
+
+    pool_maxsize = int(
+        config.get_as_decimal(_POOL_MAXSIZE_CONFIG_PATH, Decimal(_DEFAULT_POOL_MAXSIZE))
+    )
+    connection_lifetime = float(
+        config.get_as_decimal(
+            _CONNECTION_LIFETIME_CONFIG_PATH, Decimal(_DEFAULT_CONNECTION_LIFETIME)
+        )
+    )
+    # httpx has no hard connection lifetime; the closest equivalent is to expire
+    # connections that have been idle for that long.
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_maxsize,
+            max_keepalive_connections=pool_maxsize,
+            keepalive_expiry=connection_lifetime if connection_lifetime else None,
+        )
+    )
+
+
+def _encode_query_params(params: dict) -> dict:
+    # Match how `requests` encodes query values: drop `None` and stringify the rest.
+    return {
+        k: [str(i) for i in v] if isinstance(v, list) else str(v)
+        for k, v in params.items()
+        if v is not None
+    }
+
+
+class AsyncClient(_BaseClient):
+    """Asyncio client for calling Prosper APIs.
+
+    Exposes awaitable versions of the ``Client`` operations. Results are parsed into
+    the same ``prosper_api.models`` types, and calls draw from the same rate limit as
+    the synchronous client. All coroutines using a client share one connection pool
+    and one ``AsyncAuthTokenManager``.
+
+    Examples:
+        The client is best used as an async context manager, which closes the
+        connection pool on exit:
+
+            async with AsyncClient() as client:
+                account, listings = await asyncio.gather(
+                    client.get_account_info(),
+                    client.search_listings(SearchListingsRequest(limit=25)),
+                )
+
+    See Also:
+        https://developers.prosper.com/docs/investor/
+    """
+
+    _auth_token_manager: AsyncAuthTokenManager
+    _session: "httpx.AsyncClient"
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        auth_token_manager: Optional[AsyncAuthTokenManager] = None,
+        session: "Optional[httpx.AsyncClient]" = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        """Constructs an instance of the AsyncClient class.
+
+        Args:
+            config (Optional[Config]): Config instance to use.
+            auth_token_manager (Optional[AsyncAuthTokenManager]): A pre-configured
+                AsyncAuthTokenManager. Omit to use the default one, which renews the
+                token in the background while the client's context is entered if
+                ``prosper-api.auth.refresh-margin`` is set.
+            session (Optional[httpx.AsyncClient]): A pre-configured HTTP client to send
+                requests through. Omit to use a connection pool configured from
+                ``config``, which is owned and closed by the client.
+            rate_limiter (Optional[RateLimiter]): The rate limiter to wait on before
+                each call. Omit to share the process-wide limiter for the configured
+                budget.
+            cache (Optional[ResponseCache]): The cache to serve repeated reads from.
+                Omit to create one from ``config``, if caching is enabled there.
+        """
+        if config is None:
+            config = Config.autoconfig("prosper-api")
+
+        self._owns_session = session is None
+        if session is None:
+            session = _create_async_session(config)
+
+        self._owns_auth_token_manager = auth_token_manager is None
+        if auth_token_manager is None:
+            auth_token_manager = AsyncAuthTokenManager(config, session=session)
+
+        if rate_limiter is None:
+            rate_limiter = shared_rate_limiter(config)
+
+        if cache is None:
+            cache = ResponseCache.from_config(config)
+
+        self._config = config
+        self._auth_token_manager = auth_token_manager
+        self._session = session
+        self._scheduler = PriorityScheduler.from_config(rate_limiter, config)
+        self._max_retries = _max_retries_from_config(config)
+        self._cache = cache
+        self._single_flight = SingleFlight()
+        self._trusted_parsing = _trusted_parsing_from_config(config)
+
+    async def __aenter__(self) -> "AsyncClient":
+        """Enters the client's context.
+
+        The auth token starts being renewed in the background if the client owns its
+        token manager and ``prosper-api.auth.refresh-margin`` is set; the refresher
+        needs the event loop, so it can't be started by the constructor.
+
+        Returns:
+            AsyncClient: This client.
+        """
+        if (
+            self._owns_auth_token_manager
+            and _refresh_margin_from_config(self._config) > 0
+        ):
+            self._auth_token_manager.start_background_refresh()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ):
+        """Exits the client's context, closing its connection pool.
+
+        Args:
+            exc_type (Optional[Type[BaseException]]): The type of the exception raised
+                in the context, if any.
+            exc_val (Optional[BaseException]): The exception raised in the context, if
+                any.
+            exc_tb (Optional[TracebackType]): The traceback of the exception raised in
+                the context, if any.
+        """
+        await self.aclose()
+
+    async def aclose(self):
+        """Closes the resources owned by this client.
+
+        The connection pool is closed, and the auth token is no longer renewed in the
+        background.
+        """
+        if self._owns_auth_token_manager:
+            await self._auth_token_manager.stop_background_refresh()
+        if self._owns_session:
+            await self._session.aclose()
+
+    async def get_account_info(self) -> Account:
+        """Get the account metadata.
+
+        Returns:
+            Account: The current information about the account.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/accounts-api/
+        """
+        return Account.model_validate_json(await self.get_account_info_raw())
+
+    async def get_account_info_raw(self) -> bytes:
+        """Get the account metadata, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``Account.model_validate_json``.
+
+        Returns:
+            bytes: The JSON response body.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/accounts-api/
+        """
+        return await self._do_get(
+            self._ACCOUNT_API_URL, {}, priority=RequestPriority.SEARCH
+        )
+
+    async def search_listings(
+        self,
+        request: Union[SearchListingsRequest, SearchListingsQuery, None],
+        fields: Optional[Sequence[str]] = None,
+    ) -> SearchListingsResponse:
+        """Search the Prosper listings.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search, sort, and pagination parameters. Pass a
+                ``SearchListingsQuery`` to encode a repeated search only once.
+            fields (Optional[Sequence[str]]): The fields of each result to decode,
+                e.g. ``["listing_number", "lender_yield"]``; fields of nested
+                models are dotted. Omit to decode every field.
+
+        Returns:
+            SearchListingsResponse: Holds the search results as well as pagination
+                information.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        return self._parse(
+            SearchListingsResponse, await self.search_listings_raw(request), fields
+        )
+
+    async def search_listings_raw(
+        self,
+        request: Union[SearchListingsRequest, SearchListingsQuery, None],
+    ) -> bytes:
+        """Search the Prosper listings, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``SearchListingsResponse.model_validate_json``.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search, sort, and pagination parameters. Pass a
+                ``SearchListingsQuery`` to encode a repeated search only once.
+
+        Returns:
+            bytes: The JSON response body.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        if request is None:
+            request = SearchListingsRequest()
+
+        return await self._do_get(
+            self._SEARCH_API_URL,
+            _search_listings_params(request),
+            priority=RequestPriority.SEARCH,
+        )
+
+    async def stream_listings(
+        self,
+        request: Union[SearchListingsRequest, SearchListingsQuery, None] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Listing]:
+        """Search the Prosper listings, yielding each listing as it arrives.
+
+        The page is parsed as the response arrives, so the first listing is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search, sort, and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Listing: Each of the listings on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        if request is None:
+            request = SearchListingsRequest()
+
+        async for result in stream_results_async(
+            self._do_stream(
+                self._SEARCH_API_URL,
+                _search_listings_params(request),
+                priority=RequestPriority.SEARCH,
+            ),
+            Listing,
+            fields,
+        ):
+            yield result
+
+    async def search_listings_batch(
+        self, request: Union[SearchListingsRequest, SearchListingsQuery, None] = None
+    ) -> ListingBatch:
+        """Search the Prosper listings, returning one page of results in columnar form.
+
+        The response is decoded straight into typed arrays, without validating each
+        listing as a model, which is much faster for scoring large pages.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search, sort, and pagination parameters.
+
+        Returns:
+            ListingBatch: The listings on the requested page.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        return ListingBatch.from_response(await self.search_listings_raw(request))
+
+    async def list_notes(
+        self, request: ListNotesRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> ListNotesResponse:
+        """List notes in the account.
+
+        Args:
+            request (ListNotesRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Returns:
+            ListNotesResponse: Holds the list results and pagination information.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/notes-api/
+        """
+        return self._parse(
+            ListNotesResponse, await self.list_notes_raw(request), fields
+        )
+
+    async def list_notes_raw(self, request: ListNotesRequest = None) -> bytes:
+        """List notes in the account, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``ListNotesResponse.model_validate_json``.
+
+        Args:
+            request (ListNotesRequest): Configures the sort and pagination parameters.
+
+        Returns:
+            bytes: The JSON response body.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/notes-api/
+        """
+        if request is None:
+            request = ListNotesRequest()
+
+        return await self._do_get(self._NOTES_API_URL, _sort_and_page_params(request))
+
+    async def stream_notes(
+        self, request: ListNotesRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Note]:
+        """List notes in the account, yielding each note as it arrives.
+
+        The page is parsed as the response arrives, so the first note is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (ListNotesRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Note: Each of the notes on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/notes-api/
+        """
+        if request is None:
+            request = ListNotesRequest()
+
+        async for result in stream_results_async(
+            self._do_stream(self._NOTES_API_URL, _sort_and_page_params(request)),
+            Note,
+            fields,
+        ):
+            yield result
+
+    async def order(
+        self,
+        listing_id: int,
+        amount: Union[float, Decimal],
+    ) -> Order:
+        """Execute an order for a given listing and amount.
+
+        Args:
+            listing_id (int): Identifies the listing to make an order against.
+            amount (Union[float, Decimal]): The amount to bid for the order.
+
+        Returns:
+            Order: The in-progress order.
+
+        See Also
+            https://developers.prosper.com/docs/investor/orders-api/#submit_new_order
+        """
+        resp = await self._do_post(
+            self._ORDERS_API_URL, _order_payload(listing_id, amount)
+        )
+        self._invalidate_cache()
+        return Order.model_validate_json(resp)
+
+    async def list_orders(
+        self, request: ListOrdersRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> ListOrdersResponse:
+        """Lists orders in the account.
+
+        Args:
+            request (ListOrdersRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Returns:
+            ListOrdersResponse: Holds the list results and pagination information.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/orders-api/#get_order_details
+        """
+        return self._parse(
+            ListOrdersResponse, await self.list_orders_raw(request), fields
+        )
+
+    async def list_orders_raw(self, request: ListOrdersRequest = None) -> bytes:
+        """List orders in the account, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``ListOrdersResponse.model_validate_json``.
+
+        Args:
+            request (ListOrdersRequest): Configures the sort and pagination parameters.
+
+        Returns:
+            bytes: The JSON response body.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/orders-api/#get_order_details
+        """
+        if request is None:
+            request = ListOrdersRequest()
+
+        return await self._do_get(
+            self._ORDERS_API_URL, query_params=_sort_and_page_params(request)
+        )
+
+    async def stream_orders(
+        self, request: ListOrdersRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Order]:
+        """List orders in the account, yielding each order as it arrives.
+
+        The page is parsed as the response arrives, so the first order is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (ListOrdersRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Order: Each of the orders on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/orders-api/#get_order_details
+        """
+        if request is None:
+            request = ListOrdersRequest()
+
+        async for result in stream_results_async(
+            self._do_stream(
+                self._ORDERS_API_URL, query_params=_sort_and_page_params(request)
+            ),
+            Order,
+            fields,
+        ):
+            yield result
+
+    async def list_loans(
+        self, request: ListLoansRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> ListLoansResponse:
+        """Lists loans associated with the account.
+
+        Args:
+            request (ListLoansRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Returns:
+            ListLoansResponse: Holds the list results and pagination information.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        return self._parse(
+            ListLoansResponse, await self.list_loans_raw(request), fields
+        )
+
+    async def list_loans_raw(self, request: ListLoansRequest = None) -> bytes:
+        """List the account's loans, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``ListLoansResponse.model_validate_json``.
+
+        Args:
+            request (ListLoansRequest): Configures the sort and pagination parameters.
+
+        Returns:
+            bytes: The JSON response body.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        if request is None:
+            request = ListLoansRequest()
+
+        return await self._do_get(
+            self._LOANS_API_URL, query_params=_sort_and_page_params(request)
+        )
+
+    async def stream_loans(
+        self, request: ListLoansRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Loan]:
+        """List the account's loans, yielding each loan as it arrives.
+
+        The page is parsed as the response arrives, so the first loan is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (ListLoansRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Loan: Each of the loans on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        if request is None:
+            request = ListLoansRequest()
+
+        async for result in stream_results_async(
+            self._do_stream(
+                self._LOANS_API_URL, query_params=_sort_and_page_params(request)
+            ),
+            Loan,
+            fields,
+        ):
+            yield result
+
+    async def list_payments(
+        self, request: ListPaymentsRequest, fields: Optional[Sequence[str]] = None
+    ) -> ListPaymentsResponse:
+        """Lists loans payments for the given loans.
+
+        Args:
+            request (ListPaymentsRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Returns:
+            ListPaymentsResponse: Holds the list results and pagination information.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        return self._parse(
+            ListPaymentsResponse, await self.list_payments_raw(request), fields
+        )
+
+    async def list_payments_raw(self, request: ListPaymentsRequest) -> bytes:
+        """List payments for the given loans, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``ListPaymentsResponse.model_validate_json``.
+
+        Args:
+            request (ListPaymentsRequest): Configures the sort and pagination parameters.
+
+        Returns:
+            bytes: The JSON response body.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        resp = await self._do_get(
+            self._PAYMENTS_API_URL, query_params=_list_payments_params(request)
+        )
+        logger.debug(resp)
+        return resp
+
+    async def stream_payments(
+        self, request: ListPaymentsRequest, fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Payment]:
+        """List payments for the given loans, yielding each payment as it arrives.
+
+        The page is parsed as the response arrives, so the first payment is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (ListPaymentsRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Payment: Each of the payments on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        async for result in stream_results_async(
+            self._do_stream(
+                self._PAYMENTS_API_URL, query_params=_list_payments_params(request)
+            ),
+            Payment,
+            fields,
+        ):
+            yield result
+
+    async def iter_listings(
+        self,
+        request: Union[SearchListingsRequest, SearchListingsQuery, None] = None,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Listing]:
+        """Iterates over every listing matching the search.
+
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search and sort parameters. ``offset`` and ``limit`` set the
+                starting point and page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode,
+                e.g. ``["listing_number", "lender_yield"]``; fields of nested
+                models are dotted. Omit to decode every field.
+
+        Yields:
+            Listing: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        if request is None:
+            request = SearchListingsRequest()
+
+        async for result in paginate_async(
+            self._with_fields(self.search_listings, fields),
+            request,
+            self._SEARCH_MAX_PAGE_SIZE,
+            prefetch,
+        ):
+            yield result
+
+    async def iter_notes(
+        self,
+        request: Optional[ListNotesRequest] = None,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Note]:
+        """Iterates over every note in the account.
+
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (Optional[ListNotesRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Note: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/notes-api/
+        """
+        if request is None:
+            request = ListNotesRequest()
+
+        async for result in paginate_async(
+            self._with_fields(self.list_notes, fields),
+            request,
+            self._NOTES_MAX_PAGE_SIZE,
+            prefetch,
+        ):
+            yield result
+
+    async def iter_orders(
+        self,
+        request: Optional[ListOrdersRequest] = None,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Order]:
+        """Iterates over every order in the account.
+
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (Optional[ListOrdersRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Order: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/orders-api/#get_order_details
+        """
+        if request is None:
+            request = ListOrdersRequest()
+
+        async for result in paginate_async(
+            self._with_fields(self.list_orders, fields),
+            request,
+            self._ORDERS_MAX_PAGE_SIZE,
+            prefetch,
+        ):
+            yield result
+
+    async def iter_loans(
+        self,
+        request: Optional[ListLoansRequest] = None,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Loan]:
+        """Iterates over every loan associated with the account.
+
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (Optional[ListLoansRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Loan: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        if request is None:
+            request = ListLoansRequest()
+
+        async for result in paginate_async(
+            self._with_fields(self.list_loans, fields),
+            request,
+            self._LOANS_MAX_PAGE_SIZE,
+            prefetch,
+        ):
+            yield result
+
+    async def iter_payments(
+        self,
+        request: ListPaymentsRequest,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Payment]:
+        """Iterates over every payment for the given loans.
+
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (ListPaymentsRequest): Configures the loans and transaction date to
+                list payments for. ``offset`` and ``limit`` set the starting point and
+                page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Payment: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        async for result in paginate_async(
+            self._with_fields(self.list_payments, fields),
+            request,
+            self._PAYMENTS_MAX_PAGE_SIZE,
+            prefetch,
+        ):
+            yield result
+
+    async def iter_payments_for_loans(
+        self,
+        loan_numbers: Iterable[int],
+        transaction_effective_date: Optional[str] = None,
+        max_tries: int = _DEFAULT_CHUNK_MAX_TRIES,
+    ) -> AsyncIterator[Payment]:
+        """Iterates over every payment for any number of loans.
+
+        The loan numbers are split into chunks small enough to fit in a request URL.
+        The chunks are fetched concurrently within the rate limit, each paging through
+        its own results, and their payments are yielded as each chunk completes. A
+        chunk that fails is retried on its own, with exponential backoff, without
+        refetching the others.
+
+        Args:
+            loan_numbers (Iterable[int]): The loans to list payments for. Duplicates
+                are ignored.
+            transaction_effective_date (Optional[str]): Only list payments effective on
+                this date.
+            max_tries (int): The number of times to try each chunk before the error is
+                raised.
+
+        Yields:
+            Payment: Each result, grouped by chunk in the order the chunks complete.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        import httpx  # noqa: autoimport
+
+        @on_exception(
+            expo,
+            httpx.HTTPError,
+            max_tries=max_tries,
+            giveup=_is_client_error,
+        )
+        async def fetch_chunk(chunk: List[int]) -> List[Payment]:
+            return [
+                payment
+                async for payment in self.iter_payments(
+                    ListPaymentsRequest(
+                        loan_number=chunk,
+                        transaction_effective_date=transaction_effective_date,
+                    )
+                )
+            ]
+
+        async for payments in map_unordered_async(
+            fetch_chunk,
+            _chunk_loan_numbers(loan_numbers, self._PAYMENTS_MAX_LOAN_NUMBERS_LENGTH),
+            self._max_concurrency,
+        ):
+            for payment in payments:
+                yield payment
+
+    async def fetch_all_listings(
+        self, request: Union[SearchListingsRequest, SearchListingsQuery, None] = None
+    ) -> List[Listing]:
+        """Fetches every listing matching the search.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search and sort parameters. ``offset`` and ``limit`` set the
+                starting point and page size.
+
+        Returns:
+            List[Listing]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        if request is None:
+            request = SearchListingsRequest()
+
+        return await fetch_all_async(
+            self.search_listings,
+            request,
+            self._SEARCH_MAX_PAGE_SIZE,
+            _listing_key,
+            self._max_concurrency,
+        )
+
+    async def fetch_all_notes(
+        self, request: Optional[ListNotesRequest] = None
+    ) -> List[Note]:
+        """Fetches every note in the account.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (Optional[ListNotesRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+
+        Returns:
+            List[Note]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/notes-api/
+        """
+        if request is None:
+            request = ListNotesRequest()
+
+        return await fetch_all_async(
+            self.list_notes,
+            request,
+            self._NOTES_MAX_PAGE_SIZE,
+            _note_key,
+            self._max_concurrency,
+        )
+
+    async def fetch_all_orders(
+        self, request: Optional[ListOrdersRequest] = None
+    ) -> List[Order]:
+        """Fetches every order in the account.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (Optional[ListOrdersRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+
+        Returns:
+            List[Order]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/orders-api/#get_order_details
+        """
+        if request is None:
+            request = ListOrdersRequest()
+
+        return await fetch_all_async(
+            self.list_orders,
+            request,
+            self._ORDERS_MAX_PAGE_SIZE,
+            _order_key,
+            self._max_concurrency,
+        )
+
+    async def fetch_all_loans(
+        self, request: Optional[ListLoansRequest] = None
+    ) -> List[Loan]:
+        """Fetches every loan associated with the account.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (Optional[ListLoansRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+
+        Returns:
+            List[Loan]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        if request is None:
+            request = ListLoansRequest()
+
+        return await fetch_all_async(
+            self.list_loans,
+            request,
+            self._LOANS_MAX_PAGE_SIZE,
+            _loan_key,
+            self._max_concurrency,
+        )
+
+    async def fetch_all_payments(self, request: ListPaymentsRequest) -> List[Payment]:
+        """Fetches every payment for the given loans.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (ListPaymentsRequest): Configures the loans and transaction date to
+                list payments for. ``offset`` and ``limit`` set the starting point and
+                page size.
+
+        Returns:
+            List[Payment]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        return await fetch_all_async(
+            self.list_payments,
+            request,
+            self._PAYMENTS_MAX_PAGE_SIZE,
+            _payment_key,
+            self._max_concurrency,
+        )
+
+    async def _do_get(self, url, query_params=None, priority=RequestPriority.BULK):
+        if query_params is None:
+            query_params = {}
+        cached = self._cached_response(url, query_params)
+        if cached is not None:
+            return cached
+        # Identical reads made at the same time share one call.
+        return await self._single_flight.do_async(
+            _request_key(url, query_params),
+            lambda: self._fetch(url, query_params, priority),
+        )
+
+    async def _fetch(self, url, query_params, priority):
+        # An order placed while the read is in flight clears the cache, and the
+        # response from before it mustn't be cached again.
+        generation = self._cache_generation()
+        response = await self._do_request(
+            "GET", url, params=query_params, priority=priority
+        )
+        self._cache_response(url, query_params, response, generation)
+        return response
+
+    async def _do_post(self, url, data=None, priority=RequestPriority.ORDER):
+        if data is None:
+            data = {}
+        return await self._do_request("POST", url, data=data, priority=priority)
+
+    async def _do_stream(self, url, query_params, priority=RequestPriority.BULK):
+        # Streamed reads skip the cache and single flight, since the body is consumed
+        # as it arrives.
+        response = await self._send(
+            "GET", url, params=query_params, priority=priority, stream=True
+        )
+        try:
+            async for chunk in response.aiter_bytes(self._STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def _do_request(
+        self, method, url, params=None, data=None, priority=RequestPriority.BULK
+    ):
+        response = await self._send(
+            method, url, params=params, data=data, priority=priority
+        )
+        return response.content
+
+    async def _renew_rejected_token(self, auth_token, method, url):
+        logger.info(f"Auth token rejected; renewing it and replaying {method} {url}")
+        self._auth_token_manager.invalidate_token(auth_token)
+        return await self._auth_token_manager.get_token()
+
+    async def _send(
+        self,
+        method,
+        url,
+        params=None,
+        data=None,
+        priority=RequestPriority.BULK,
+        stream=False,
+    ):
+        if params is None:
+            params = {}
+        if data is None:
+            data = {}
+        self._check_for_floats(params)
+        self._check_for_floats(data)
+
+        auth_token = await self._auth_token_manager.get_token()
+        reauthenticated = False
+        for attempt in count():
+            await self._scheduler.acquire_async(priority)
+
+            logger.debug(f"API Call: {method} {url}; query: {params}; payload: {data}")
+
+            # Serialize with simplejson, like `requests` does, so Decimal amounts are
+            # sent as exact JSON numbers.
+            request_args = {
+                "params": _encode_query_params(params),
+                "content": simplejson.dumps(data),
+                "headers": {
+                    "Authorization": f"bearer {auth_token}",
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                },
+            }
+            if stream:
+                response = await self._session.send(
+                    self._session.build_request(method, url, **request_args),
+                    stream=True,
+                )
+            else:
+                response = await self._session.request(method, url, **request_args)
+            retry = self._should_retry(method, url, response, attempt)
+            if not retry and response.status_code == 401 and not reauthenticated:
+                # The token was revoked before it expired. It's renewed once and the
+                # rejected call replayed, which is safe even for orders.
+                reauthenticated = True
+                auth_token = await self._renew_rejected_token(auth_token, method, url)
+                retry = auth_token is not None
+            if not retry:
+                break
+            if stream:
+                await response.aclose()
+        if stream and response.is_error:
+            await response.aclose()
+        response.raise_for_status()
+        return response
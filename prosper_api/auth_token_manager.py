@@ -1,14 +1,26 @@
+import asyncio
+import contextlib
 import json
 import logging
+import os
 from datetime import datetime, timedelta
+from decimal import Decimal
 from os import makedirs
-from os.path import dirname, isfile, join
+from os.path import dirname, join
+from tempfile import mkstemp
+from threading import Event, RLock, Thread
+from typing import TYPE_CHECKING, Dict, Union
 
 import requests
 from platformdirs import user_cache_dir
 from prosper_shared.omni_config import Config, ConfigKey, SchemaType, config_schema
 from schema import Optional, Regex
 
+from prosper_api.file_lock import FileLock
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+
 logger = logging.getLogger(__name__)
 
 _AUTH_URL = "https://api.prosper.com/v1/security/oauth/token"
@@ -16,6 +28,7 @@ _ACCESS_TOKEN_KEY = "access_token"
 _REFRESH_TOKEN_KEY = "refresh_token"
 _EXPIRES_IN_KEY = "expires_in"
 _EXPIRES_AT_KEY = "expires_at"
+_AUTH_HEADERS = {"accept": "application/json"}
 
 
 _CLIENT_ID_CONFIG_PATH = "prosper-api.credentials.client-id"
@@ -23,7 +36,18 @@ _CLIENT_SECRET_CONFIG_PATH = "prosper-api.credentials.client-secret"
 _USERNAME_CONFIG_PATH = "prosper-api.credentials.username"
 _PASSWORD_CONFIG_PATH = "prosper-api.credentials.password"
 _TOKEN_CACHE_CONFIG_PATH = "prosper-api.auth.token-cache"
+_REFRESH_MARGIN_CONFIG_PATH = "prosper-api.auth.refresh-margin"
+_PRELOAD_SECRETS_CONFIG_PATH = "prosper-api.auth.preload-secrets"
 _DEFAULT_TOKEN_CACHE_PATH = join(user_cache_dir("prosper-api"), "token-cache")
+_DEFAULT_REFRESH_MARGIN = 0
+_KEYRING_SERVICE = "prosper-api"
+_REFRESH_MARGIN_REQUIRED = (
+    f"'{_REFRESH_MARGIN_CONFIG_PATH}' must be positive to refresh the auth token in "
+    "the background"
+)
+# The least time the background refresher waits between attempts, e.g. after one
+# fails.
+_MIN_REFRESH_INTERVAL = 30
 
 
 @config_schema
@@ -53,12 +77,33 @@ def _schema() -> SchemaType:
                     "token-cache",
                     "The filesystem location where the auth token will be cached.",
                     default=_DEFAULT_TOKEN_CACHE_PATH,
-                ): str
+                ): str,
+                Optional(
+                    ConfigKey(
+                        "refresh-margin",
+                        "The number of seconds before the auth token expires to renew it in the background; 0 to renew it when a call needs it.",
+                        default=_DEFAULT_REFRESH_MARGIN,
+                    )
+                ): int,
+                Optional(
+                    ConfigKey(
+                        "preload-secrets",
+                        "Whether to read the secrets from the keyring when the client is created, rather than when it first authenticates.",
+                    )
+                ): bool,
             },
         }
     }
 
 
+def _refresh_margin_from_config(config: Config) -> float:
+    return float(
+        config.get_as_decimal(
+            _REFRESH_MARGIN_CONFIG_PATH, Decimal(_DEFAULT_REFRESH_MARGIN)
+        )
+    )
+
+
 class AuthTokenManager:
     """Token manager for Prosper API tokens.
 
@@ -67,16 +112,32 @@ class AuthTokenManager:
     attempts to refresh the auth token using the refresh token; if that fails, the
     full auth is re-executed.
 
+    Token generation is serialized with a lock, so any number of threads can share
+    one manager and an expired token is only refreshed once. Processes sharing a
+    token cache file take turns with a file lock, and each reads the cache before
+    generating a token, so they also share one token and one refresh. With a
+    ``prosper-api.auth.refresh-margin`` configured, ``start_background_refresh()``
+    renews the token before it expires, so callers never wait on authentication.
+
+    Secrets read from the keyring are kept in memory for the life of the manager,
+    since some keyring backends take a long time to answer. Call
+    ``invalidate_secrets()`` after changing them, e.g. when rotating the client
+    secret.
+
     See Also:
         https://developers.prosper.com/docs/authenticating-with-oauth-2-0/password-flow/
     """
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, session: Union[requests.Session, None] = None):
         """Creates and AuthTokenManager instance.
 
         Args:
             config (Config): A prosper-api config
+            session (Union[requests.Session, None]): The session to send auth requests
+                through, e.g. the one shared with the ``Client``. Omit to use a
+                dedicated session.
         """
+        self.session = session if session is not None else self._create_session()
         self.token_cache_path = config.get_as_str(_TOKEN_CACHE_CONFIG_PATH)
         self.client_id = config.get_as_str(_CLIENT_ID_CONFIG_PATH)
         self.client_secret = config.get_as_str(_CLIENT_SECRET_CONFIG_PATH)
@@ -89,13 +150,35 @@ class AuthTokenManager:
                 "[more secure](https://github.com/grahamtt/prosper-api#more-secure) storage method."
             )
 
-        self.token = None
-        if isfile(self.token_cache_path):
-            with open(self.token_cache_path) as token_cache_file:
-                self.token = json.load(token_cache_file)
+        self.refresh_margin = _refresh_margin_from_config(config)
+        self._lock = RLock()
+        self._refresher: Union[Thread, asyncio.Task, None] = None
+        self._stop_refresh = Event()
+        self._rejected_token = None
+        self._secrets: Dict[str, str] = {}
+        self.token = self._read_token_cache()
+
+        if config.get_as_bool(_PRELOAD_SECRETS_CONFIG_PATH, False):
+            self.preload_secrets()
 
     def _initial_auth(self):
-        payload = {
+        response = self.session.request(
+            "POST", _AUTH_URL, data=self._initial_auth_payload(), headers=_AUTH_HEADERS
+        )
+        response.raise_for_status()
+        self.token = response.json()
+        self._cache_token()
+
+    def _refresh_auth(self):
+        response = self.session.request(
+            "POST", _AUTH_URL, data=self._refresh_auth_payload(), headers=_AUTH_HEADERS
+        )
+        response.raise_for_status()
+        self.token = response.json()
+        self._cache_token()
+
+    def _initial_auth_payload(self):
+        return {
             "grant_type": "password",
             "client_id": self.client_id,
             "client_secret": self.client_secret
@@ -106,14 +189,9 @@ class AuthTokenManager:
             if self.password
             else self._fetch_secret(self.username),
         }
-        headers = {"accept": "application/json"}
-        response = requests.request("POST", _AUTH_URL, data=payload, headers=headers)
-        response.raise_for_status()
-        self.token = response.json()
-        self._cache_token()
 
-    def _refresh_auth(self):
-        payload = {
+    def _refresh_auth_payload(self):
+        return {
             "grant_type": "refresh_token",
             "client_id": self.client_id,
             "client_secret": self.client_secret
@@ -121,25 +199,64 @@ class AuthTokenManager:
             else self._fetch_secret(self.client_id),
             "refresh_token": self.token[_REFRESH_TOKEN_KEY],
         }
-        headers = {"accept": "application/json"}
-        response = requests.request("POST", _AUTH_URL, data=payload, headers=headers)
-        response.raise_for_status()
-        self.token = response.json()
-        self._cache_token()
+
+    def _is_token_expired(self, margin: float = 0):
+        return self.token[_EXPIRES_AT_KEY] - margin <= datetime.now().timestamp()
 
     def _cache_token(self):
         self.token[_EXPIRES_AT_KEY] = (
             datetime.now() + timedelta(seconds=self.token[_EXPIRES_IN_KEY] - 10)
         ).timestamp()
         logging.debug(f"Set expires at to {self.token[_EXPIRES_AT_KEY]}")
-        makedirs(dirname(self.token_cache_path), exist_ok=True)
-        with open(self.token_cache_path, "w") as token_cache_file:
-            json.dump(self.token, token_cache_file)
+        cache_dir = dirname(self.token_cache_path)
+        makedirs(cache_dir, exist_ok=True)
+        # Written to a temporary file that replaces the cache in one step, so other
+        # processes never read a partly written token.
+        temp_fd, temp_path = mkstemp(dir=cache_dir, prefix=".token-cache-")
+        try:
+            with os.fdopen(temp_fd, "w") as token_cache_file:
+                json.dump(self.token, token_cache_file)
+            os.replace(temp_path, self.token_cache_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _read_token_cache(self):
+        try:
+            with open(self.token_cache_path) as token_cache_file:
+                return json.load(token_cache_file)
+        except (OSError, ValueError):
+            return None
+
+    def _create_session(self):
+        return requests.Session()
 
     def _fetch_secret(self, id):
-        import keyring  # noqa: autoimport
+        secret = self._secrets.get(id)
+        if secret is None:
+            import keyring  # noqa: autoimport
+
+            secret = keyring.get_password(_KEYRING_SERVICE, id)
+            # Missing secrets aren't kept, so they're found once they're added.
+            if secret is not None:
+                self._secrets[id] = secret
+        return secret
+
+    def preload_secrets(self):
+        """Reads the secrets that aren't configured from the keyring.
+
+        Loading the keyring backend and querying it can be slow, so doing it up front
+        keeps that cost off the first call that authenticates. Does nothing if the
+        secrets are configured.
+        """
+        if not self.client_secret:
+            self._fetch_secret(self.client_id)
+        if not self.password:
+            self._fetch_secret(self.username)
 
-        return keyring.get_password("prosper-api", id)
+    def invalidate_secrets(self):
+        """Forgets the secrets read from the keyring, so they're read again."""
+        self._secrets.clear()
 
     def get_token(self):
         """Get the auth token, generating it or refreshing it if necessary.
@@ -147,24 +264,279 @@ class AuthTokenManager:
         Returns
             str: A valid authorization token for Prosper APIs.
         """
+        # A fresh token is returned without waiting on the lock, e.g. while it's being
+        # renewed in the background.
+        token = self.token
+        if (
+            token is not None
+            and token.get(_EXPIRES_AT_KEY, 0) > datetime.now().timestamp()
+        ):
+            return token[_ACCESS_TOKEN_KEY]
+
+        # Callers that wait on the lock find the token already generated.
+        with self._lock:
+            if not self._ensure_token():
+                return None
+            return self.token[_ACCESS_TOKEN_KEY]
+
+    def invalidate_token(self, access_token: str):
+        """Marks a token the API rejected, so the next ``get_token()`` renews it.
+
+        Callers that saw the same token rejected at the same time trigger a single
+        renewal; the token is left alone if it has already been renewed.
+
+        Args:
+            access_token (str): The rejected token, as returned by ``get_token()``.
+        """
+        with self._lock:
+            self._invalidate(access_token)
+
+    def _invalidate(self, access_token: str):
+        if self.token is not None and self.token.get(_ACCESS_TOKEN_KEY) == access_token:
+            logger.info("Auth token was rejected; it will be renewed")
+            self._rejected_token = access_token
+            self.token = {**self.token, _EXPIRES_AT_KEY: 0}
+
+    def start_background_refresh(self):
+        """Starts renewing the token in a background thread before it expires.
+
+        The token is renewed ``refresh_margin`` seconds before it expires, or right
+        away if there's no token yet. Does nothing if the refresher is already
+        running.
+
+        Raises:
+            ValueError: If ``refresh_margin`` isn't positive.
+        """
+        if self.refresh_margin <= 0:
+            raise ValueError(_REFRESH_MARGIN_REQUIRED)
+        if self._refresher is None:
+            self._stop_refresh = Event()
+            self._refresher = Thread(
+                target=self._refresh_in_background,
+                args=(self._stop_refresh,),
+                name="prosper-api-token-refresh",
+                daemon=True,
+            )
+            self._refresher.start()
+
+    def stop_background_refresh(self):
+        """Stops renewing the token in the background, if it's being renewed."""
+        if self._refresher is None:
+            return
+
+        self._stop_refresh.set()
+        self._refresher.join()
+        self._refresher = None
+
+    def _next_refresh_delay(self) -> float:
+        # Waits a while between attempts if the margin is longer than tokens last.
+        return max(
+            self.token[_EXPIRES_AT_KEY]
+            - self.refresh_margin
+            - datetime.now().timestamp(),
+            _MIN_REFRESH_INTERVAL,
+        )
+
+    def _refresh_in_background(self, stopped: Event):
+        delay = 0.0
+        while not stopped.wait(delay):
+            # Waits a while between attempts after a failure.
+            delay = _MIN_REFRESH_INTERVAL
+            with self._lock:
+                if self._ensure_token(self.refresh_margin):
+                    delay = self._next_refresh_delay()
+
+    def _token_cache_lock_path(self) -> str:
+        return f"{self.token_cache_path}.lock"
+
+    def _adopt_cached_token(self, cached_token: Union[dict, None]):
+        # Another process may have generated a token while this one waited.
+        if (
+            cached_token is not None
+            and cached_token.get(_ACCESS_TOKEN_KEY) != self._rejected_token
+        ):
+            self.token = cached_token
+
+    def _ensure_token(self, margin: float = 0) -> bool:
+        # Generates the token, or refreshes it if it expires within the margin. The
+        # caller must hold the lock.
         try:
-            if self.token is None:
-                logger.info(
-                    "No cached auth token found; performing initial authentication"
-                )
-                self._initial_auth()
-            elif self.token[_EXPIRES_AT_KEY] <= datetime.now().timestamp():
-                logger.info("Cached auth token is expired; attempting to refresh it")
-                try:
-                    self._refresh_auth()
-                except Exception as ex:
+            with FileLock(self._token_cache_lock_path()):
+                self._adopt_cached_token(self._read_token_cache())
+                if self.token is None:
                     logger.info(
-                        "Failed to refresh auth token; performing full authentication"
+                        "No cached auth token found; performing initial authentication"
                     )
-                    logging.debug("Refresh auth token failure", exc_info=ex)
                     self._initial_auth()
+                elif self._is_token_expired(margin):
+                    logger.info(
+                        "Cached auth token is expiring; attempting to refresh it"
+                    )
+                    try:
+                        self._refresh_auth()
+                    except Exception as ex:
+                        logger.info(
+                            "Failed to refresh auth token; performing full authentication"
+                        )
+                        logging.debug("Refresh auth token failure", exc_info=ex)
+                        self._initial_auth()
         except Exception as ex:
             logger.error("Failed to authenticate", exc_info=ex)
-            return None
+            return False
+        return True
+
+
+class AsyncAuthTokenManager(AuthTokenManager):
+    """Token manager for use with the ``AsyncClient``.
+
+    Behaves like ``AuthTokenManager`` but authenticates without blocking the event
+    loop. Token generation is serialized with an ``asyncio.Lock``, so any number of
+    coroutines can share one manager and an expired token is only refreshed once.
+    Like the sync manager, it takes the token cache's file lock and re-reads the cache
+    before generating a token, so processes share one token and one refresh; the
+    file is locked, read and written in worker threads.
+    The background refresher is an ``asyncio`` task rather than a thread.
+
+    Requires the ``httpx`` package, which is installed with the '[async]' extra.
+    """
+
+    def __init__(
+        self, config: Config, session: "Union[httpx.AsyncClient, None]" = None
+    ):
+        """Creates an AsyncAuthTokenManager instance.
+
+        Args:
+            config (Config): A prosper-api config
+            session (Union[httpx.AsyncClient, None]): The HTTP client to send auth
+                requests through, e.g. the one shared with the ``AsyncClient``. Omit to
+                use a dedicated one.
+        """
+        super().__init__(config, session=session)
+        self._lock = None
+
+    async def _initial_auth(self):
+        response = await self.session.request(
+            "POST", _AUTH_URL, data=self._initial_auth_payload(), headers=_AUTH_HEADERS
+        )
+        response.raise_for_status()
+        self.token = response.json()
+        await asyncio.to_thread(self._cache_token)
+
+    async def _refresh_auth(self):
+        response = await self.session.request(
+            "POST", _AUTH_URL, data=self._refresh_auth_payload(), headers=_AUTH_HEADERS
+        )
+        response.raise_for_status()
+        self.token = response.json()
+        await asyncio.to_thread(self._cache_token)
+
+    def invalidate_token(self, access_token: str):
+        """Marks a token the API rejected, so the next ``get_token()`` renews it.
+
+        Callers that saw the same token rejected at the same time trigger a single
+        renewal; the token is left alone if it has already been renewed.
+
+        Args:
+            access_token (str): The rejected token, as returned by ``get_token()``.
+        """
+        # Runs without yielding to the event loop, so it needs no lock.
+        self._invalidate(access_token)
+
+    def _create_session(self):
+        import httpx  # noqa: autoimport
+
+        return httpx.AsyncClient()
+
+    async def get_token(self):
+        """Get the auth token, generating it or refreshing it if necessary.
+
+        Returns
+            str: A valid authorization token for Prosper APIs.
+        """
+        # A fresh token is returned without waiting on the lock, e.g. while it's being
+        # renewed in the background.
+        token = self.token
+        if (
+            token is not None
+            and token.get(_EXPIRES_AT_KEY, 0) > datetime.now().timestamp()
+        ):
+            return token[_ACCESS_TOKEN_KEY]
+
+        async with self._get_lock():
+            if not await self._ensure_token_async():
+                return None
+            return self.token[_ACCESS_TOKEN_KEY]
+
+    def start_background_refresh(self):
+        """Starts renewing the token in an asyncio task before it expires.
+
+        The token is renewed ``refresh_margin`` seconds before it expires, or right
+        away if there's no token yet. Must be called from a coroutine; the task runs
+        on its event loop. Does nothing if the refresher is already running.
+
+        Raises:
+            ValueError: If ``refresh_margin`` isn't positive.
+        """
+        if self.refresh_margin <= 0:
+            raise ValueError(_REFRESH_MARGIN_REQUIRED)
+        if self._refresher is None:
+            self._refresher = asyncio.get_running_loop().create_task(
+                self._refresh_in_background(), name="prosper-api-token-refresh"
+            )
+
+    async def stop_background_refresh(self):
+        """Stops renewing the token in the background, if it's being renewed."""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresher
+            self._refresher = None
+
+    async def _refresh_in_background(self):
+        while True:
+            # Waits a while between attempts after a failure.
+            delay = _MIN_REFRESH_INTERVAL
+            async with self._get_lock():
+                if await self._ensure_token_async(self.refresh_margin):
+                    delay = self._next_refresh_delay()
+            await asyncio.sleep(delay)
 
-        return self.token[_ACCESS_TOKEN_KEY]
+    def _get_lock(self) -> asyncio.Lock:
+        # Created lazily so the lock binds to the running event loop.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _ensure_token_async(self, margin: float = 0) -> bool:
+        # Generates the token, or refreshes it if it expires within the margin. The
+        # caller must hold the lock.
+        try:
+            with contextlib.ExitStack() as file_lock:
+                # Waiting for another process to release the file lock blocks.
+                await asyncio.to_thread(
+                    file_lock.enter_context, FileLock(self._token_cache_lock_path())
+                )
+                self._adopt_cached_token(
+                    await asyncio.to_thread(self._read_token_cache)
+                )
+                if self.token is None:
+                    logger.info(
+                        "No cached auth token found; performing initial authentication"
+                    )
+                    await self._initial_auth()
+                elif self._is_token_expired(margin):
+                    logger.info(
+                        "Cached auth token is expiring; attempting to refresh it"
+                    )
+                    try:
+                        await self._refresh_auth()
+                    except Exception as ex:
+                        logger.info(
+                            "Failed to refresh auth token; performing full authentication"
+                        )
+                        logging.debug("Refresh auth token failure", exc_info=ex)
+                        await self._initial_auth()
+        except Exception as ex:
+            logger.error("Failed to authenticate", exc_info=ex)
+            return False
+        return True
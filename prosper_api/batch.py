@@ -0,0 +1,278 @@
+"""Columnar representations of API results for vectorized analysis.
+
+A batch holds one typed array per field instead of one model per result, so
+thousands of listings can be filtered and scored with array operations. The arrays
+can be exported to NumPy without copying; NumPy is installed with the '[numpy]'
+extra.
+"""
+import json
+from array import array
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Type,
+    Union,
+    get_args,
+)
+
+from prosper_api.models import CreditBureauValues, Listing, SearchListingsResponse
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
+
+_CREDIT_BUREAU_VALUES_FIELD = "credit_bureau_values_transunion_indexed"
+
+# The code stored for a missing enum value.
+MISSING_CODE = -1
+
+_ID_TYPECODE = "q"
+_NUMERIC_TYPECODE = "d"
+_CODE_TYPECODE = "h"
+_NAN = float("nan")
+_DATE_FORMAT = "%Y-%m-%d %H:%M:%S %z"
+
+
+def _field_type(annotation) -> Any:
+    # Unwraps Optional[X] to X.
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    return args[0] if args else annotation
+
+
+def _columns(model: Type) -> Dict[str, Any]:
+    return {
+        name: _field_type(field.annotation)
+        for name, field in model.model_fields.items()
+    }
+
+
+def _is_numeric(field_type) -> bool:
+    return field_type in (Decimal, int, float, bool)
+
+
+def _is_enum(field_type) -> bool:
+    return isinstance(field_type, type) and issubclass(field_type, Enum)
+
+
+def _is_date(name: str, field_type) -> bool:
+    return field_type is str and name.endswith("_date")
+
+
+def _timestamp(value: Union[str, None]) -> float:
+    if value is None:
+        return _NAN
+    return datetime.strptime(value, _DATE_FORMAT).timestamp()
+
+
+_LISTING_COLUMNS = _columns(Listing)
+_CREDIT_BUREAU_COLUMNS = _columns(CreditBureauValues)
+
+_LISTING_NUMERIC_COLUMNS = tuple(
+    name
+    for name, field_type in _LISTING_COLUMNS.items()
+    if _is_numeric(field_type) and name != "listing_number"
+)
+_CREDIT_BUREAU_NUMERIC_COLUMNS = tuple(
+    name
+    for name, field_type in _CREDIT_BUREAU_COLUMNS.items()
+    if _is_numeric(field_type)
+)
+NUMERIC_COLUMNS = _LISTING_NUMERIC_COLUMNS + _CREDIT_BUREAU_NUMERIC_COLUMNS
+
+_LISTING_DATE_COLUMNS = tuple(
+    name for name, field_type in _LISTING_COLUMNS.items() if _is_date(name, field_type)
+)
+_CREDIT_BUREAU_DATE_COLUMNS = tuple(
+    name
+    for name, field_type in _CREDIT_BUREAU_COLUMNS.items()
+    if _is_date(name, field_type)
+)
+DATE_COLUMNS = _LISTING_DATE_COLUMNS + _CREDIT_BUREAU_DATE_COLUMNS
+
+_LISTING_ENUM_COLUMNS = {
+    name: field_type
+    for name, field_type in _LISTING_COLUMNS.items()
+    if _is_enum(field_type)
+}
+_CREDIT_BUREAU_ENUM_COLUMNS = {
+    name: field_type
+    for name, field_type in _CREDIT_BUREAU_COLUMNS.items()
+    if _is_enum(field_type)
+}
+ENUM_COLUMNS: Dict[str, Type[Enum]] = {
+    **_LISTING_ENUM_COLUMNS,
+    **_CREDIT_BUREAU_ENUM_COLUMNS,
+}
+
+
+def _enum_codes(enum_type: Type[Enum]) -> Dict[Any, int]:
+    # Both the members and their raw API values map to the member's code.
+    return {
+        key: code
+        for code, member in enumerate(enum_type)
+        for key in (member, member.value)
+    }
+
+
+_ENUM_CODES = {name: _enum_codes(enum_type) for name, enum_type in ENUM_COLUMNS.items()}
+
+
+class ListingBatch:
+    """A batch of listings stored as one typed array per field.
+
+    Numeric fields of ``Listing`` and its ``CreditBureauValues`` are stored as
+    float64, with NaN for missing values; date fields, such as ``listing_start_date``,
+    are stored the same way as POSIX timestamps. Enum fields, such as
+    ``prosper_rating``, ``borrower_state`` and ``fico_score``, are stored as int16
+    codes: the index of the member in its enum, or ``MISSING_CODE``. Other text fields aren't stored; use
+    ``listing_number`` to get back to the listing.
+
+    Attributes:
+        listing_number (array): The listing numbers, as int64.
+        columns (Dict[str, array]): The numeric, date, and enum code arrays, by field
+            name.
+    """
+
+    listing_number: array
+    columns: Dict[str, array]
+
+    def __init__(self):
+        """Creates an empty ListingBatch instance."""
+        self.listing_number = array(_ID_TYPECODE)
+        self.columns = {
+            **{name: array(_NUMERIC_TYPECODE) for name in NUMERIC_COLUMNS},
+            **{name: array(_NUMERIC_TYPECODE) for name in DATE_COLUMNS},
+            **{name: array(_CODE_TYPECODE) for name in ENUM_COLUMNS},
+        }
+
+    @classmethod
+    def from_listings(cls, listings: Iterable[Listing]) -> "ListingBatch":
+        """Builds a batch from listing models.
+
+        Args:
+            listings (Iterable[Listing]): The listings.
+
+        Returns:
+            ListingBatch: The batch.
+        """
+        batch = cls()
+        for listing in listings:
+            batch._append(
+                listing.__dict__,
+                getattr(listing, _CREDIT_BUREAU_VALUES_FIELD).__dict__,
+            )
+        return batch
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "ListingBatch":
+        """Builds a batch from listings as decoded from the API's JSON.
+
+        This skips validating each listing as a model, so it's much faster than
+        ``from_listings`` for large batches.
+
+        Args:
+            records (Iterable[Mapping[str, Any]]): The listings, e.g. the ``result``
+                of a decoded search listings response.
+
+        Returns:
+            ListingBatch: The batch.
+        """
+        batch = cls()
+        for record in records:
+            batch._append(record, record.get(_CREDIT_BUREAU_VALUES_FIELD) or {})
+        return batch
+
+    @classmethod
+    def from_response(
+        cls, response: Union[SearchListingsResponse, str, bytes]
+    ) -> "ListingBatch":
+        """Builds a batch from a search listings response.
+
+        Args:
+            response (Union[SearchListingsResponse, str, bytes]): The parsed response,
+                or its raw JSON body.
+
+        Returns:
+            ListingBatch: The batch.
+        """
+        if isinstance(response, SearchListingsResponse):
+            return cls.from_listings(response.result)
+        return cls.from_records(json.loads(response)["result"])
+
+    def __len__(self) -> int:
+        """Gets the number of listings in the batch.
+
+        Returns:
+            int: The number of listings.
+        """
+        return len(self.listing_number)
+
+    def decode(self, name: str) -> List[Union[Enum, None]]:
+        """Converts an enum column's codes back to enum members.
+
+        Args:
+            name (str): The name of the enum field, e.g. ``prosper_rating``.
+
+        Returns:
+            List[Union[Enum, None]]: The member for each listing, or None where the
+                value is missing.
+        """
+        members = list(ENUM_COLUMNS[name])
+        return [
+            None if code == MISSING_CODE else members[code]
+            for code in self.columns[name]
+        ]
+
+    def to_numpy(self) -> Dict[str, "numpy.ndarray"]:
+        """Exports the batch as NumPy arrays without copying the data.
+
+        The arrays share memory with the batch, so changes to one are visible in the
+        other. While the arrays are alive, no more listings can be added to the batch.
+
+        Returns:
+            Dict[str, numpy.ndarray]: The ``listing_number`` array, and an array for
+                each column, by field name.
+        """
+        import numpy  # noqa: autoimport
+
+        return {
+            name: numpy.frombuffer(column, dtype=column.typecode)
+            for name, column in {
+                "listing_number": self.listing_number,
+                **self.columns,
+            }.items()
+        }
+
+    def _append(
+        self, values: Mapping[str, Any], credit_bureau_values: Mapping[str, Any]
+    ):
+        self.listing_number.append(int(values["listing_number"]))
+        for source, names, date_names, enum_names in (
+            (
+                values,
+                _LISTING_NUMERIC_COLUMNS,
+                _LISTING_DATE_COLUMNS,
+                _LISTING_ENUM_COLUMNS,
+            ),
+            (
+                credit_bureau_values,
+                _CREDIT_BUREAU_NUMERIC_COLUMNS,
+                _CREDIT_BUREAU_DATE_COLUMNS,
+                _CREDIT_BUREAU_ENUM_COLUMNS,
+            ),
+        ):
+            for name in names:
+                value = source.get(name)
+                self.columns[name].append(_NAN if value is None else float(value))
+            for name in date_names:
+                self.columns[name].append(_timestamp(source.get(name)))
+            for name in enum_names:
+                self.columns[name].append(
+                    _ENUM_CODES[name].get(source.get(name), MISSING_CODE)
+                )
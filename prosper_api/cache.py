@@ -0,0 +1,252 @@
+"""Opt-in caching of responses from the read-only API endpoints.
+
+Cached responses are served without spending any of the rate limit budget, which
+suits dashboards and workers that repeat identical reads many times a minute.
+"""
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from threading import Lock
+from time import monotonic
+from typing import Dict, Hashable, Tuple, Union
+
+from prosper_shared.omni_config import Config, ConfigKey, SchemaType, config_schema
+from schema import Optional
+
+logger = logging.getLogger(__name__)
+
+_ENABLED_CONFIG_PATH = "prosper-api.cache.enabled"
+_MAX_SIZE_CONFIG_PATH = "prosper-api.cache.max-size"
+
+ACCOUNT_ENDPOINT = "account"
+LISTINGS_ENDPOINT = "listings"
+NOTES_ENDPOINT = "notes"
+ORDERS_ENDPOINT = "orders"
+LOANS_ENDPOINT = "loans"
+PAYMENTS_ENDPOINT = "payments"
+
+_DEFAULT_MAX_SIZE = 256
+# Listings are gone within seconds of being funded, so they aren't cached by default.
+_DEFAULT_TTLS = {
+    ACCOUNT_ENDPOINT: 5,
+    LISTINGS_ENDPOINT: 0,
+    NOTES_ENDPOINT: 60,
+    ORDERS_ENDPOINT: 60,
+    LOANS_ENDPOINT: 60,
+    PAYMENTS_ENDPOINT: 300,
+}
+
+
+def _ttl_config_path(endpoint: str) -> str:
+    return f"prosper-api.cache.{endpoint}-ttl"
+
+
+@config_schema
+def _schema() -> SchemaType:
+    return {
+        "prosper-api": {
+            "cache": {
+                Optional(
+                    ConfigKey(
+                        "enabled",
+                        "Whether to cache responses from the read-only endpoints. The cache is cleared whenever an order is placed.",
+                    )
+                ): bool,
+                Optional(
+                    ConfigKey(
+                        "max-size",
+                        "The maximum number of responses to cache; the least recently used are evicted first.",
+                        default=_DEFAULT_MAX_SIZE,
+                    )
+                ): int,
+                **{
+                    Optional(
+                        ConfigKey(
+                            f"{endpoint}-ttl",
+                            f"The number of seconds {endpoint} responses are cached for; 0 to not cache them.",
+                            default=ttl,
+                        )
+                    ): int
+                    for endpoint, ttl in _DEFAULT_TTLS.items()
+                },
+            }
+        }
+    }
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Point-in-time statistics for a response cache.
+
+    Attributes:
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that had to call the API.
+        evictions (int): The number of responses dropped to stay within the size
+            limit.
+        size (int): The number of responses currently cached.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """A thread-safe, size-bounded cache of API responses with per-endpoint TTLs.
+
+    Responses are keyed on the endpoint and its query parameters, ignoring parameter
+    order and unset parameters. Once the cache is full, the least recently used
+    response is evicted to make room.
+    """
+
+    def __init__(
+        self,
+        max_size: int = _DEFAULT_MAX_SIZE,
+        ttls: Union[Dict[str, float], None] = None,
+    ):
+        """Creates a ResponseCache instance.
+
+        Args:
+            max_size (int): The maximum number of responses to hold.
+            ttls (Union[Dict[str, float], None]): The number of seconds responses are
+                fresh for, by endpoint. Endpoints without a positive TTL aren't
+                cached. Omit to use the defaults.
+        """
+        self.max_size = max_size
+        self.ttls = dict(_DEFAULT_TTLS if ttls is None else ttls)
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._generation = 0
+
+    @classmethod
+    def from_config(cls, config: Config) -> "Union[ResponseCache, None]":
+        """Creates a ResponseCache configured from `prosper-api.cache`.
+
+        Args:
+            config (Config): A prosper-api config.
+
+        Returns:
+            Union[ResponseCache, None]: The configured cache, or None if caching isn't
+                enabled.
+        """
+        if not config.get_as_bool(_ENABLED_CONFIG_PATH, False):
+            return None
+        return cls(
+            max_size=int(
+                config.get_as_decimal(_MAX_SIZE_CONFIG_PATH, Decimal(_DEFAULT_MAX_SIZE))
+            ),
+            ttls={
+                endpoint: float(
+                    config.get_as_decimal(_ttl_config_path(endpoint), Decimal(ttl))
+                )
+                for endpoint, ttl in _DEFAULT_TTLS.items()
+            },
+        )
+
+    def get(self, endpoint: str, params: dict) -> Union[bytes, None]:
+        """Gets a fresh cached response.
+
+        Args:
+            endpoint (str): The endpoint that was called, e.g. ``NOTES_ENDPOINT``.
+            params (dict): The query parameters it was called with.
+
+        Returns:
+            Union[bytes, None]: The response body, or None if there's no fresh response
+                cached.
+        """
+        if not self._is_cached(endpoint):
+            return None
+        key = _request_key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= monotonic():
+                self._entries.pop(key, None)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    @property
+    def generation(self) -> int:
+        """The number of times the cache has been cleared.
+
+        Read it before making a request and pass it to ``put``, so a response that
+        was in flight when the cache was cleared isn't cached.
+        """
+        return self._generation
+
+    def put(
+        self,
+        endpoint: str,
+        params: dict,
+        response: bytes,
+        generation: Union[int, None] = None,
+    ):
+        """Caches a response, evicting the least recently used if the cache is full.
+
+        Args:
+            endpoint (str): The endpoint that was called, e.g. ``NOTES_ENDPOINT``.
+            params (dict): The query parameters it was called with.
+            response (bytes): The response body.
+            generation (Union[int, None]): The ``generation`` read before the request
+                was made; the response is dropped if the cache has been cleared
+                since. Omit to cache the response regardless.
+        """
+        if self._is_cached(endpoint):
+            with self._lock:
+                if generation is not None and generation != self._generation:
+                    logger.debug(f"Dropped a stale {endpoint} response")
+                else:
+                    key = _request_key(endpoint, params)
+                    self._entries[key] = (monotonic() + self.ttls[endpoint], response)
+                    self._entries.move_to_end(key)
+                    self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self):
+        """Drops every cached response, e.g. after the account has changed."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+        logger.debug("Cleared the response cache")
+
+    def stats(self) -> CacheStats:
+        """Gets the hit, miss, and eviction counts and the current size.
+
+        Returns:
+            CacheStats: The statistics.
+        """
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+            )
+
+    def _is_cached(self, endpoint: str) -> bool:
+        return self.max_size > 0 and self.ttls.get(endpoint, 0) > 0
+
+
+def _request_key(endpoint: str, params: dict) -> Hashable:
+    return endpoint, tuple(
+        sorted(
+            (name, str(value)) for name, value in params.items() if value is not None
+        )
+    )
@@ -1,15 +1,44 @@
 import logging
 from decimal import Decimal
-from typing import List, Optional, Union
+from functools import partial
+from itertools import count
+from operator import attrgetter
+from types import TracebackType
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import requests
 from backoff import expo, on_exception
 from prosper_shared.omni_config import Config
-from ratelimit import RateLimitException, limits
+from pydantic import BaseModel
 
-from prosper_api.auth_token_manager import AuthTokenManager
+from prosper_api.auth_token_manager import (
+    AuthTokenManager,
+    _refresh_margin_from_config,
+)
+from prosper_api.batch import ListingBatch
+from prosper_api.cache import (
+    ACCOUNT_ENDPOINT,
+    LISTINGS_ENDPOINT,
+    LOANS_ENDPOINT,
+    NOTES_ENDPOINT,
+    ORDERS_ENDPOINT,
+    PAYMENTS_ENDPOINT,
+    ResponseCache,
+    _request_key,
+)
 from prosper_api.models import (
     Account,
+    Listing,
     ListLoansRequest,
     ListLoansResponse,
     ListNotesRequest,
@@ -18,30 +47,241 @@ from prosper_api.models import (
     ListOrdersResponse,
     ListPaymentsRequest,
     ListPaymentsResponse,
+    Loan,
+    Note,
     Order,
+    Payment,
     SearchListingsRequest,
     SearchListingsResponse,
 )
+from prosper_api.pagination import fetch_all, map_unordered, paginate
+from prosper_api.projection import _trusted_parsing_from_config, parse_response
+from prosper_api.query import (
+    SearchListingsQuery,
+    _list_val,
+    _search_listings_params,
+)
+from prosper_api.rate_limit import (
+    RateLimiter,
+    _max_retries_from_config,
+    _parse_retry_after,
+    shared_rate_limiter,
+)
+from prosper_api.scheduler import PriorityScheduler, RequestPriority
+from prosper_api.session import (
+    _DEFAULT_POOL_MAXSIZE,
+    _POOL_MAXSIZE_CONFIG_PATH,
+    PooledSession,
+)
+from prosper_api.single_flight import SingleFlight
+from prosper_api.streaming import stream_results
 
 logger = logging.getLogger()
 
+_Response = TypeVar("_Response", bound=BaseModel)
+
+
+def _sort_and_page_params(
+    request: Union[ListNotesRequest, ListOrdersRequest, ListLoansRequest]
+) -> dict:
+    return {
+        "sort_by": f"{request.sort_by} {request.sort_dir}",
+        "offset": request.offset,
+        "limit": request.limit,
+    }
+
+
+def _list_payments_params(request: ListPaymentsRequest) -> dict:
+    return {
+        "loan_number": _list_val(request.loan_number),
+        "transaction_effective_date": request.transaction_effective_date,
+        "offset": request.offset,
+        "limit": request.limit,
+    }
+
+
+_DEFAULT_CHUNK_MAX_TRIES = 3
+
+_listing_key = attrgetter("listing_number")
+_note_key = attrgetter("loan_note_id")
+_order_key = attrgetter("order_id")
+_loan_key = attrgetter("loan_number")
+_payment_key = attrgetter("loan_number", "match_back_id", "transaction_id")
+
+
+def _chunk_loan_numbers(
+    loan_numbers: Iterable[int], max_length: int
+) -> Iterator[List[int]]:
+    chunk = []
+    length = 0
+    for loan_number in dict.fromkeys(loan_numbers):
+        # Each loan number is followed by a comma, which is URL-encoded as "%2C".
+        loan_number_length = len(str(loan_number)) + 3
+        if chunk and length + loan_number_length > max_length:
+            yield chunk
+            chunk = []
+            length = 0
+        chunk.append(loan_number)
+        length += loan_number_length
+    if chunk:
+        yield chunk
+
+
+def _is_client_error(e: Exception) -> bool:
+    # Retrying won't fix a bad request, but throttled chunks may still get through.
+    status_code = getattr(getattr(e, "response", None), "status_code", None)
+    return status_code is not None and 400 <= status_code < 500 and status_code != 429
+
+
+def _order_payload(listing_id: int, amount: Union[float, Decimal]) -> dict:
+    return {"bid_requests": [{"listing_id": listing_id, "bid_amount": amount}]}
+
+
+class _BaseClient:
+    """Behavior shared by the synchronous and asynchronous clients."""
+
+    _config: Config
+    _scheduler: PriorityScheduler
+    _max_retries: int
+    _cache: Optional[ResponseCache]
+    _single_flight: SingleFlight
+    _trusted_parsing: bool
+
+    _ACCOUNT_API_URL = "https://api.prosper.com/v1/accounts/prosper/"
+    _SEARCH_API_URL = "https://api.prosper.com/listingsvc/v2/listings/"
+    _NOTES_API_URL = "https://api.prosper.com/v1/notes/"
+    _ORDERS_API_URL = "https://api.prosper.com/v1/orders/"
+    _LOANS_API_URL = "https://api.prosper.com/v1/loans/"
+    _PAYMENTS_API_URL = "https://api.prosper.com/loans/payments"
+
+    _CACHE_ENDPOINTS = {
+        _ACCOUNT_API_URL: ACCOUNT_ENDPOINT,
+        _SEARCH_API_URL: LISTINGS_ENDPOINT,
+        _NOTES_API_URL: NOTES_ENDPOINT,
+        _ORDERS_API_URL: ORDERS_ENDPOINT,
+        _LOANS_API_URL: LOANS_ENDPOINT,
+        _PAYMENTS_API_URL: PAYMENTS_ENDPOINT,
+    }
+
+    _SEARCH_MAX_PAGE_SIZE = 500
+    _NOTES_MAX_PAGE_SIZE = 25
+    _ORDERS_MAX_PAGE_SIZE = 25
+    _LOANS_MAX_PAGE_SIZE = 25
+    _PAYMENTS_MAX_PAGE_SIZE = 25
+    # Keeps the URL of each bulk payments request well inside common server limits.
+    _PAYMENTS_MAX_LOAN_NUMBERS_LENGTH = 1500
+    # The number of bytes read from the socket at a time by the streaming methods.
+    _STREAM_CHUNK_SIZE = 64 * 1024
+
+    _has_warned_about_floats = False
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """The rate limiter that API calls made by this client wait on.
+
+        Returns:
+            RateLimiter: The rate limiter, e.g. to inspect the ``remaining`` budget.
+        """
+        return self._scheduler.rate_limiter
+
+    @property
+    def _max_concurrency(self) -> int:
+        # Bulk fetches use no more threads than there are pooled connections.
+        return int(
+            self._config.get_as_decimal(
+                _POOL_MAXSIZE_CONFIG_PATH, Decimal(_DEFAULT_POOL_MAXSIZE)
+            )
+        )
+
+    @property
+    def scheduler(self) -> PriorityScheduler:
+        """The scheduler that orders this client's API calls by priority.
+
+        Orders are sent first, then listing searches and account lookups, then bulk
+        reads such as listing notes or payments.
+
+        Returns:
+            PriorityScheduler: The scheduler, e.g. to inspect per-lane ``stats()``.
+        """
+        return self._scheduler
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        """The cache of responses from the read-only endpoints, if it's enabled.
+
+        The cache is cleared whenever an order is placed, so account and order data
+        never go stale after a trade.
+
+        Returns:
+            Optional[ResponseCache]: The cache, e.g. to inspect its ``stats()``, or
+                None if caching isn't enabled.
+        """
+        return self._cache
+
+    def _parse(
+        self,
+        response_type: Type[_Response],
+        raw: bytes,
+        fields: Optional[Sequence[str]],
+    ) -> _Response:
+        return parse_response(response_type, raw, fields, self._trusted_parsing)
+
+    def _cached_response(self, url: str, params: dict) -> Optional[bytes]:
+        if self._cache is None:
+            return None
+        return self._cache.get(self._CACHE_ENDPOINTS.get(url, url), params)
+
+    def _cache_generation(self) -> Optional[int]:
+        return None if self._cache is None else self._cache.generation
+
+    def _cache_response(
+        self, url: str, params: dict, response: bytes, generation: Optional[int]
+    ):
+        if self._cache is not None:
+            self._cache.put(
+                self._CACHE_ENDPOINTS.get(url, url), params, response, generation
+            )
 
-def _bool_val(val: bool, default=None):
-    if val is True:
-        return "true"
-    if val is False:
-        return "false"
-    if val is None:
-        return default
+    def _invalidate_cache(self):
+        if self._cache is not None:
+            self._cache.clear()
+
+    @staticmethod
+    def _with_fields(list_page: Callable, fields: Optional[Sequence[str]]) -> Callable:
+        # Passes the projection on to each page, for the paginated methods.
+        return list_page if fields is None else partial(list_page, fields=fields)
+
+    def _should_retry(self, method: str, url: str, response, attempt: int) -> bool:
+        # Feeds the outcome of each call back to the rate limiter. Throttled GETs are
+        # safe to repeat, so they are retried once the limiter allows; other
+        # throttled calls raise the HTTP error to the caller.
+        if response.status_code != 429:
+            self.rate_limiter.succeeded()
+            return False
+
+        self.rate_limiter.throttled(
+            _parse_retry_after(response.headers.get("Retry-After"))
+        )
+        if method != "GET" or attempt >= self._max_retries:
+            return False
 
-    raise ValueError(f"Unexpected type {type(val)}")
+        logger.debug(f"Throttled by the API; retrying {method} {url}")
+        return True
 
+    def _check_for_floats(self, values: dict):
+        for val in values.values():
+            if isinstance(val, float):
+                self._warn_about_floats()
 
-def _list_val(val: List[object]):
-    return ",".join(str(v) for v in val) if val else None
+    def _warn_about_floats(self):
+        if not self._has_warned_about_floats:
+            logger.warning(
+                "WARNING: Floating point numbers are not recommended for representing currency values due to their inexact representation of fractional values. You are strongly recommended to use Decimals instead. See https://stackoverflow.com/a/3730040/303601 for more info."
+            )
+            self._has_warned_about_floats = True  # pragma: no mutate
 
 
-class Client:
+class Client(_BaseClient):
     """Main client for calling Prosper APIs.
 
     This client supports most of the operations supported by the Prosper API.
@@ -52,18 +292,17 @@ class Client:
 
             client = Client()
 
-        The list APIs support pagination using the ``limit`` and ``offset`` parameters:
+        The client owns a pool of keep-alive connections; use it as a context manager,
+        or call ``close()``, to release them when done:
 
-            loans = []
-            offset = 0
-            while True:
-                response = client.list_loans(ListLoansRequest(limit=25, offset=offset))
-                loans += response.result
-                offset += 25
-                if len(loans) >= response.total_count or len(response.result) < 25:
-                    break
+            with Client() as client:
+                account = client.get_account_info()
 
-            logger.info(pprint(loans))
+        The list APIs support pagination using the ``limit`` and ``offset`` parameters.
+        The ``iter_*`` methods page through every result for you:
+
+            for loan in client.iter_loans():
+                logger.info(pprint(loan))
 
     Notes:
         * The filters in the ``search_listings()`` method are incomplete.
@@ -74,38 +313,97 @@ class Client:
         https://developers.prosper.com/docs/investor/
     """
 
-    _config: Config
     _auth_token_manager: AuthTokenManager
-
-    _ACCOUNT_API_URL = "https://api.prosper.com/v1/accounts/prosper/"
-    _SEARCH_API_URL = "https://api.prosper.com/listingsvc/v2/listings/"
-    _NOTES_API_URL = "https://api.prosper.com/v1/notes/"
-    _ORDERS_API_URL = "https://api.prosper.com/v1/orders/"
-    _LOANS_API_URL = "https://api.prosper.com/v1/loans/"
-    _PAYMENTS_API_URL = "https://api.prosper.com/loans/payments"
-
-    _has_warned_about_floats = False
+    _session: requests.Session
 
     def __init__(
         self,
         config: Optional[Config] = None,
         auth_token_manager: Optional[AuthTokenManager] = None,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
     ):
         """Constructs an instance of the Client class.
 
         Args:
             config (Optional[Config]): Config instance to use.
             auth_token_manager (Optional[AuthTokenManager]): A pre-configured
-                AuthTokenManager. Omit to use the default one.
+                AuthTokenManager. Omit to use the default one, which renews the token
+                in the background if ``prosper-api.auth.refresh-margin`` is set.
+            session (Optional[requests.Session]): A pre-configured session to send
+                requests through. Omit to use a connection pool configured from
+                ``config``, which is owned and closed by the client.
+            rate_limiter (Optional[RateLimiter]): The rate limiter to wait on before
+                each call. Omit to share the process-wide limiter for the configured
+                budget.
+            cache (Optional[ResponseCache]): The cache to serve repeated reads from.
+                Omit to create one from ``config``, if caching is enabled there.
         """
         if config is None:
             config = Config.autoconfig("prosper-api")
 
+        self._owns_session = session is None
+        if session is None:
+            session = PooledSession.from_config(config)
+
+        self._owns_auth_token_manager = auth_token_manager is None
         if auth_token_manager is None:
-            auth_token_manager = AuthTokenManager(config)
+            auth_token_manager = AuthTokenManager(config, session=session)
+            if _refresh_margin_from_config(config) > 0:
+                auth_token_manager.start_background_refresh()
+
+        if rate_limiter is None:
+            rate_limiter = shared_rate_limiter(config)
+
+        if cache is None:
+            cache = ResponseCache.from_config(config)
 
         self._config = config
         self._auth_token_manager = auth_token_manager
+        self._session = session
+        self._scheduler = PriorityScheduler.from_config(rate_limiter, config)
+        self._max_retries = _max_retries_from_config(config)
+        self._cache = cache
+        self._single_flight = SingleFlight()
+        self._trusted_parsing = _trusted_parsing_from_config(config)
+
+    def __enter__(self) -> "Client":
+        """Enters the client's context.
+
+        Returns:
+            Client: This client.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ):
+        """Exits the client's context, closing its connection pool.
+
+        Args:
+            exc_type (Optional[Type[BaseException]]): The type of the exception raised
+                in the context, if any.
+            exc_val (Optional[BaseException]): The exception raised in the context, if
+                any.
+            exc_tb (Optional[TracebackType]): The traceback of the exception raised in
+                the context, if any.
+        """
+        self.close()
+
+    def close(self):
+        """Closes the resources owned by this client.
+
+        The connection pool is closed, and the auth token is no longer renewed in the
+        background.
+        """
+        if self._owns_auth_token_manager:
+            self._auth_token_manager.stop_background_refresh()
+        if self._owns_session:
+            self._session.close()
 
     def get_account_info(self) -> Account:
         """Get the account metadata.
@@ -116,144 +414,206 @@ class Client:
         See Also:
             https://developers.prosper.com/docs/investor/accounts-api/
         """
-        resp = self._do_get(
+        return Account.model_validate_json(self.get_account_info_raw())
+
+    def get_account_info_raw(self) -> bytes:
+        """Get the account metadata, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``Account.model_validate_json``.
+
+        Returns:
+            bytes: The JSON response body.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/accounts-api/
+        """
+        return self._do_get(
             self._ACCOUNT_API_URL,
             {},
+            priority=RequestPriority.SEARCH,
         )
-        return Account.model_validate_json(resp)
 
     def search_listings(
-        self, request: Union[SearchListingsRequest, None]
+        self,
+        request: Union[SearchListingsRequest, SearchListingsQuery, None],
+        fields: Optional[Sequence[str]] = None,
     ) -> SearchListingsResponse:
         """Search the Prosper listings.
 
         Args:
-            request (Union[SearchListingsRequest, None]): Configures the search, sort, and
-                pagination parameters.
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search, sort, and pagination parameters. Pass a
+                ``SearchListingsQuery`` to encode a repeated search only once.
+            fields (Optional[Sequence[str]]): The fields of each result to decode,
+                e.g. ``["listing_number", "lender_yield"]``; fields of nested
+                models are dotted. Omit to decode every field.
 
         Returns:
             SearchListingsResponse: Holds the search results as well as pagination
                 information.
 
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        return self._parse(
+            SearchListingsResponse, self.search_listings_raw(request), fields
+        )
+
+    def search_listings_raw(
+        self,
+        request: Union[SearchListingsRequest, SearchListingsQuery, None],
+    ) -> bytes:
+        """Search the Prosper listings, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``SearchListingsResponse.model_validate_json``.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search, sort, and pagination parameters. Pass a
+                ``SearchListingsQuery`` to encode a repeated search only once.
+
+        Returns:
+            bytes: The JSON response body.
+
         See Also:
             https://developers.prosper.com/docs/investor/listings-api/
         """
         if request is None:
             request = SearchListingsRequest()
 
-        resp = self._do_get(
+        return self._do_get(
             self._SEARCH_API_URL,
-            {
-                "sort_by": f"{request.sort_by} {request.sort_dir}",
-                "offset": request.offset,
-                "limit": request.limit,
-                "biddable": _bool_val(request.biddable, "true"),
-                "invested": _bool_val(request.invested),
-                "amount_funded_min": request.amount_funded_min,
-                "amount_funded_max": request.amount_funded_max,
-                "amount_remaining_min": request.amount_remaining_min,
-                "amount_remaining_max": request.amount_remaining_max,
-                "borrower_rate_min": request.borrower_rate_min,
-                "borrower_rate_max": request.borrower_rate_max,
-                "borrower_state": request.borrower_state,
-                "dti_wprosper_loan_min": request.dti_wprosper_loan_min,
-                "dti_wprosper_loan_max": request.dti_wprosper_loan_max,
-                "employment_status_description": _list_val(
-                    request.employment_status_description
-                ),
-                "estimated_monthly_housing_expense_min": request.estimated_monthly_housing_expense_min,
-                "estimated_monthly_housing_expense_max": request.estimated_monthly_housing_expense_max,
-                "fico_score": _list_val(request.fico_score),
-                "has_mortgage": request.has_mortgage,
-                "income_range": _list_val(request.income_range),
-                "lender_yield_min": request.lender_yield_min,
-                "lender_yield_max": request.lender_yield_max,
-                "listing_amount_min": request.listing_amount_min,
-                "listing_amount_max": request.listing_amount_max,
-                "listing_category_id": _list_val(request.listing_category_id),
-                "listing_creation_date_min": request.listing_creation_date_min,
-                "listing_creation_date_max": request.listing_creation_date_max,
-                "listing_end_date_min": request.listing_end_date_min,
-                "listing_end_date_max": request.listing_end_date_max,
-                "listing_monthly_payment_min": request.listing_monthly_payment_min,
-                "listing_monthly_payment_max": request.listing_monthly_payment_max,
-                "listing_number": _list_val(request.listing_number),
-                "listing_start_date_min": request.listing_start_date_min,
-                "listing_start_date_max": request.listing_start_date_max,
-                "listing_status": request.listing_status,
-                "listing_term": _list_val(request.listing_term),
-                "loan_origination_date_min": request.loan_origination_date_min,
-                "loan_origination_date_max": request.loan_origination_date_max,
-                "months_employed_min": request.months_employed_min,
-                "months_employed_max": request.months_employed_max,
-                "occupation": _list_val(request.occupation),
-                "partial_funding_indicator": _bool_val(
-                    request.partial_funding_indicator
-                ),
-                "percent_funded_min": request.percent_funded_min,
-                "percent_funded_max": request.percent_funded_max,
-                "prior_prosper_loans_min": request.prior_prosper_loans_min,
-                "prior_prosper_loans_max": request.prior_prosper_loans_max,
-                "prior_prosper_loans_active_min": request.prior_prosper_loans_active_min,
-                "prior_prosper_loans_active_max": request.prior_prosper_loans_active_max,
-                "prior_prosper_loans_balance_outstanding_min": request.prior_prosper_loans_balance_outstanding_min,
-                "prior_prosper_loans_balance_outstanding_max": request.prior_prosper_loans_balance_outstanding_max,
-                "prior_prosper_loans_cycles_billed_min": request.prior_prosper_loans_cycles_billed_min,
-                "prior_prosper_loans_cycles_billed_max": request.prior_prosper_loans_cycles_billed_max,
-                "prior_prosper_loans_late_cycles_min": request.prior_prosper_loans_late_cycles_min,
-                "prior_prosper_loans_late_cycles_max": request.prior_prosper_loans_late_cycles_max,
-                "prior_prosper_loans_late_payments_one_month_plus_min": request.prior_prosper_loans_late_payments_one_month_plus_min,
-                "prior_prosper_loans_late_payments_one_month_plus_max": request.prior_prosper_loans_late_payments_one_month_plus_max,
-                "prior_prosper_loans_ontime_payments_min": request.prior_prosper_loans_ontime_payments_min,
-                "prior_prosper_loans_ontime_payments_max": request.prior_prosper_loans_ontime_payments_max,
-                "prior_prosper_loans_principal_borrowed_min": request.prior_prosper_loans_principal_borrowed_min,
-                "prior_prosper_loans_principal_borrowed_max": request.prior_prosper_loans_principal_borrowed_max,
-                "prior_prosper_loans_principal_outstanding_min": request.prior_prosper_loans_principal_outstanding_min,
-                "prior_prosper_loans_principal_outstanding_max": request.prior_prosper_loans_principal_outstanding_max,
-                "prosper_rating": _list_val(request.prosper_rating),
-                "prosper_score_min": request.prosper_score_min,
-                "prosper_score_max": request.prosper_score_max,
-                "stated_monthly_income_min": request.stated_monthly_income_min,
-                "stated_monthly_income_max": request.stated_monthly_income_max,
-                "verification_stage_min": request.verification_stage_min,
-                "verification_stage_max": request.verification_stage_max,
-                "whole_loan_end_date_min": request.whole_loan_end_date_min,
-                "whole_loan_end_date_max": request.whole_loan_end_date_max,
-                "whole_loan_start_date_min": request.whole_loan_start_date_min,
-                "whole_loan_start_date_max": request.whole_loan_start_date_max,
-                "co_borrower_application": _bool_val(request.co_borrower_application),
-                "combined_dti_wprosper_loan_min": request.combined_dti_wprosper_loan_min,
-                "combined_dti_wprosper_loan_max": request.combined_dti_wprosper_loan_max,
-                "combined_stated_monthly_income_min": request.combined_stated_monthly_income_min,
-                "combined_stated_monthly_income_max": request.combined_stated_monthly_income_max,
-            },
+            _search_listings_params(request),
+            priority=RequestPriority.SEARCH,
+        )
+
+    def stream_listings(
+        self,
+        request: Union[SearchListingsRequest, SearchListingsQuery, None] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Listing]:
+        """Search the Prosper listings, yielding each listing as it arrives.
+
+        The page is parsed as the response arrives, so the first listing is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search, sort, and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Listing: Each of the listings on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        if request is None:
+            request = SearchListingsRequest()
+
+        yield from stream_results(
+            self._do_stream(
+                self._SEARCH_API_URL,
+                _search_listings_params(request),
+                priority=RequestPriority.SEARCH,
+            ),
+            Listing,
+            fields,
         )
-        return SearchListingsResponse.model_validate_json(resp)
 
-    def list_notes(self, request: ListNotesRequest = None) -> ListNotesResponse:
+    def search_listings_batch(
+        self, request: Union[SearchListingsRequest, SearchListingsQuery, None] = None
+    ) -> ListingBatch:
+        """Search the Prosper listings, returning one page of results in columnar form.
+
+        The response is decoded straight into typed arrays, without validating each
+        listing as a model, which is much faster for scoring large pages.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search, sort, and pagination parameters.
+
+        Returns:
+            ListingBatch: The listings on the requested page.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        return ListingBatch.from_response(self.search_listings_raw(request))
+
+    def list_notes(
+        self, request: ListNotesRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> ListNotesResponse:
         """List notes in the account.
 
         Args:
             request (ListNotesRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
 
         Returns:
             ListNotesResponse: Holds the list results and pagination information.
 
+        See Also:
+            https://developers.prosper.com/docs/investor/notes-api/
+        """
+        return self._parse(ListNotesResponse, self.list_notes_raw(request), fields)
+
+    def list_notes_raw(self, request: ListNotesRequest = None) -> bytes:
+        """List notes in the account, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``ListNotesResponse.model_validate_json``.
+
+        Args:
+            request (ListNotesRequest): Configures the sort and pagination parameters.
+
+        Returns:
+            bytes: The JSON response body.
+
         See Also:
             https://developers.prosper.com/docs/investor/notes-api/
         """
         if request is None:
             request = ListNotesRequest()
 
-        resp = self._do_get(
-            self._NOTES_API_URL,
-            {
-                "sort_by": f"{request.sort_by} {request.sort_dir}",
-                "offset": request.offset,
-                "limit": request.limit,
-            },
+        return self._do_get(self._NOTES_API_URL, _sort_and_page_params(request))
+
+    def stream_notes(
+        self, request: ListNotesRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Note]:
+        """List notes in the account, yielding each note as it arrives.
+
+        The page is parsed as the response arrives, so the first note is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (ListNotesRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Note: Each of the notes on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/notes-api/
+        """
+        if request is None:
+            request = ListNotesRequest()
+
+        yield from stream_results(
+            self._do_stream(self._NOTES_API_URL, _sort_and_page_params(request)),
+            Note,
+            fields,
         )
-        return ListNotesResponse.model_validate_json(resp)
 
     def order(
         self,
@@ -272,103 +632,653 @@ class Client:
         See Also
             https://developers.prosper.com/docs/investor/orders-api/#submit_new_order
         """
-        resp = self._do_post(
-            self._ORDERS_API_URL,
-            {"bid_requests": [{"listing_id": listing_id, "bid_amount": amount}]},
-        )
+        resp = self._do_post(self._ORDERS_API_URL, _order_payload(listing_id, amount))
+        self._invalidate_cache()
         return Order.model_validate_json(resp)
 
-    def list_orders(self, request: ListOrdersRequest = None) -> ListOrdersResponse:
+    def list_orders(
+        self, request: ListOrdersRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> ListOrdersResponse:
         """Lists orders in the account.
 
         Args:
             request (ListOrdersRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
 
         Returns:
             ListOrdersResponse: Holds the list results and pagination information.
 
+        See Also:
+            https://developers.prosper.com/docs/investor/orders-api/#get_order_details
+        """
+        return self._parse(ListOrdersResponse, self.list_orders_raw(request), fields)
+
+    def list_orders_raw(self, request: ListOrdersRequest = None) -> bytes:
+        """List orders in the account, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``ListOrdersResponse.model_validate_json``.
+
+        Args:
+            request (ListOrdersRequest): Configures the sort and pagination parameters.
+
+        Returns:
+            bytes: The JSON response body.
+
         See Also:
             https://developers.prosper.com/docs/investor/orders-api/#get_order_details
         """
         if request is None:
             request = ListOrdersRequest()
 
-        resp = self._do_get(
-            self._ORDERS_API_URL,
-            query_params={
-                "sort_by": f"{request.sort_by} {request.sort_dir}",
-                "offset": request.offset,
-                "limit": request.limit,
-            },
+        return self._do_get(
+            self._ORDERS_API_URL, query_params=_sort_and_page_params(request)
+        )
+
+    def stream_orders(
+        self, request: ListOrdersRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Order]:
+        """List orders in the account, yielding each order as it arrives.
+
+        The page is parsed as the response arrives, so the first order is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (ListOrdersRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Order: Each of the orders on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/orders-api/#get_order_details
+        """
+        if request is None:
+            request = ListOrdersRequest()
+
+        yield from stream_results(
+            self._do_stream(
+                self._ORDERS_API_URL, query_params=_sort_and_page_params(request)
+            ),
+            Order,
+            fields,
         )
-        return ListOrdersResponse.model_validate_json(resp)
 
-    def list_loans(self, request: ListLoansRequest = None) -> ListLoansResponse:
+    def list_loans(
+        self, request: ListLoansRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> ListLoansResponse:
         """Lists loans associated with the account.
 
         Args:
             request (ListLoansRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
 
         Returns:
             ListLoansResponse: Holds the list results and pagination information.
 
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        return self._parse(ListLoansResponse, self.list_loans_raw(request), fields)
+
+    def list_loans_raw(self, request: ListLoansRequest = None) -> bytes:
+        """List the account's loans, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``ListLoansResponse.model_validate_json``.
+
+        Args:
+            request (ListLoansRequest): Configures the sort and pagination parameters.
+
+        Returns:
+            bytes: The JSON response body.
+
         See Also:
             https://developers.prosper.com/docs/investor/loans-api/
         """
         if request is None:
             request = ListLoansRequest()
 
-        resp = self._do_get(
-            self._LOANS_API_URL,
-            query_params={
-                "sort_by": f"{request.sort_by} {request.sort_dir}",
-                "offset": request.offset,
-                "limit": request.limit,
-            },
+        return self._do_get(
+            self._LOANS_API_URL, query_params=_sort_and_page_params(request)
+        )
+
+    def stream_loans(
+        self, request: ListLoansRequest = None, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Loan]:
+        """List the account's loans, yielding each loan as it arrives.
+
+        The page is parsed as the response arrives, so the first loan is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (ListLoansRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Loan: Each of the loans on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        if request is None:
+            request = ListLoansRequest()
+
+        yield from stream_results(
+            self._do_stream(
+                self._LOANS_API_URL, query_params=_sort_and_page_params(request)
+            ),
+            Loan,
+            fields,
         )
-        return ListLoansResponse.model_validate_json(resp)
 
-    def list_payments(self, request: ListPaymentsRequest) -> ListPaymentsResponse:
+    def list_payments(
+        self, request: ListPaymentsRequest, fields: Optional[Sequence[str]] = None
+    ) -> ListPaymentsResponse:
         """Lists loans payments for the given loans.
 
         Args:
             request (ListPaymentsRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
 
         Returns:
             ListPaymentsResponse: Holds the list results and pagination information.
 
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        return self._parse(
+            ListPaymentsResponse, self.list_payments_raw(request), fields
+        )
+
+    def list_payments_raw(self, request: ListPaymentsRequest) -> bytes:
+        """List payments for the given loans, returning the raw response body.
+
+        Nothing is parsed, so archival and relay pipelines skip the parse cost
+        entirely. Parse the body later with
+        ``ListPaymentsResponse.model_validate_json``.
+
+        Args:
+            request (ListPaymentsRequest): Configures the sort and pagination parameters.
+
+        Returns:
+            bytes: The JSON response body.
+
         See Also:
             https://developers.prosper.com/docs/investor/loans-api/
         """
         resp = self._do_get(
-            self._PAYMENTS_API_URL,
-            query_params={
-                "loan_number": _list_val(request.loan_number),
-                "transaction_effective_date": request.transaction_effective_date,
-                "offset": request.offset,
-                "limit": request.limit,
-            },
+            self._PAYMENTS_API_URL, query_params=_list_payments_params(request)
         )
         logger.debug(resp)
-        return ListPaymentsResponse.model_validate_json(resp)
+        return resp
+
+    def stream_payments(
+        self, request: ListPaymentsRequest, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Payment]:
+        """List payments for the given loans, yielding each payment as it arrives.
+
+        The page is parsed as the response arrives, so the first payment is usable
+        before the rest of the page is received, and the page is never held in
+        memory all at once. Streamed pages aren't cached.
+
+        Args:
+            request (ListPaymentsRequest): Configures the sort and pagination parameters.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Payment: Each of the payments on the requested page, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        yield from stream_results(
+            self._do_stream(
+                self._PAYMENTS_API_URL, query_params=_list_payments_params(request)
+            ),
+            Payment,
+            fields,
+        )
+
+    def iter_listings(
+        self,
+        request: Union[SearchListingsRequest, SearchListingsQuery, None] = None,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Listing]:
+        """Iterates over every listing matching the search.
+
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search and sort parameters. ``offset`` and ``limit`` set the
+                starting point and page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode,
+                e.g. ``["listing_number", "lender_yield"]``; fields of nested
+                models are dotted. Omit to decode every field.
+
+        Yields:
+            Listing: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        if request is None:
+            request = SearchListingsRequest()
+
+        yield from paginate(
+            self._with_fields(self.search_listings, fields),
+            request,
+            self._SEARCH_MAX_PAGE_SIZE,
+            prefetch,
+        )
+
+    def iter_notes(
+        self,
+        request: Optional[ListNotesRequest] = None,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Note]:
+        """Iterates over every note in the account.
 
-    def _do_get(self, url, query_params=None):
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (Optional[ListNotesRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Note: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/notes-api/
+        """
+        if request is None:
+            request = ListNotesRequest()
+
+        yield from paginate(
+            self._with_fields(self.list_notes, fields),
+            request,
+            self._NOTES_MAX_PAGE_SIZE,
+            prefetch,
+        )
+
+    def iter_orders(
+        self,
+        request: Optional[ListOrdersRequest] = None,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Order]:
+        """Iterates over every order in the account.
+
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (Optional[ListOrdersRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Order: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/orders-api/#get_order_details
+        """
+        if request is None:
+            request = ListOrdersRequest()
+
+        yield from paginate(
+            self._with_fields(self.list_orders, fields),
+            request,
+            self._ORDERS_MAX_PAGE_SIZE,
+            prefetch,
+        )
+
+    def iter_loans(
+        self,
+        request: Optional[ListLoansRequest] = None,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Loan]:
+        """Iterates over every loan associated with the account.
+
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (Optional[ListLoansRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Loan: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        if request is None:
+            request = ListLoansRequest()
+
+        yield from paginate(
+            self._with_fields(self.list_loans, fields),
+            request,
+            self._LOANS_MAX_PAGE_SIZE,
+            prefetch,
+        )
+
+    def iter_payments(
+        self,
+        request: ListPaymentsRequest,
+        prefetch: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Payment]:
+        """Iterates over every payment for the given loans.
+
+        Pages through the results lazily, using the largest page size the API allows,
+        so memory use stays flat however many results there are.
+
+        Args:
+            request (ListPaymentsRequest): Configures the loans and transaction date to
+                list payments for. ``offset`` and ``limit`` set the starting point and
+                page size.
+            prefetch (int): The number of pages to download ahead of the one being
+                consumed, so processing and I/O overlap; 0 to download each page when
+                it's needed.
+            fields (Optional[Sequence[str]]): The fields of each result to decode.
+                Omit to decode every field.
+
+        Yields:
+            Payment: Each result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        yield from paginate(
+            self._with_fields(self.list_payments, fields),
+            request,
+            self._PAYMENTS_MAX_PAGE_SIZE,
+            prefetch,
+        )
+
+    def iter_payments_for_loans(
+        self,
+        loan_numbers: Iterable[int],
+        transaction_effective_date: Optional[str] = None,
+        max_tries: int = _DEFAULT_CHUNK_MAX_TRIES,
+    ) -> Iterator[Payment]:
+        """Iterates over every payment for any number of loans.
+
+        The loan numbers are split into chunks small enough to fit in a request URL.
+        The chunks are fetched concurrently within the rate limit, each paging through
+        its own results, and their payments are yielded as each chunk completes. A
+        chunk that fails is retried on its own, with exponential backoff, without
+        refetching the others.
+
+        Args:
+            loan_numbers (Iterable[int]): The loans to list payments for. Duplicates
+                are ignored.
+            transaction_effective_date (Optional[str]): Only list payments effective on
+                this date.
+            max_tries (int): The number of times to try each chunk before the error is
+                raised.
+
+        Yields:
+            Payment: Each result, grouped by chunk in the order the chunks complete.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+
+        @on_exception(
+            expo,
+            requests.RequestException,
+            max_tries=max_tries,
+            giveup=_is_client_error,
+        )
+        def fetch_chunk(chunk: List[int]) -> List[Payment]:
+            return list(
+                self.iter_payments(
+                    ListPaymentsRequest(
+                        loan_number=chunk,
+                        transaction_effective_date=transaction_effective_date,
+                    )
+                )
+            )
+
+        for payments in map_unordered(
+            fetch_chunk,
+            _chunk_loan_numbers(loan_numbers, self._PAYMENTS_MAX_LOAN_NUMBERS_LENGTH),
+            self._max_concurrency,
+        ):
+            yield from payments
+
+    def fetch_all_listings(
+        self, request: Union[SearchListingsRequest, SearchListingsQuery, None] = None
+    ) -> List[Listing]:
+        """Fetches every listing matching the search.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (Union[SearchListingsRequest, SearchListingsQuery, None]): Configures
+                the search and sort parameters. ``offset`` and ``limit`` set the
+                starting point and page size.
+
+        Returns:
+            List[Listing]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/listings-api/
+        """
+        if request is None:
+            request = SearchListingsRequest()
+
+        return fetch_all(
+            self.search_listings,
+            request,
+            self._SEARCH_MAX_PAGE_SIZE,
+            _listing_key,
+            self._max_concurrency,
+        )
+
+    def fetch_all_notes(self, request: Optional[ListNotesRequest] = None) -> List[Note]:
+        """Fetches every note in the account.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (Optional[ListNotesRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+
+        Returns:
+            List[Note]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/notes-api/
+        """
+        if request is None:
+            request = ListNotesRequest()
+
+        return fetch_all(
+            self.list_notes,
+            request,
+            self._NOTES_MAX_PAGE_SIZE,
+            _note_key,
+            self._max_concurrency,
+        )
+
+    def fetch_all_orders(
+        self, request: Optional[ListOrdersRequest] = None
+    ) -> List[Order]:
+        """Fetches every order in the account.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (Optional[ListOrdersRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+
+        Returns:
+            List[Order]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/orders-api/#get_order_details
+        """
+        if request is None:
+            request = ListOrdersRequest()
+
+        return fetch_all(
+            self.list_orders,
+            request,
+            self._ORDERS_MAX_PAGE_SIZE,
+            _order_key,
+            self._max_concurrency,
+        )
+
+    def fetch_all_loans(self, request: Optional[ListLoansRequest] = None) -> List[Loan]:
+        """Fetches every loan associated with the account.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (Optional[ListLoansRequest]): Configures the sort parameters.
+                ``offset`` and ``limit`` set the starting point and page size.
+
+        Returns:
+            List[Loan]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        if request is None:
+            request = ListLoansRequest()
+
+        return fetch_all(
+            self.list_loans,
+            request,
+            self._LOANS_MAX_PAGE_SIZE,
+            _loan_key,
+            self._max_concurrency,
+        )
+
+    def fetch_all_payments(self, request: ListPaymentsRequest) -> List[Payment]:
+        """Fetches every payment for the given loans.
+
+        Once the first page reveals the total count, the remaining pages are
+        requested concurrently within the rate limit. Results that move between pages
+        while they are being fetched are only returned once.
+
+        Args:
+            request (ListPaymentsRequest): Configures the loans and transaction date to
+                list payments for. ``offset`` and ``limit`` set the starting point and
+                page size.
+
+        Returns:
+            List[Payment]: Every result, in order.
+
+        See Also:
+            https://developers.prosper.com/docs/investor/loans-api/
+        """
+        return fetch_all(
+            self.list_payments,
+            request,
+            self._PAYMENTS_MAX_PAGE_SIZE,
+            _payment_key,
+            self._max_concurrency,
+        )
+
+    def _do_get(self, url, query_params=None, priority=RequestPriority.BULK):
         if query_params is None:
             query_params = {}
-        return self._do_request("GET", url, params=query_params)
+        cached = self._cached_response(url, query_params)
+        if cached is not None:
+            return cached
+        # Identical reads made at the same time share one call.
+        return self._single_flight.do(
+            _request_key(url, query_params),
+            lambda: self._fetch(url, query_params, priority),
+        )
 
-    def _do_post(self, url, data=None):
+    def _fetch(self, url, query_params, priority):
+        # An order placed while the read is in flight clears the cache, and the
+        # response from before it mustn't be cached again.
+        generation = self._cache_generation()
+        response = self._do_request("GET", url, params=query_params, priority=priority)
+        self._cache_response(url, query_params, response, generation)
+        return response
+
+    def _do_post(self, url, data=None, priority=RequestPriority.ORDER):
         if data is None:
             data = {}
-        return self._do_request("POST", url, data=data)
-
-    @on_exception(
-        expo,
-        RateLimitException,
-        max_tries=8,
-    )  # pragma: no mutate
-    @limits(calls=20, period=1)  # pragma: no mutate
-    def _do_request(self, method, url, params=None, data=None):
+        return self._do_request("POST", url, data=data, priority=priority)
+
+    def _do_stream(self, url, query_params, priority=RequestPriority.BULK):
+        # Streamed reads skip the cache and single flight, since the body is consumed
+        # as it arrives.
+        with self._send(
+            "GET", url, params=query_params, priority=priority, stream=True
+        ) as response:
+            yield from response.iter_content(self._STREAM_CHUNK_SIZE)
+
+    def _do_request(
+        self, method, url, params=None, data=None, priority=RequestPriority.BULK
+    ):
+        return self._send(
+            method, url, params=params, data=data, priority=priority
+        ).content
+
+    def _renew_rejected_token(self, auth_token, method, url):
+        logger.info(f"Auth token rejected; renewing it and replaying {method} {url}")
+        self._auth_token_manager.invalidate_token(auth_token)
+        return self._auth_token_manager.get_token()
+
+    def _send(
+        self,
+        method,
+        url,
+        params=None,
+        data=None,
+        priority=RequestPriority.BULK,
+        stream=False,
+    ):
         if params is None:
             params = {}
         if data is None:
@@ -377,30 +1287,35 @@ class Client:
         self._check_for_floats(data)
 
         auth_token = self._auth_token_manager.get_token()
-
-        logger.debug(f"API Call: {method} {url}; query: {params}; payload: {data}")
-
-        response = requests.request(
-            method,
-            url,
-            params=params,
-            json=data,
-            headers={
-                "Authorization": f"bearer {auth_token}",
-                "Accept": "application/json",
-            },
-        )
-        response.raise_for_status()
-        return response.text
-
-    def _check_for_floats(self, values: dict):
-        for val in values.values():
-            if isinstance(val, float):
-                self._warn_about_floats()
-
-    def _warn_about_floats(self):
-        if not self._has_warned_about_floats:
-            logger.warning(
-                "WARNING: Floating point numbers are not recommended for representing currency values due to their inexact representation of fractional values. You are strongly recommended to use Decimals instead. See https://stackoverflow.com/a/3730040/303601 for more info."
+        reauthenticated = False
+        for attempt in count():
+            self._scheduler.acquire(priority)
+
+            logger.debug(f"API Call: {method} {url}; query: {params}; payload: {data}")
+
+            response = self._session.request(
+                method,
+                url,
+                params=params,
+                json=data,
+                headers={
+                    "Authorization": f"bearer {auth_token}",
+                    "Accept": "application/json",
+                },
+                stream=stream,
             )
-            self._has_warned_about_floats = True  # pragma: no mutate
+            retry = self._should_retry(method, url, response, attempt)
+            if not retry and response.status_code == 401 and not reauthenticated:
+                # The token was revoked before it expired. It's renewed once and the
+                # rejected call replayed, which is safe even for orders.
+                reauthenticated = True
+                auth_token = self._renew_rejected_token(auth_token, method, url)
+                retry = auth_token is not None
+            if not retry:
+                break
+            if stream:
+                response.close()
+        if stream and not response.ok:
+            response.close()
+        response.raise_for_status()
+        return response
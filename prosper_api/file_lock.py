@@ -0,0 +1,95 @@
+"""Advisory file locks for coordinating processes on the same host."""
+import os
+from os import makedirs
+from os.path import dirname
+from types import TracebackType
+from typing import BinaryIO, Optional, Type
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+    import msvcrt
+    from time import sleep
+
+
+class FileLock:
+    """Exclusive lock on a file, held for the duration of a ``with`` block.
+
+    The file is created if it doesn't exist, and is opened for reading and writing
+    so the lock holder can keep shared state in it. The lock excludes other
+    processes as well as other ``FileLock`` instances in the same process.
+
+    Examples:
+        Safely update a counter shared by several processes:
+
+            with FileLock("/tmp/counter") as counter_file:
+                count = int(counter_file.read() or 0)
+                counter_file.seek(0)
+                counter_file.truncate()
+                counter_file.write(str(count + 1).encode())
+    """
+
+    def __init__(self, path: str):
+        """Creates a FileLock instance.
+
+        Args:
+            path (str): The file to lock.
+        """
+        self.path = path
+        self._file = None
+
+    def __enter__(self) -> BinaryIO:
+        """Blocks until the lock is acquired.
+
+        Returns:
+            BinaryIO: The locked file, positioned at the start.
+        """
+        makedirs(dirname(self.path) or ".", exist_ok=True)
+        self._file = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT), "r+b")
+        _lock(self._file)
+        return self._file
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ):
+        """Releases the lock.
+
+        Args:
+            exc_type (Optional[Type[BaseException]]): The type of the exception raised
+                in the block, if any.
+            exc_val (Optional[BaseException]): The exception raised in the block, if
+                any.
+            exc_tb (Optional[TracebackType]): The traceback of the exception raised in
+                the block, if any.
+        """
+        self._file.flush()
+        _unlock(self._file)
+        self._file.close()
+        self._file = None
+
+
+if fcntl is not None:
+
+    def _lock(file: BinaryIO):
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(file: BinaryIO):
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+else:  # pragma: no cover
+
+    def _lock(file: BinaryIO):
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                sleep(0.001)
+
+    def _unlock(file: BinaryIO):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
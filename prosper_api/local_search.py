@@ -0,0 +1,219 @@
+"""Evaluating listing searches locally, against listings that were already fetched.
+
+A local search applies the filters, sort order and pagination of a
+``SearchListingsRequest`` to a batch of listings with array operations, so many
+variants of a search can be tried against one set of results without calling the
+API again. NumPy is installed with the '[numpy]' extra.
+"""
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Iterable, List, Sequence, Tuple, Union
+
+from prosper_api.batch import (
+    _ENUM_CODES,
+    DATE_COLUMNS,
+    ENUM_COLUMNS,
+    MISSING_CODE,
+    NUMERIC_COLUMNS,
+    ListingBatch,
+    _timestamp,
+)
+from prosper_api.models import Listing, SearchListingsRequest
+from prosper_api.models.enums import SortOrder
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
+
+_MIN_SUFFIX = "_min"
+_MAX_SUFFIX = "_max"
+_SORT_AND_PAGINATION_FIELDS = ("sort_by", "sort_dir", "offset", "limit")
+_FILTER_DATE_FORMAT = "%Y-%m-%d"
+
+_MIN = "min"
+_MAX = "max"
+_IN = "in"
+_EQUALS = "equals"
+_UNSUPPORTED = "unsupported"
+
+_COLUMNS = {"listing_number", *NUMERIC_COLUMNS, *DATE_COLUMNS, *ENUM_COLUMNS}
+
+
+def _filter(name: str) -> Tuple[str, str, str]:
+    # Maps a request field to how it's applied, and the column it's applied to.
+    if name.endswith(_MIN_SUFFIX):
+        kind, column = _MIN, name[: -len(_MIN_SUFFIX)]
+    elif name.endswith(_MAX_SUFFIX):
+        kind, column = _MAX, name[: -len(_MAX_SUFFIX)]
+    elif SearchListingsRequest.model_fields[name].annotation in (
+        bool,
+        Union[bool, None],
+    ):
+        kind, column = _EQUALS, name
+    else:
+        kind, column = _IN, name
+    # The whole loan dates aren't part of a listing, so they can't be checked here.
+    return (kind if column in _COLUMNS else _UNSUPPORTED), name, column
+
+
+_FILTERS = [
+    _filter(name)
+    for name in SearchListingsRequest.model_fields
+    if name not in _SORT_AND_PAGINATION_FIELDS
+]
+
+
+def _date_bound(value: str, kind: str) -> float:
+    # Dates without a time cover the whole day, in UTC, like the API's filters.
+    try:
+        day = datetime.strptime(value, _FILTER_DATE_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return _timestamp(value)
+    if kind == _MAX:
+        day += timedelta(days=1, seconds=-1)
+    return day.timestamp()
+
+
+def _bound(column: str, value: Any, kind: str) -> float:
+    if column in DATE_COLUMNS:
+        return _date_bound(value, kind)
+    return float(value)
+
+
+def _members(column: str, values: List[Any]) -> List[Any]:
+    if column in ENUM_COLUMNS:
+        return [_ENUM_CODES[column][value] for value in values]
+    return [value.value if isinstance(value, Enum) else value for value in values]
+
+
+class LocalListingSearch:
+    """Searches a fixed set of listings the way the API's listing search does.
+
+    Every min/max, list and boolean filter of a ``SearchListingsRequest`` is applied
+    with one array operation over all the listings, rather than by checking each
+    listing in turn. Listings missing a filtered value never match, and sort last
+    in either direction. Enum fields sort in the order their members are declared,
+    e.g. ``prosper_rating`` from ``NA`` to ``AA``. Listings that sort equally keep
+    the order they were given in.
+
+    Attributes:
+        batch (ListingBatch): The listings to search, as columns.
+        listings (Union[Sequence[Listing], None]): The listings to return from
+            ``search``, in the same order as the batch.
+    """
+
+    batch: ListingBatch
+    listings: Union[Sequence[Listing], None]
+
+    def __init__(
+        self, batch: ListingBatch, listings: Union[Sequence[Listing], None] = None
+    ):
+        """Creates a LocalListingSearch instance.
+
+        No more listings can be added to the batch once it's being searched.
+
+        Args:
+            batch (ListingBatch): The listings to search.
+            listings (Union[Sequence[Listing], None]): The listing models in the
+                batch, in the same order; needed for ``search`` but not ``matches``.
+        """
+        self.batch = batch
+        self.listings = listings
+        self._arrays = batch.to_numpy()
+
+    @classmethod
+    def from_listings(cls, listings: Iterable[Listing]) -> "LocalListingSearch":
+        """Creates a search over listing models, e.g. from ``Client.iter_listings``.
+
+        Args:
+            listings (Iterable[Listing]): The listings to search.
+
+        Returns:
+            LocalListingSearch: The search.
+        """
+        listings = list(listings)
+        return cls(ListingBatch.from_listings(listings), listings)
+
+    def matches(
+        self, request: Union[SearchListingsRequest, None] = None
+    ) -> "numpy.ndarray":
+        """Finds the listings matching a request.
+
+        Args:
+            request (Union[SearchListingsRequest, None]): The filters, sort order,
+                and pagination to apply.
+
+        Returns:
+            numpy.ndarray: The positions of the matching listings in the batch, in
+                sorted order.
+
+        Raises:
+            ValueError: If the request filters on the whole loan dates, which
+                listings don't include.
+        """
+        import numpy  # noqa: autoimport
+
+        if request is None:
+            request = SearchListingsRequest()
+
+        mask = numpy.ones(len(self.batch), dtype=bool)
+        for kind, name, column in _FILTERS:
+            value = getattr(request, name)
+            if value is None:
+                continue
+            if kind == _UNSUPPORTED:
+                raise ValueError(f"Can't filter listings on '{name}' locally")
+            values = self._arrays[column]
+            if kind == _MIN:
+                mask &= values >= _bound(column, value, kind)
+            elif kind == _MAX:
+                mask &= values <= _bound(column, value, kind)
+            elif kind == _EQUALS:
+                mask &= values == float(value)
+            elif value:
+                # Like the API, an empty list doesn't filter anything.
+                mask &= numpy.isin(values, _members(column, value))
+
+        indices = numpy.flatnonzero(mask)
+        keys = self._arrays[request.sort_by.value][indices].astype(numpy.float64)
+        if request.sort_by.value in ENUM_COLUMNS:
+            keys[keys == MISSING_CODE] = numpy.nan
+        if request.sort_dir == SortOrder.DESCENDING:
+            keys = -keys
+        indices = indices[numpy.argsort(keys, kind="stable")]
+
+        start = request.offset or 0
+        end = None if request.limit is None else start + request.limit
+        return indices[start:end]
+
+    def listing_numbers(
+        self, request: Union[SearchListingsRequest, None] = None
+    ) -> List[int]:
+        """Finds the listing numbers matching a request.
+
+        Args:
+            request (Union[SearchListingsRequest, None]): The filters, sort order,
+                and pagination to apply.
+
+        Returns:
+            List[int]: The matching listing numbers, in sorted order.
+        """
+        return self._arrays["listing_number"][self.matches(request)].tolist()
+
+    def search(
+        self, request: Union[SearchListingsRequest, None] = None
+    ) -> List[Listing]:
+        """Finds the listings matching a request.
+
+        Args:
+            request (Union[SearchListingsRequest, None]): The filters, sort order,
+                and pagination to apply.
+
+        Returns:
+            List[Listing]: The matching listings, in sorted order.
+
+        Raises:
+            ValueError: If the search was created without the listing models.
+        """
+        if self.listings is None:
+            raise ValueError("Created without listings; use 'matches' instead")
+        return [self.listings[index] for index in self.matches(request)]
@@ -0,0 +1,363 @@
+"""Paging through the results of the list APIs."""
+import asyncio
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    TypeVar,
+    Union,
+)
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+_Request = TypeVar("_Request", bound=BaseModel)
+_Response = TypeVar("_Response", bound=BaseModel)
+_Item = TypeVar("_Item")
+_Result = TypeVar("_Result")
+
+
+def paginate(
+    list_page: Callable[[_Request], _Response],
+    request: _Request,
+    max_page_size: int,
+    prefetch: int = 0,
+) -> Iterator[BaseModel]:
+    """Lazily yields every result of a list API, one page at a time.
+
+    Pages are requested as the results are consumed, starting at ``request.offset``,
+    so only one page is held in memory at once. With ``prefetch``, a background
+    thread reads ahead so the next pages download while the caller works through
+    the current one; at most ``prefetch`` pages wait in the buffer.
+
+    Args:
+        list_page (Callable[[_Request], _Response]): Fetches one page of results, e.g.
+            ``Client.list_notes``.
+        request (_Request): The filter and sort parameters. ``limit`` sets the page
+            size, up to ``max_page_size``; omit it to use the largest page size.
+        max_page_size (int): The largest page size the API allows.
+        prefetch (int): The number of pages to read ahead; 0 to only request a page
+            once the previous one has been consumed.
+
+    Yields:
+        BaseModel: Each result, in the order returned by the API.
+    """
+    pages = _pages(list_page, request, max_page_size)
+    if prefetch > 0:
+        pages = _read_ahead(pages, prefetch)
+    for page in pages:
+        yield from page.result
+
+
+async def paginate_async(
+    list_page: Callable[[_Request], Awaitable[_Response]],
+    request: _Request,
+    max_page_size: int,
+    prefetch: int = 0,
+) -> AsyncIterator[BaseModel]:
+    """Lazily yields every result of an async list API, one page at a time.
+
+    Args:
+        list_page (Callable[[_Request], Awaitable[_Response]]): Fetches one page of
+            results, e.g. ``AsyncClient.list_notes``.
+        request (_Request): The filter and sort parameters. ``limit`` sets the page
+            size, up to ``max_page_size``; omit it to use the largest page size.
+        max_page_size (int): The largest page size the API allows.
+        prefetch (int): The number of pages to read ahead in a background task; 0 to
+            only request a page once the previous one has been consumed.
+
+    Yields:
+        BaseModel: Each result, in the order returned by the API.
+    """
+    pages = _pages_async(list_page, request, max_page_size)
+    if prefetch > 0:
+        pages = _read_ahead_async(pages, prefetch)
+    async for page in pages:
+        for result in page.result:
+            yield result
+
+
+def fetch_all(
+    list_page: Callable[[_Request], _Response],
+    request: _Request,
+    max_page_size: int,
+    key: Callable[[BaseModel], Any],
+    max_workers: int,
+) -> List[BaseModel]:
+    """Fetches every result of a list API, requesting pages concurrently.
+
+    The first page reveals the total number of results; the remaining pages are then
+    requested concurrently, paced by the client's rate limit, and reassembled in
+    order. Records that shift onto a later page while the pages are being fetched
+    are only returned once.
+
+    Args:
+        list_page (Callable[[_Request], _Response]): Fetches one page of results, e.g.
+            ``Client.list_notes``.
+        request (_Request): The filter and sort parameters. ``limit`` sets the page
+            size, up to ``max_page_size``; omit it to use the largest page size.
+        max_page_size (int): The largest page size the API allows.
+        key (Callable[[BaseModel], Any]): Gets the value that identifies a result.
+        max_workers (int): The maximum number of pages to request at once.
+
+    Returns:
+        List[BaseModel]: Every result, in the order returned by the API.
+    """
+    first_request = _page_request(request, max_page_size)
+    first_page = list_page(first_request)
+    with ThreadPoolExecutor(max_workers) as executor:
+        pages = list(
+            executor.map(list_page, _remaining_page_requests(first_request, first_page))
+        )
+    return _merge_pages(first_request, [first_page, *pages], key)
+
+
+async def fetch_all_async(
+    list_page: Callable[[_Request], Awaitable[_Response]],
+    request: _Request,
+    max_page_size: int,
+    key: Callable[[BaseModel], Any],
+    max_workers: int,
+) -> List[BaseModel]:
+    """Fetches every result of an async list API, requesting pages concurrently.
+
+    Args:
+        list_page (Callable[[_Request], Awaitable[_Response]]): Fetches one page of
+            results, e.g. ``AsyncClient.list_notes``.
+        request (_Request): The filter and sort parameters. ``limit`` sets the page
+            size, up to ``max_page_size``; omit it to use the largest page size.
+        max_page_size (int): The largest page size the API allows.
+        key (Callable[[BaseModel], Any]): Gets the value that identifies a result.
+        max_workers (int): The maximum number of pages to request at once.
+
+    Returns:
+        List[BaseModel]: Every result, in the order returned by the API.
+    """
+    first_request = _page_request(request, max_page_size)
+    first_page = await list_page(first_request)
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def fetch(page_request: _Request) -> _Response:
+        async with semaphore:
+            return await list_page(page_request)
+
+    pages = await asyncio.gather(
+        *map(fetch, _remaining_page_requests(first_request, first_page))
+    )
+    return _merge_pages(first_request, [first_page, *pages], key)
+
+
+def map_unordered(
+    fn: Callable[[_Item], _Result], items: Iterable[_Item], max_workers: int
+) -> Iterator[_Result]:
+    """Applies a function to each item concurrently, yielding results as they finish.
+
+    No more than ``max_workers`` items are in flight at once, and items are only
+    taken from ``items`` as earlier ones finish, so memory use stays bounded however
+    many items there are. Outstanding work is cancelled if the caller stops early.
+
+    Args:
+        fn (Callable[[_Item], _Result]): The function to apply.
+        items (Iterable[_Item]): The items to apply it to.
+        max_workers (int): The maximum number of items to process at once.
+
+    Yields:
+        _Result: The result for each item, in the order they finish.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers) as executor:
+        pending = {executor.submit(fn, item) for item in islice(items, max_workers)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    for item in islice(items, 1):
+                        pending.add(executor.submit(fn, item))
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def map_unordered_async(
+    fn: Callable[[_Item], Awaitable[_Result]],
+    items: Iterable[_Item],
+    max_workers: int,
+) -> AsyncIterator[_Result]:
+    """Applies a coroutine function to each item concurrently, yielding as they finish.
+
+    Args:
+        fn (Callable[[_Item], Awaitable[_Result]]): The coroutine function to apply.
+        items (Iterable[_Item]): The items to apply it to.
+        max_workers (int): The maximum number of items to process at once.
+
+    Yields:
+        _Result: The result for each item, in the order they finish.
+    """
+    items = iter(items)
+    pending = {asyncio.ensure_future(fn(item)) for item in islice(items, max_workers)}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+                for item in islice(items, 1):
+                    pending.add(asyncio.ensure_future(fn(item)))
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _pages(
+    list_page: Callable[[_Request], _Response], request: _Request, max_page_size: int
+) -> Iterator[_Response]:
+    page_request = _page_request(request, max_page_size)
+    while page_request is not None:
+        page = list_page(page_request)
+        yield page
+        page_request = _next_page_request(page_request, page)
+
+
+async def _pages_async(
+    list_page: Callable[[_Request], Awaitable[_Response]],
+    request: _Request,
+    max_page_size: int,
+) -> AsyncIterator[_Response]:
+    page_request = _page_request(request, max_page_size)
+    while page_request is not None:
+        page = await list_page(page_request)
+        yield page
+        page_request = _next_page_request(page_request, page)
+
+
+class _Failure:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+_DONE = object()
+
+
+def _read_ahead(pages: Iterator[_Response], depth: int) -> Iterator[_Response]:
+    buffer = Queue(maxsize=depth)
+    stopped = Event()
+
+    def put(item) -> bool:
+        # Give up once the consumer has gone away, rather than blocking forever.
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for page in pages:
+                if not put(page):
+                    return
+            put(_DONE)
+        except Exception as e:
+            put(_Failure(e))
+
+    Thread(target=produce, name="prosper-api-prefetch", daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+
+
+async def _read_ahead_async(
+    pages: AsyncIterator[_Response], depth: int
+) -> AsyncIterator[_Response]:
+    buffer = asyncio.Queue(maxsize=depth)
+
+    async def produce():
+        try:
+            async for page in pages:
+                await buffer.put(page)
+            await buffer.put(_DONE)
+        except Exception as e:
+            await buffer.put(_Failure(e))
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        producer.cancel()
+
+
+def _page_request(request: _Request, max_page_size: int) -> _Request:
+    page_size = min(request.limit or max_page_size, max_page_size)
+    return request.model_copy(
+        update={"offset": request.offset or 0, "limit": page_size}
+    )
+
+
+def _next_page_request(request: _Request, page) -> Union[_Request, None]:
+    offset = request.offset + len(page.result)
+    # An empty page means the results shrank while paging; there's nothing left.
+    if not page.result or offset >= page.total_count:
+        return None
+    return request.model_copy(update={"offset": offset})
+
+
+def _remaining_page_requests(first_request: _Request, first_page) -> List[_Request]:
+    return [
+        first_request.model_copy(update={"offset": offset})
+        for offset in range(
+            first_request.offset + first_request.limit,
+            first_page.total_count,
+            first_request.limit,
+        )
+    ]
+
+
+def _merge_pages(
+    first_request: _Request, pages: list, key: Callable[[BaseModel], Any]
+) -> List[BaseModel]:
+    seen = set()
+    results = []
+    for page in pages:
+        for result in page.result:
+            result_key = key(result)
+            if result_key in seen:
+                continue
+            seen.add(result_key)
+            results.append(result)
+
+    expected_count = max(pages[0].total_count - first_request.offset, 0)
+    duplicate_count = sum(len(page.result) for page in pages) - len(results)
+    if duplicate_count:
+        logger.debug(f"Dropped {duplicate_count} results that moved between pages")
+    if len(results) != expected_count:
+        logger.warning(
+            f"Expected {expected_count} results but got {len(results)}; the results "
+            f"changed while they were being fetched"
+        )
+    return results
@@ -0,0 +1,217 @@
+"""Decoding only some of the fields of API results.
+
+A projection of a model has only the chosen fields, with the same types. Parsing a
+response into projections skips validating and allocating every other field,
+including nested models such as a listing's credit bureau values, which cuts the
+time and memory taken by each page.
+
+Responses can also be parsed in trusted mode, which builds the same models with
+minimal validation. It's opt-in: with pydantic 2, full validation runs in
+pydantic-core and is usually faster, as ``benchmarks/parse_responses.py`` shows.
+"""
+import logging
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import simplejson
+from prosper_shared.omni_config import Config, ConfigKey, SchemaType, config_schema
+from pydantic import BaseModel, create_model
+from schema import Optional
+
+logger = logging.getLogger(__name__)
+
+_Response = TypeVar("_Response", bound=BaseModel)
+
+_PROJECTION_SUFFIX = "Projection"
+_RESULT_FIELD = "result"
+
+_TRUSTED_CONFIG_PATH = "prosper-api.parsing.trusted"
+_STRICT_CONFIG_PATH = "prosper-api.parsing.strict"
+
+
+@config_schema
+def _schema() -> SchemaType:
+    return {
+        "prosper-api": {
+            "parsing": {
+                Optional(
+                    ConfigKey(
+                        "trusted",
+                        "Whether to build list responses with minimal validation. Usually slower than full validation with pydantic 2; measure with benchmarks/parse_responses.py first.",
+                    )
+                ): bool,
+                Optional(
+                    ConfigKey(
+                        "strict",
+                        "Debug switch to validate every response in full, even if trusted parsing is enabled.",
+                    )
+                ): bool,
+            }
+        }
+    }
+
+
+def _trusted_parsing_from_config(config: Config) -> bool:
+    return config.get_as_bool(_TRUSTED_CONFIG_PATH, False) and not config.get_as_bool(
+        _STRICT_CONFIG_PATH, False
+    )
+
+
+def project_model(
+    model_type: Type[BaseModel], fields: Iterable[str]
+) -> Type[BaseModel]:
+    """Creates a model with only some of the fields of another.
+
+    Projections are cached, so the same fields of a model always give the same type.
+
+    Args:
+        model_type (Type[BaseModel]): The model to project, e.g. ``Listing``.
+        fields (Iterable[str]): The fields to keep. Fields of nested models are
+            dotted, e.g. ``credit_bureau_values_transunion_indexed.fico_score``.
+
+    Returns:
+        Type[BaseModel]: The projected model, named after the model with a
+            ``Projection`` suffix.
+    """
+    return _project_model(model_type, tuple(fields))
+
+
+def parse_response(
+    response_type: Type[_Response],
+    raw: Union[str, bytes],
+    fields: Union[Iterable[str], None] = None,
+    trusted: bool = False,
+) -> _Response:
+    """Parses a list response, decoding only some fields of each result.
+
+    The response keeps its type and paging fields; each of its results is a
+    projection of the result model.
+
+    Args:
+        response_type (Type[_Response]): The response model, e.g.
+            ``SearchListingsResponse``.
+        raw (Union[str, bytes]): The JSON response body.
+        fields (Union[Iterable[str], None]): The fields of each result to decode.
+            Omit to decode every field.
+        trusted (bool): Whether to build the response without validating it, only
+            converting values the API doesn't send as the declared type, such as
+            enums and amounts. A response that can't be built that way is validated
+            in full instead.
+
+    Returns:
+        _Response: The parsed response.
+    """
+    if fields is not None:
+        response_type = _project_response(response_type, tuple(fields))
+    if trusted:
+        try:
+            return _builder(response_type)(simplejson.loads(raw, use_decimal=True))
+        except (ValueError, TypeError, ArithmeticError) as e:
+            logger.debug(f"Validating the {response_type.__name__} in full: {e!r}")
+    return response_type.model_validate_json(raw)
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _builder(model_type: Type[BaseModel]) -> Callable[[Dict[str, Any]], BaseModel]:
+    # Only fields that need converting are visited; the rest are used as decoded.
+    converters = []
+    for name, field in model_type.model_fields.items():
+        convert = _converter(field.annotation)
+        if convert is not None:
+            converters.append((name, convert))
+
+    def build(values: Dict[str, Any]) -> BaseModel:
+        for name, convert in converters:
+            if name in values:
+                values[name] = convert(values[name])
+        return model_type.model_construct(**values)
+
+    return build
+
+
+def _converter(annotation) -> Union[Callable[[Any], Any], None]:
+    if get_origin(annotation) is Union:
+        convert = _converter(
+            next(arg for arg in get_args(annotation) if arg is not type(None))
+        )
+        return convert and (lambda value: None if value is None else convert(value))
+    if get_origin(annotation) is list:
+        convert = _converter(get_args(annotation)[0])
+        return convert and (lambda values: [convert(value) for value in values])
+    if annotation is Decimal:
+        # Whole-number amounts are decoded as ints.
+        return lambda value: value if value.__class__ is Decimal else Decimal(value)
+    if annotation is int:
+        # Some numbers, e.g. a listing's channel_code, are sent as strings.
+        return lambda value: value if value.__class__ is int else int(value)
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return annotation
+    if _is_model(annotation):
+        return _builder(annotation)
+    return None
+
+
+@lru_cache(maxsize=None)
+def _project_model(
+    model_type: Type[BaseModel], fields: Tuple[str, ...]
+) -> Type[BaseModel]:
+    whole: Set[str] = set()
+    nested: Dict[str, List[str]] = {}
+    for path in fields:
+        name, _, rest = path.partition(".")
+        if name not in model_type.model_fields:
+            raise ValueError(f"'{model_type.__name__}' has no field '{name}'")
+        if rest:
+            nested.setdefault(name, []).append(rest)
+        else:
+            whole.add(name)
+
+    definitions = {}
+    for name, field in model_type.model_fields.items():
+        if name in whole:
+            definitions[name] = (field.annotation, field)
+        elif name in nested:
+            if not _is_model(field.annotation):
+                raise ValueError(f"'{model_type.__name__}.{name}' has no fields")
+            definitions[name] = (
+                _project_model(field.annotation, tuple(nested[name])),
+                field,
+            )
+    return create_model(
+        f"{model_type.__name__}{_PROJECTION_SUFFIX}",
+        __module__=__name__,
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=None)
+def _project_response(
+    response_type: Type[_Response], fields: Tuple[str, ...]
+) -> Type[_Response]:
+    # Results are the only field that changes; the paging fields are kept as they are.
+    result_type = response_type.model_fields[_RESULT_FIELD].annotation.__args__[0]
+    return create_model(
+        f"{response_type.__name__}{_PROJECTION_SUFFIX}",
+        __base__=response_type,
+        __module__=__name__,
+        result=(List[_project_model(result_type, fields)], ...),
+    )
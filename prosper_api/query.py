@@ -0,0 +1,160 @@
+"""Encoding search requests into API query parameters.
+
+The parameters are derived from the fields of ``SearchListingsRequest``, so new
+filters are sent without any changes here. A ``SearchListingsQuery`` encodes a
+request once, so pollers repeating the same search don't pay for it on every call.
+"""
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Mapping, Union, get_args, get_origin
+
+from prosper_api.models import SearchListingsRequest
+
+_Encoder = Callable[[SearchListingsRequest], Any]
+
+# Sent as-is, which is how the API has always received them.
+_UNENCODED_FIELDS = ("borrower_state", "has_mortgage", "listing_status")
+_SORT_FIELDS = ("sort_by", "sort_dir")
+_SORT_PARAM = "sort_by"
+
+
+def _bool_val(val: bool, default=None):
+    if val is True:
+        return "true"
+    if val is False:
+        return "false"
+    if val is None:
+        return default
+
+    raise ValueError(f"Unexpected type {type(val)}")
+
+
+def _list_val(val: List[object]):
+    return ",".join(str(v) for v in val) if val else None
+
+
+def _sort_val(request) -> str:
+    return f"{request.sort_by} {request.sort_dir}"
+
+
+def _encoder(name: str, annotation) -> _Encoder:
+    value = attrgetter(name)
+    if get_origin(annotation) is Union:
+        # Unwraps Optional[X] to X.
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if name in _UNENCODED_FIELDS:
+        return value
+    if annotation is bool:
+        return lambda request: _bool_val(value(request))
+    if get_origin(annotation) is list:
+        return lambda request: _list_val(value(request))
+    return value
+
+
+# The parameter each request field is sent as, and how to encode it.
+_FIELD_PARAMS: Dict[str, str] = {
+    name: _SORT_PARAM if name in _SORT_FIELDS else name
+    for name in SearchListingsRequest.model_fields
+}
+_PARAM_ENCODERS: Dict[str, _Encoder] = {
+    _SORT_PARAM: _sort_val,
+    **{
+        name: _encoder(name, field.annotation)
+        for name, field in SearchListingsRequest.model_fields.items()
+        if name not in _SORT_FIELDS
+    },
+}
+
+
+def _encode(request: SearchListingsRequest) -> Dict[str, Any]:
+    return {param: encode(request) for param, encode in _PARAM_ENCODERS.items()}
+
+
+def _search_listings_params(
+    request: Union[SearchListingsRequest, "SearchListingsQuery"]
+) -> Dict[str, Any]:
+    if isinstance(request, SearchListingsQuery):
+        return request.params
+    return _encode(request)
+
+
+class SearchListingsQuery:
+    """A listing search, encoded once into the query parameters sent to the API.
+
+    Use a query anywhere a ``SearchListingsRequest`` is accepted, e.g.
+    ``Client.search_listings`` or ``Client.iter_listings``. Its fields can be read
+    like the request's, and ``model_copy`` only re-encodes the fields that change,
+    such as ``offset`` or a date bound.
+
+    Attributes:
+        request (SearchListingsRequest): The search.
+        params (Dict[str, Any]): The encoded query parameters; don't modify them.
+    """
+
+    request: SearchListingsRequest
+    params: Dict[str, Any]
+
+    def __init__(self, request: Union[SearchListingsRequest, None] = None):
+        """Creates a SearchListingsQuery instance.
+
+        Args:
+            request (Union[SearchListingsRequest, None]): The search to encode.
+        """
+        self.request = SearchListingsRequest() if request is None else request
+        self.params = _encode(self.request)
+
+    def __getattr__(self, name: str) -> Any:
+        """Gets a field of the search.
+
+        Args:
+            name (str): The field name, e.g. ``offset``.
+
+        Returns:
+            Any: The field's value.
+
+        Raises:
+            AttributeError: If the query has no such field.
+        """
+        # Only fields are forwarded, so copying and pickling see the query itself.
+        if name not in SearchListingsRequest.model_fields:
+            raise AttributeError(name)
+        return getattr(self.request, name)
+
+    def __eq__(self, other: object) -> bool:
+        """Compares the searches of two queries.
+
+        Args:
+            other (object): The other query.
+
+        Returns:
+            bool: Whether both queries encode the same search.
+        """
+        return isinstance(other, SearchListingsQuery) and self.request == other.request
+
+    def __repr__(self) -> str:
+        """Gets the representation of the query.
+
+        Returns:
+            str: The representation, including the search.
+        """
+        return f"SearchListingsQuery({self.request!r})"
+
+    def model_copy(
+        self, *, update: Union[Mapping[str, Any], None] = None
+    ) -> "SearchListingsQuery":
+        """Copies the query with some fields changed, like ``BaseModel.model_copy``.
+
+        Only the changed fields are encoded again, and like ``model_copy`` their new
+        values aren't validated.
+
+        Args:
+            update (Union[Mapping[str, Any], None]): The new field values, by name.
+
+        Returns:
+            SearchListingsQuery: The new query.
+        """
+        copy = object.__new__(SearchListingsQuery)
+        copy.request = self.request.model_copy(update=update)
+        copy.params = dict(self.params)
+        for param in {_FIELD_PARAMS[name] for name in update or {}}:
+            copy.params[param] = _PARAM_ENCODERS[param](copy.request)
+        return copy
@@ -0,0 +1,475 @@
+"""Rate limiters that keep API calls within Prosper's request budget.
+
+Rather than failing fast and backing off, callers reserve a slot in the budget and
+sleep exactly until that slot becomes available. The budget adapts to the server:
+it shrinks when calls are throttled and slowly grows back as calls succeed.
+"""
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from email.utils import parsedate_to_datetime
+from os.path import join
+from threading import Lock
+from time import monotonic, sleep, time
+from typing import Iterator, Union
+
+from platformdirs import user_cache_dir
+from prosper_shared.omni_config import Config, ConfigKey, SchemaType, config_schema
+from schema import Optional, Regex
+
+from prosper_api.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+_CALLS_CONFIG_PATH = "prosper-api.rate-limit.calls"
+_PERIOD_CONFIG_PATH = "prosper-api.rate-limit.period"
+_BURST_CONFIG_PATH = "prosper-api.rate-limit.burst"
+_BACKEND_CONFIG_PATH = "prosper-api.rate-limit.backend"
+_STATE_FILE_CONFIG_PATH = "prosper-api.rate-limit.state-file"
+_THROTTLE_FACTOR_CONFIG_PATH = "prosper-api.rate-limit.throttle-factor"
+_RECOVERY_STEP_CONFIG_PATH = "prosper-api.rate-limit.recovery-step"
+_MAX_RETRIES_CONFIG_PATH = "prosper-api.rate-limit.max-retries"
+
+_DEFAULT_CALLS = 20
+_DEFAULT_PERIOD = 1
+_DEFAULT_BURST = 1
+_MEMORY_BACKEND = "memory"
+_FILE_BACKEND = "file"
+_DEFAULT_BACKEND = _MEMORY_BACKEND
+_DEFAULT_STATE_FILE_PATH = join(user_cache_dir("prosper-api"), "rate-limit")
+_DEFAULT_THROTTLE_FACTOR = 0.5
+_DEFAULT_RECOVERY_STEP = 0.01
+_DEFAULT_MAX_RETRIES = 5
+
+# The rate is never throttled below this fraction of the configured rate.
+_MIN_RATE_FRACTION = 0.05
+
+
+@config_schema
+def _schema() -> SchemaType:
+    return {
+        "prosper-api": {
+            "rate-limit": {
+                Optional(
+                    ConfigKey(
+                        "calls",
+                        "The number of API calls allowed per period.",
+                        default=_DEFAULT_CALLS,
+                    )
+                ): int,
+                Optional(
+                    ConfigKey(
+                        "period",
+                        "The length of the rate limit period, in seconds.",
+                        default=_DEFAULT_PERIOD,
+                    )
+                ): int,
+                Optional(
+                    ConfigKey(
+                        "burst",
+                        "The number of calls that can be made back-to-back after the budget has been idle.",
+                        default=_DEFAULT_BURST,
+                    )
+                ): int,
+                Optional(
+                    ConfigKey(
+                        "backend",
+                        "Where the rate limit budget is tracked. 'memory' shares it between clients in one process; 'file' shares it between all processes on the host that use the same state file.",
+                        default=_DEFAULT_BACKEND,
+                    )
+                ): Regex(f"^({_MEMORY_BACKEND}|{_FILE_BACKEND})$"),
+                Optional(
+                    ConfigKey(
+                        "state-file",
+                        "The file that holds the shared budget when using the 'file' backend.",
+                        default=_DEFAULT_STATE_FILE_PATH,
+                    )
+                ): str,
+                Optional(
+                    ConfigKey(
+                        "throttle-factor",
+                        "The factor the call rate is multiplied by each time the API responds with HTTP 429 (Too Many Requests).",
+                        default=_DEFAULT_THROTTLE_FACTOR,
+                    )
+                ): float,
+                Optional(
+                    ConfigKey(
+                        "recovery-step",
+                        "The fraction of the configured call rate regained after each call that isn't throttled.",
+                        default=_DEFAULT_RECOVERY_STEP,
+                    )
+                ): float,
+                Optional(
+                    ConfigKey(
+                        "max-retries",
+                        "The number of times a throttled GET request is retried before the error is raised.",
+                        default=_DEFAULT_MAX_RETRIES,
+                    )
+                ): int,
+            }
+        }
+    }
+
+
+class RateLimiter(ABC):
+    """A budget of API calls shared by everything that holds a reference to it."""
+
+    @abstractmethod
+    def reserve(self) -> float:
+        """Claims the next available call slot.
+
+        Returns:
+            float: The number of seconds the caller must wait before using the slot.
+        """
+
+    @property
+    @abstractmethod
+    def remaining(self) -> float:
+        """The number of calls that can currently be made without waiting."""
+
+    def acquire(self) -> float:
+        """Blocks until a call can be made within the budget.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            logger.debug(f"Rate limit reached; waiting {delay:.3f}s")
+            sleep(delay)
+        return delay
+
+    async def acquire_async(self) -> float:
+        """Waits, without blocking the event loop, until a call can be made.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            logger.debug(f"Rate limit reached; waiting {delay:.3f}s")
+            await asyncio.sleep(delay)
+        return delay
+
+    def throttled(self, retry_after: Union[float, None] = None):
+        """Reports that the server rejected a call for exceeding its rate limit.
+
+        Limiters that don't adapt to the server ignore this.
+
+        Args:
+            retry_after (Union[float, None]): The number of seconds the server asked
+                callers to wait, if it said.
+        """
+
+    def succeeded(self):
+        """Reports that a call was not throttled.
+
+        Limiters that don't adapt to the server ignore this.
+        """
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    """In-process token bucket.
+
+    Tokens are added continuously at ``calls / period`` per second, up to ``burst``.
+    Each call takes a token; when none is left, the caller is told exactly how long
+    until its token will have accrued, so throughput is smooth at the configured
+    ceiling and waiters are served in the order they arrived.
+
+    The rate adapts to the server: each throttled call multiplies it by
+    ``throttle_factor`` and pauses the bucket for any ``Retry-After`` period, and each
+    call that isn't throttled adds back ``recovery_step`` of the configured rate.
+    """
+
+    def __init__(
+        self,
+        calls: int = _DEFAULT_CALLS,
+        period: float = _DEFAULT_PERIOD,
+        burst: int = _DEFAULT_BURST,
+        throttle_factor: float = _DEFAULT_THROTTLE_FACTOR,
+        recovery_step: float = _DEFAULT_RECOVERY_STEP,
+    ):
+        """Creates a TokenBucketRateLimiter instance.
+
+        Args:
+            calls (int): The number of calls allowed per period.
+            period (float): The length of the period, in seconds.
+            burst (int): The maximum number of tokens that can accumulate while idle.
+            throttle_factor (float): The factor the rate is multiplied by when a call
+                is throttled.
+            recovery_step (float): The fraction of the configured rate regained after
+                each call that isn't throttled.
+        """
+        self._max_rate = calls / period
+        self._rate = self._max_rate
+        self._throttle_factor = throttle_factor
+        self._recovery_step = recovery_step
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated_at = self._now()
+        self._lock = Lock()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "TokenBucketRateLimiter":
+        """Creates a TokenBucketRateLimiter configured from `prosper-api.rate-limit`.
+
+        Args:
+            config (Config): A prosper-api config.
+
+        Returns:
+            TokenBucketRateLimiter: The configured rate limiter.
+        """
+        return cls(**_budget_from_config(config))
+
+    def reserve(self) -> float:
+        """Claims the next available call slot.
+
+        Returns:
+            float: The number of seconds the caller must wait before using the slot.
+        """
+        with self._state():
+            return self._take()
+
+    @property
+    def remaining(self) -> float:
+        """The number of calls that can currently be made without waiting."""
+        with self._state():
+            self._refill()
+            return max(self._tokens, 0)
+
+    @property
+    def rate(self) -> float:
+        """The number of calls per second currently allowed."""
+        with self._state():
+            return self._rate
+
+    def throttled(self, retry_after: Union[float, None] = None):
+        """Slows down after the server rejected a call for exceeding its rate limit.
+
+        Args:
+            retry_after (Union[float, None]): The number of seconds the server asked
+                callers to wait, if it said.
+        """
+        with self._state():
+            self._refill()
+            self._rate = max(
+                self._rate * self._throttle_factor, self._max_rate * _MIN_RATE_FRACTION
+            )
+            if retry_after:
+                # Hold back tokens so the next slot is no sooner than `retry_after`.
+                self._tokens = min(self._tokens, 1 - retry_after * self._rate)
+            logger.debug(
+                f"Throttled; slowing to {self._rate:.2f} calls/s"
+                + (f" after waiting {retry_after}s" if retry_after else "")
+            )
+
+    def succeeded(self):
+        """Speeds back up towards the configured rate after a call wasn't throttled."""
+        # Most calls run at the full rate, so they skip the lock and any shared state
+        # when there's nothing to recover. The rate is the one seen when the call's
+        # slot was reserved.
+        if self._rate < self._max_rate:
+            with self._state():
+                if self._rate < self._max_rate:
+                    self._refill()
+                    self._rate = min(
+                        self._rate + self._max_rate * self._recovery_step,
+                        self._max_rate,
+                    )
+
+    @contextmanager
+    def _state(self) -> Iterator[None]:
+        with self._lock:
+            yield
+
+    def _take(self) -> float:
+        self._refill()
+        self._tokens -= 1
+        return 0 if self._tokens >= 0 else -self._tokens / self._rate
+
+    def _refill(self):
+        now = self._now()
+        # Never let a clock that stepped backwards take tokens away.
+        elapsed = max(now - self._updated_at, 0)
+        self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    def _now(self) -> float:
+        return monotonic()
+
+
+class FileRateLimiter(TokenBucketRateLimiter):
+    """Token bucket shared by every process on the host that uses the same file.
+
+    The bucket is stored in ``path`` and updated under an exclusive file lock, so
+    any number of worker processes together stay within one budget. Slots are
+    handed out in the order the processes reserve them.
+    """
+
+    def __init__(
+        self,
+        path: str = _DEFAULT_STATE_FILE_PATH,
+        calls: int = _DEFAULT_CALLS,
+        period: float = _DEFAULT_PERIOD,
+        burst: int = _DEFAULT_BURST,
+        throttle_factor: float = _DEFAULT_THROTTLE_FACTOR,
+        recovery_step: float = _DEFAULT_RECOVERY_STEP,
+    ):
+        """Creates a FileRateLimiter instance.
+
+        Args:
+            path (str): The file holding the shared bucket. It is created if missing.
+            calls (int): The number of calls allowed per period.
+            period (float): The length of the period, in seconds.
+            burst (int): The maximum number of tokens that can accumulate while idle.
+            throttle_factor (float): The factor the rate is multiplied by when a call
+                is throttled.
+            recovery_step (float): The fraction of the configured rate regained after
+                each call that isn't throttled.
+        """
+        super().__init__(
+            calls=calls,
+            period=period,
+            burst=burst,
+            throttle_factor=throttle_factor,
+            recovery_step=recovery_step,
+        )
+        self.path = path
+
+    @classmethod
+    def from_config(cls, config: Config) -> "FileRateLimiter":
+        """Creates a FileRateLimiter configured from `prosper-api.rate-limit`.
+
+        Args:
+            config (Config): A prosper-api config.
+
+        Returns:
+            FileRateLimiter: The configured rate limiter.
+        """
+        return cls(
+            path=config.get_as_str(_STATE_FILE_CONFIG_PATH, _DEFAULT_STATE_FILE_PATH),
+            **_budget_from_config(config),
+        )
+
+    @contextmanager
+    def _state(self) -> Iterator[None]:
+        with self._lock, FileLock(self.path) as state_file:
+            loaded = self._load(state_file)
+            yield
+            # Reads such as `rate` leave the state as it was; the file is only
+            # rewritten when it changed.
+            if self._current_state() != loaded:
+                self._store(state_file)
+
+    def _load(self, state_file) -> Union[tuple, None]:
+        # Returns the state read, or None if a new budget was started.
+        try:
+            state = json.loads(state_file.read())
+            self._tokens = float(state["tokens"])
+            self._updated_at = float(state["updated_at"])
+            self._rate = min(float(state.get("rate", self._max_rate)), self._max_rate)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            logger.debug(f"Starting a new rate limit budget in {self.path}")
+            self._tokens = float(self._burst)
+            self._updated_at = self._now()
+            self._rate = self._max_rate
+            return None
+        return self._current_state()
+
+    def _current_state(self) -> tuple:
+        return self._tokens, self._updated_at, self._rate
+
+    def _store(self, state_file):
+        state_file.seek(0)
+        state_file.truncate()
+        state_file.write(
+            json.dumps(
+                {
+                    "tokens": self._tokens,
+                    "updated_at": self._updated_at,
+                    "rate": self._rate,
+                }
+            ).encode()
+        )
+
+    def _now(self) -> float:
+        # Processes need a common clock; `monotonic` isn't guaranteed to be one.
+        return time()
+
+
+def _budget_from_config(config: Config) -> dict:
+    return {
+        "calls": int(
+            config.get_as_decimal(_CALLS_CONFIG_PATH, Decimal(_DEFAULT_CALLS))
+        ),
+        "period": float(
+            config.get_as_decimal(_PERIOD_CONFIG_PATH, Decimal(_DEFAULT_PERIOD))
+        ),
+        "burst": int(
+            config.get_as_decimal(_BURST_CONFIG_PATH, Decimal(_DEFAULT_BURST))
+        ),
+        "throttle_factor": float(
+            config.get_as_decimal(
+                _THROTTLE_FACTOR_CONFIG_PATH, Decimal(str(_DEFAULT_THROTTLE_FACTOR))
+            )
+        ),
+        "recovery_step": float(
+            config.get_as_decimal(
+                _RECOVERY_STEP_CONFIG_PATH, Decimal(str(_DEFAULT_RECOVERY_STEP))
+            )
+        ),
+    }
+
+
+def _max_retries_from_config(config: Config) -> int:
+    return int(
+        config.get_as_decimal(_MAX_RETRIES_CONFIG_PATH, Decimal(_DEFAULT_MAX_RETRIES))
+    )
+
+
+def _parse_retry_after(value: Union[str, None]) -> Union[float, None]:
+    # `Retry-After` is either a number of seconds or an HTTP date.
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+_shared_rate_limiters = {}
+_shared_rate_limiters_lock = Lock()
+
+
+def shared_rate_limiter(config: Config) -> RateLimiter:
+    """Gets the process-wide rate limiter for the configured budget.
+
+    Clients created with equivalent config share one limiter, so together they stay
+    within the account's budget. With the 'file' backend, the limiter additionally
+    shares the budget with other processes using the same state file.
+
+    Args:
+        config (Config): A prosper-api config.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    if config.get_as_str(_BACKEND_CONFIG_PATH, _DEFAULT_BACKEND) == _FILE_BACKEND:
+        limiter = FileRateLimiter.from_config(config)
+        key = (limiter.path, limiter._max_rate, limiter._burst)
+    else:
+        limiter = TokenBucketRateLimiter.from_config(config)
+        key = (limiter._max_rate, limiter._burst)
+    with _shared_rate_limiters_lock:
+        return _shared_rate_limiters.setdefault(key, limiter)
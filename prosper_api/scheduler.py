@@ -0,0 +1,292 @@
+"""Priority scheduling of API calls within the rate limit budget.
+
+Calls are queued in lanes by priority. Each time a call slot becomes free it goes to
+the highest-priority waiting call, except that lower-priority lanes are guaranteed
+a minimum share of the slots so bulk work can't be starved indefinitely.
+"""
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+from threading import Condition
+from time import monotonic
+from typing import Dict, Union
+
+from prosper_shared.omni_config import Config, ConfigKey, SchemaType, config_schema
+from schema import Optional
+
+from prosper_api.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+_SEARCH_MIN_SHARE_CONFIG_PATH = "prosper-api.scheduler.search-min-share"
+_BULK_MIN_SHARE_CONFIG_PATH = "prosper-api.scheduler.bulk-min-share"
+
+_DEFAULT_SEARCH_MIN_SHARE = 0.2
+_DEFAULT_BULK_MIN_SHARE = 0.1
+
+
+@config_schema
+def _schema() -> SchemaType:
+    return {
+        "prosper-api": {
+            "scheduler": {
+                Optional(
+                    ConfigKey(
+                        "search-min-share",
+                        "The fraction of calls reserved for listing searches while orders are waiting.",
+                        default=_DEFAULT_SEARCH_MIN_SHARE,
+                    )
+                ): float,
+                Optional(
+                    ConfigKey(
+                        "bulk-min-share",
+                        "The fraction of calls reserved for bulk reads (notes, loans, orders, payments) while higher-priority calls are waiting.",
+                        default=_DEFAULT_BULK_MIN_SHARE,
+                    )
+                ): float,
+            }
+        }
+    }
+
+
+class RequestPriority(Enum):
+    """Scheduling classes for API calls, from most to least urgent."""
+
+    ORDER = 0
+    SEARCH = 1
+    BULK = 2
+
+
+@dataclass(frozen=True)
+class LaneStats:
+    """Point-in-time statistics for one priority lane.
+
+    Attributes:
+        depth (int): The number of calls currently waiting in the lane.
+        served (int): The number of calls that have been given a slot.
+        total_wait (float): The total seconds served calls spent waiting.
+        max_wait (float): The longest a served call has waited, in seconds.
+    """
+
+    depth: int
+    served: int
+    total_wait: float
+    max_wait: float
+
+    @property
+    def mean_wait(self) -> float:
+        """The mean seconds a served call spent waiting."""
+        return self.total_wait / self.served if self.served else 0.0
+
+
+class _Lane:
+    def __init__(self, min_share: float):
+        self.min_share = min_share
+        self.waiting = deque()
+        self.credit = 0.0
+        self.served = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def stats(self) -> LaneStats:
+        return LaneStats(
+            depth=len(self.waiting),
+            served=self.served,
+            total_wait=self.total_wait,
+            max_wait=self.max_wait,
+        )
+
+
+class PriorityScheduler:
+    """Orders calls waiting on a rate limiter by priority.
+
+    One call at a time waits on the rate limiter; the others queue in their lane and
+    the next slot goes to the most urgent of them. Every slot handed out earns each
+    waiting lane credit equal to its minimum share, and a lane with a full slot of
+    credit is served ahead of higher priorities. Lanes only earn credit while they
+    have calls waiting, so idle lanes can't bank slots for later.
+
+    The scheduler serves either threads or coroutines of a single event loop, not both.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        search_min_share: float = _DEFAULT_SEARCH_MIN_SHARE,
+        bulk_min_share: float = _DEFAULT_BULK_MIN_SHARE,
+    ):
+        """Creates a PriorityScheduler instance.
+
+        Args:
+            rate_limiter (RateLimiter): The budget the scheduled calls draw from.
+            search_min_share (float): The fraction of slots guaranteed to searches.
+            bulk_min_share (float): The fraction of slots guaranteed to bulk reads.
+        """
+        self.rate_limiter = rate_limiter
+        self._lanes = {
+            RequestPriority.ORDER: _Lane(0.0),
+            RequestPriority.SEARCH: _Lane(search_min_share),
+            RequestPriority.BULK: _Lane(bulk_min_share),
+        }
+        self._busy = False
+        self._condition = Condition()
+        self._async_condition = None
+
+    @classmethod
+    def from_config(
+        cls, rate_limiter: RateLimiter, config: Config
+    ) -> "PriorityScheduler":
+        """Creates a PriorityScheduler configured from `prosper-api.scheduler`.
+
+        Args:
+            rate_limiter (RateLimiter): The budget the scheduled calls draw from.
+            config (Config): A prosper-api config.
+
+        Returns:
+            PriorityScheduler: The configured scheduler.
+        """
+        return cls(
+            rate_limiter,
+            search_min_share=float(
+                config.get_as_decimal(
+                    _SEARCH_MIN_SHARE_CONFIG_PATH,
+                    Decimal(str(_DEFAULT_SEARCH_MIN_SHARE)),
+                )
+            ),
+            bulk_min_share=float(
+                config.get_as_decimal(
+                    _BULK_MIN_SHARE_CONFIG_PATH, Decimal(str(_DEFAULT_BULK_MIN_SHARE))
+                )
+            ),
+        )
+
+    def stats(self) -> Dict[RequestPriority, LaneStats]:
+        """Gets the queue depth and wait time statistics for each lane.
+
+        Returns:
+            Dict[RequestPriority, LaneStats]: The statistics, by lane.
+        """
+        with self._condition:
+            return {priority: lane.stats() for priority, lane in self._lanes.items()}
+
+    def acquire(self, priority: RequestPriority) -> float:
+        """Blocks until the call is given a slot in the rate limit budget.
+
+        Args:
+            priority (RequestPriority): The lane to queue the call in.
+
+        Returns:
+            float: The number of seconds spent waiting.
+
+        Raises:
+            BaseException: If the wait is interrupted, once the call has left the
+                queue.
+        """
+        ticket = _Ticket(priority)
+        with self._condition:
+            self._enqueue(ticket)
+            try:
+                self._condition.wait_for(lambda: self._is_turn(ticket))
+            except BaseException:
+                self._abandon(ticket)
+                self._condition.notify_all()
+                raise
+            self._start(ticket)
+        try:
+            self.rate_limiter.acquire()
+        finally:
+            with self._condition:
+                wait = self._finish(ticket)
+                self._condition.notify_all()
+        return wait
+
+    async def acquire_async(self, priority: RequestPriority) -> float:
+        """Waits, without blocking the event loop, until the call is given a slot.
+
+        Args:
+            priority (RequestPriority): The lane to queue the call in.
+
+        Returns:
+            float: The number of seconds spent waiting.
+
+        Raises:
+            BaseException: If the wait is cancelled, once the call has left the
+                queue.
+        """
+        if self._async_condition is None:
+            self._async_condition = asyncio.Condition()
+
+        ticket = _Ticket(priority)
+        async with self._async_condition:
+            with self._condition:
+                self._enqueue(ticket)
+            try:
+                await self._async_condition.wait_for(lambda: self._is_turn(ticket))
+            except BaseException:
+                with self._condition:
+                    self._abandon(ticket)
+                    self._condition.notify_all()
+                self._async_condition.notify_all()
+                raise
+            with self._condition:
+                self._start(ticket)
+        try:
+            await self.rate_limiter.acquire_async()
+        finally:
+            # Free the slot before waiting on the lock, so a second cancellation
+            # can't leave the scheduler busy.
+            with self._condition:
+                wait = self._finish(ticket)
+            async with self._async_condition:
+                self._async_condition.notify_all()
+        return wait
+
+    def _enqueue(self, ticket: "_Ticket"):
+        self._lanes[ticket.priority].waiting.append(ticket)
+
+    def _abandon(self, ticket: "_Ticket"):
+        # A call that stops waiting leaves its lane, and an idle lane banks no share.
+        lane = self._lanes[ticket.priority]
+        lane.waiting.remove(ticket)
+        if not lane.waiting:
+            lane.credit = 0.0
+
+    def _is_turn(self, ticket: "_Ticket") -> bool:
+        return not self._busy and self._next() is ticket
+
+    def _next(self) -> Union["_Ticket", None]:
+        waiting = [lane for lane in self._lanes.values() if lane.waiting]
+        # Allow for floating point error when adding up fractional credit.
+        owed = [lane for lane in waiting if lane.credit >= 1 - 1e-9]
+        lane = (owed or waiting)[0]
+        return lane.waiting[0]
+
+    def _start(self, ticket: "_Ticket"):
+        self._busy = True
+        for lane in self._lanes.values():
+            if lane.waiting:
+                lane.credit += lane.min_share
+        lane = self._lanes[ticket.priority]
+        lane.waiting.popleft()
+        lane.credit = max(lane.credit - 1, 0.0)
+        if not lane.waiting:
+            lane.credit = 0.0
+
+    def _finish(self, ticket: "_Ticket") -> float:
+        self._busy = False
+        wait = monotonic() - ticket.enqueued_at
+        lane = self._lanes[ticket.priority]
+        lane.served += 1
+        lane.total_wait += wait
+        lane.max_wait = max(lane.max_wait, wait)
+        logger.debug(f"{ticket.priority.name} call waited {wait:.3f}s")
+        return wait
+
+
+class _Ticket:
+    def __init__(self, priority: RequestPriority):
+        self.priority = priority
+        self.enqueued_at = monotonic()
@@ -0,0 +1,166 @@
+"""Pooled HTTP session used for all calls to Prosper.
+
+Reusing connections avoids a fresh TCP and TLS handshake on every API call, which
+otherwise dominates the latency of most Prosper requests.
+"""
+
+import logging
+from decimal import Decimal
+from threading import Lock
+from time import monotonic
+
+from prosper_shared.omni_config import Config, ConfigKey, SchemaType, config_schema
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from schema import Optional
+
+logger = logging.getLogger(__name__)
+
+_POOL_CONNECTIONS_CONFIG_PATH = "prosper-api.http.pool-connections"
+_POOL_MAXSIZE_CONFIG_PATH = "prosper-api.http.pool-maxsize"
+_POOL_BLOCK_CONFIG_PATH = "prosper-api.http.pool-block"
+_CONNECTION_LIFETIME_CONFIG_PATH = "prosper-api.http.connection-lifetime"
+
+_DEFAULT_POOL_CONNECTIONS = 4
+_DEFAULT_POOL_MAXSIZE = 10
+_DEFAULT_CONNECTION_LIFETIME = 300
+
+
+@config_schema
+def _schema() -> SchemaType:
+    return {
+        "prosper-api": {
+            "http": {
+                Optional(
+                    ConfigKey(
+                        "pool-connections",
+                        "The number of per-host connection pools to keep.",
+                        default=_DEFAULT_POOL_CONNECTIONS,
+                    )
+                ): int,
+                Optional(
+                    ConfigKey(
+                        "pool-maxsize",
+                        "The maximum number of keep-alive connections kept per host.",
+                        default=_DEFAULT_POOL_MAXSIZE,
+                    )
+                ): int,
+                Optional(
+                    ConfigKey(
+                        "pool-block",
+                        "Whether to wait for a free connection rather than opening an extra, non-pooled one when a host's pool is exhausted.",
+                    )
+                ): bool,
+                Optional(
+                    ConfigKey(
+                        "connection-lifetime",
+                        "The number of seconds pooled connections are reused before being recycled; 0 to reuse them indefinitely.",
+                        default=_DEFAULT_CONNECTION_LIFETIME,
+                    )
+                ): int,
+            }
+        }
+    }
+
+
+class PooledSession(Session):
+    """A keep-alive ``requests`` session with a bounded, recyclable connection pool.
+
+    The session is safe to share between the ``Client`` and the ``AuthTokenManager``.
+    Once the pool is older than the configured lifetime, it is replaced with a fresh
+    one before the next request so long-lived processes pick up DNS and load-balancer
+    changes.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = _DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = _DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        connection_lifetime: float = _DEFAULT_CONNECTION_LIFETIME,
+    ):
+        """Creates a PooledSession instance.
+
+        Args:
+            pool_connections (int): The number of per-host connection pools to keep.
+            pool_maxsize (int): The maximum number of connections kept per host.
+            pool_block (bool): Whether to block when a host's pool is exhausted.
+            connection_lifetime (float): Seconds before the pool is recycled; 0 to
+                disable recycling.
+        """
+        super().__init__()
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._connection_lifetime = connection_lifetime
+        self._lock = Lock()
+        self._mount_adapters()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "PooledSession":
+        """Creates a PooledSession configured from the `prosper-api.http` config.
+
+        Args:
+            config (Config): A prosper-api config.
+
+        Returns:
+            PooledSession: The configured session.
+        """
+        return cls(
+            pool_connections=int(
+                config.get_as_decimal(
+                    _POOL_CONNECTIONS_CONFIG_PATH, Decimal(_DEFAULT_POOL_CONNECTIONS)
+                )
+            ),
+            pool_maxsize=int(
+                config.get_as_decimal(
+                    _POOL_MAXSIZE_CONFIG_PATH, Decimal(_DEFAULT_POOL_MAXSIZE)
+                )
+            ),
+            pool_block=config.get_as_bool(_POOL_BLOCK_CONFIG_PATH),
+            connection_lifetime=float(
+                config.get_as_decimal(
+                    _CONNECTION_LIFETIME_CONFIG_PATH,
+                    Decimal(_DEFAULT_CONNECTION_LIFETIME),
+                )
+            ),
+        )
+
+    def request(self, method: str, url: str, *args, **kwargs) -> Response:
+        """Sends a request over the pool, recycling the pool first if it has expired.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to call.
+            *args: Passed through to ``requests.Session.request``.
+            **kwargs: Passed through to ``requests.Session.request``.
+
+        Returns:
+            Response: The response.
+        """
+        self._recycle_if_expired()
+        return super().request(method, url, *args, **kwargs)
+
+    def _mount_adapters(self):
+        adapter = HTTPAdapter(
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            pool_block=self._pool_block,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self._pool_created_at = monotonic()
+
+    def _recycle_if_expired(self):
+        if not self._connection_lifetime:
+            return
+
+        with self._lock:
+            if monotonic() - self._pool_created_at < self._connection_lifetime:
+                return
+
+            logger.debug("Connection pool lifetime exceeded; recycling connections")
+            expired_adapters = set(self.adapters.values())
+            self._mount_adapters()
+            for adapter in expired_adapters:
+                adapter.close()
@@ -0,0 +1,100 @@
+"""Coalescing of identical API calls that are in flight at the same time.
+
+When several threads or tasks make the same read at once, only the first goes out on
+the wire; the others wait for it and share its response. Unlike caching, this never
+returns a response that was received before the call was made.
+"""
+import asyncio
+import logging
+from threading import Event, Lock
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+_Result = TypeVar("_Result")
+
+
+class _Call:
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+    def outcome(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Shares the result of a call between every caller that makes it concurrently.
+
+    Calls are identified by a key. A caller whose key matches a call that's still in
+    flight waits for that call and receives its result, or its error, instead of
+    making the call again. Once the call completes, the next caller starts a new one.
+    """
+
+    def __init__(self):
+        """Creates a SingleFlight instance."""
+        self.coalesced = 0
+        self._lock = Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, asyncio.Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], _Result]) -> _Result:
+        """Calls ``fn``, unless a call with the same key is already in flight.
+
+        Args:
+            key (Hashable): Identifies the call.
+            fn (Callable[[], _Result]): Makes the call.
+
+        Returns:
+            _Result: The result of the call, which may have been made by another
+                thread. If the call failed, its error is raised to every caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                is_leader = False
+            else:
+                call = self._calls[key] = _Call()
+                is_leader = True
+
+        if is_leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            logger.debug(f"Waiting for in-flight call {key}")
+        return call.outcome()
+
+    async def do_async(
+        self, key: Hashable, fn: Callable[[], Awaitable[_Result]]
+    ) -> _Result:
+        """Awaits ``fn()``, unless a call with the same key is already in flight.
+
+        The call runs in its own task, so it carries on for the other callers if the
+        caller that started it is cancelled.
+
+        Args:
+            key (Hashable): Identifies the call.
+            fn (Callable[[], Awaitable[_Result]]): Makes the call.
+
+        Returns:
+            _Result: The result of the call, which may have been made by another task.
+        """
+        call = self._async_calls.get(key)
+        if call is not None:
+            self.coalesced += 1
+            logger.debug(f"Waiting for in-flight call {key}")
+        else:
+            call = self._async_calls[key] = asyncio.ensure_future(fn())
+            call.add_done_callback(lambda _: self._async_calls.pop(key, None))
+        return await asyncio.shield(call)
@@ -0,0 +1,272 @@
+"""Parsing the results of a list response as its body arrives.
+
+A list response is a JSON object whose ``result`` array holds the page of results.
+Parsing it as a whole waits for the last byte, then holds the text and every parsed
+result in memory at once. Streaming hands each result over as soon as its closing
+brace arrives, and only buffers the result being received.
+"""
+import codecs
+import json
+import re
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from pydantic import BaseModel
+
+from prosper_api.projection import project_model
+
+_Result = TypeVar("_Result", bound=BaseModel)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_BRACKETS = "{}[]"
+# Everything up to the next bracket or unterminated string, including whole strings.
+# Written so that each character can only be matched one way, which keeps the
+# backtracking over an unterminated string linear. Only used for text with escapes.
+_BETWEEN_BRACKETS = re.compile(r'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*')
+# The rest of a string, up to its closing quote or a backslash that ends the text.
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*')
+# The end of a number, true, false or null.
+_SCALAR = re.compile(r"[^,\]} \t\n\r]*")
+_RESULT_KEY = "result"
+
+_decoder = json.JSONDecoder()
+
+# What the parser expects next.
+_OBJECT = "object"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_AFTER_VALUE = "after value"
+_RESULTS = "results"
+_FIRST_RESULT = "first result"
+_RESULT = "result"
+_AFTER_RESULT = "after result"
+_DONE = "done"
+
+
+def stream_results(
+    chunks: Iterable[bytes],
+    result_type: Type[_Result],
+    fields: Union[Iterable[str], None] = None,
+) -> Iterator[_Result]:
+    """Parses each result of a list response as the body arrives.
+
+    Args:
+        chunks (Iterable[bytes]): The response body, in the chunks it arrives in.
+        result_type (Type[_Result]): The model of each result, e.g. ``Note``.
+        fields (Union[Iterable[str], None]): The fields of each result to decode.
+            Omit to decode every field.
+
+    Yields:
+        _Result: Each result, in order.
+    """
+    if fields is not None:
+        result_type = project_model(result_type, fields)
+    parser = _ResultParser()
+    for chunk in chunks:
+        for result in parser.feed(chunk):
+            yield result_type.model_validate_json(result)
+    parser.close()
+
+
+async def stream_results_async(
+    chunks: AsyncIterable[bytes],
+    result_type: Type[_Result],
+    fields: Union[Iterable[str], None] = None,
+) -> AsyncIterator[_Result]:
+    """Parses each result of a list response as the body arrives.
+
+    Args:
+        chunks (AsyncIterable[bytes]): The response body, in the chunks it arrives
+            in.
+        result_type (Type[_Result]): The model of each result, e.g. ``Note``.
+        fields (Union[Iterable[str], None]): The fields of each result to decode.
+            Omit to decode every field.
+
+    Yields:
+        _Result: Each result, in order.
+    """
+    if fields is not None:
+        result_type = project_model(result_type, fields)
+    parser = _ResultParser()
+    async for chunk in chunks:
+        for result in parser.feed(chunk):
+            yield result_type.model_validate_json(result)
+    parser.close()
+
+
+class _ResultParser:
+    # Splits a list response into the JSON text of each result. Everything outside
+    # the result array, e.g. the paging fields, is skipped. Results are only
+    # delimited, by tracking brackets and strings; pydantic parses their text.
+
+    def __init__(self):
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+        self._buffer = ""
+        self._pos = 0
+        self._state = _OBJECT
+        self._key = None
+        # How far into the value at `_pos` has been scanned, and what was open there.
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+        # Where each bracket next appears in the buffer; stale below the scan.
+        self._next_brackets = dict.fromkeys(_BRACKETS, -1)
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[str]:
+        self._buffer = self._buffer[self._pos :] + self._decode(chunk, final)
+        self._pos = 0
+        self._next_brackets = dict.fromkeys(_BRACKETS, -1)
+        results: List[str] = []
+        while self._step(results, final):
+            pass
+        return results
+
+    def close(self):
+        # A complete response ends with the closing brace of the object, so no result
+        # can be left over once the body has ended.
+        self.feed(b"", final=True)
+        if self._state is not _DONE:
+            raise json.JSONDecodeError(
+                "Incomplete list response", self._buffer, self._pos
+            )
+
+    def _step(self, results: List[str], final: bool) -> bool:
+        pos = _WHITESPACE.match(self._buffer, self._pos).end()
+        self._pos = pos
+        if pos == len(self._buffer):
+            return False
+
+        char = self._buffer[pos]
+        state = self._state
+        if state is _OBJECT and char == "{":
+            self._state = _KEY
+        elif state is _KEY and char == "}":
+            self._state = _DONE
+        elif state is _KEY and char == '"':
+            end = self._value_end(pos, final)
+            if end is None:
+                return False
+            self._key = _decoder.decode(self._buffer[pos:end])
+            self._state = _COLON
+            pos = end - 1
+        elif state is _COLON and char == ":":
+            self._state = _RESULTS if self._key == _RESULT_KEY else _VALUE
+        elif state is _VALUE:
+            end = self._value_end(pos, final)
+            if end is None:
+                return False
+            # Only checked; paging fields are small and never needed.
+            _decoder.decode(self._buffer[pos:end])
+            self._state = _AFTER_VALUE
+            pos = end - 1
+        elif state is _AFTER_VALUE and char in ",}":
+            self._state = _KEY if char == "," else _DONE
+        elif state is _RESULTS and char == "[":
+            self._state = _FIRST_RESULT
+        elif state is _FIRST_RESULT and char == "]":
+            self._state = _AFTER_VALUE
+        elif state in (_FIRST_RESULT, _RESULT):
+            end = self._value_end(pos, final)
+            if end is None:
+                return False
+            results.append(self._buffer[pos:end])
+            self._state = _AFTER_RESULT
+            pos = end - 1
+        elif state is _AFTER_RESULT and char in ",]":
+            self._state = _RESULT if char == "," else _AFTER_VALUE
+        else:
+            raise json.JSONDecodeError(
+                f"Expected {state} in list response", self._buffer, pos
+            )
+        self._pos = pos + 1
+        return True
+
+    def _value_end(self, pos: int, final: bool) -> Union[int, None]:
+        # Finds the end of the value starting at pos, or None if it hasn't all
+        # arrived yet. Scanning picks up where the last chunk left off, so each
+        # character is only scanned once however many chunks a value spans.
+        buffer = self._buffer
+        if buffer[pos] not in '{["':
+            # A value that runs to the end of the buffer may be a number that
+            # continues in the next chunk.
+            end = _SCALAR.match(buffer, pos).end()
+            return None if end == len(buffer) and not final else end
+
+        if self._scanned:
+            scan = pos + self._scanned
+        else:
+            self._in_string = buffer[pos] == '"'
+            self._depth = 0 if self._in_string else 1
+            scan = pos + 1
+        while scan < len(buffer):
+            end = (
+                self._scan_string(scan)
+                if self._in_string
+                else self._scan_to_bracket(scan)
+            )
+            if end == scan:
+                # An escape that continues in the next chunk.
+                break
+            scan = end
+            if self._depth == 0 and not self._in_string:
+                self._scanned = 0
+                return scan
+
+        if final:
+            raise json.JSONDecodeError("Unterminated value", buffer, pos)
+        self._scanned = scan - pos
+        return None
+
+    def _scan_string(self, scan: int) -> int:
+        # Scans past the closing quote of the string being scanned, or to the end of
+        # the buffer. A backslash that ends the buffer is left for the next chunk.
+        buffer = self._buffer
+        quote = buffer.find('"', scan)
+        end = quote if quote >= 0 else len(buffer)
+        if buffer.find("\\", scan, end) >= 0:
+            end = _STRING_BODY.match(buffer, scan).end()
+            if end == len(buffer) or buffer[end] == "\\":
+                return end
+        elif quote < 0:
+            return end
+        self._in_string = False
+        return end + 1
+
+    def _scan_to_bracket(self, scan: int) -> int:
+        # Scans past the next bracket outside a string, or into the next string.
+        # Most text has no escapes, so the quotes before a bracket are counted to
+        # tell whether it's inside a string, rather than stepping over each string.
+        buffer = self._buffer
+        bracket = self._next_bracket(scan)
+        if buffer.find("\\", scan, bracket) >= 0:
+            end = _BETWEEN_BRACKETS.match(buffer, scan).end()
+            if end == len(buffer):
+                return end
+            bracket = end
+        elif buffer.count('"', scan, bracket) % 2:
+            bracket = buffer.rfind('"', scan, bracket)
+        elif bracket == len(buffer):
+            return bracket
+        if buffer[bracket] == '"':
+            self._in_string = True
+        else:
+            self._depth += 1 if buffer[bracket] in "{[" else -1
+        return bracket + 1
+
+    def _next_bracket(self, scan: int) -> int:
+        buffer = self._buffer
+        next_brackets = self._next_brackets
+        for bracket, found in next_brackets.items():
+            if found < scan:
+                found = buffer.find(bracket, scan)
+                next_brackets[bracket] = found if found >= 0 else len(buffer)
+        return min(next_brackets.values())
@@ -0,0 +1,350 @@
+"""Watching for new listings as soon as they're posted.
+
+Each poll only asks for the newest listings, sorted by start date, and stops reading
+once it reaches listings older than the window it's already seen. Listings are only
+returned the first time they're seen, or when they've changed since.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from threading import Event
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Hashable,
+    Iterator,
+    List,
+    Union,
+)
+
+from prosper_shared.omni_config import Config, ConfigKey, SchemaType, config_schema
+from schema import Optional
+
+from prosper_api.models import Listing, SearchListingsRequest
+from prosper_api.models.enums import SearchListingsSortBy, SortOrder
+from prosper_api.query import SearchListingsQuery
+
+if TYPE_CHECKING:  # pragma: no cover
+    from prosper_api.async_client import AsyncClient
+    from prosper_api.client import Client
+
+logger = logging.getLogger(__name__)
+
+_POLL_INTERVAL_CONFIG_PATH = "prosper-api.watcher.poll-interval"
+_LOOKBACK_CONFIG_PATH = "prosper-api.watcher.lookback"
+_MAX_SEEN_CONFIG_PATH = "prosper-api.watcher.max-seen"
+
+_DEFAULT_POLL_INTERVAL = 1.0
+_DEFAULT_LOOKBACK = 300
+_DEFAULT_MAX_SEEN = 10000
+
+_LISTING_DATE_FORMAT = "%Y-%m-%d %H:%M:%S %z"
+_FILTER_DATE_FORMAT = "%Y-%m-%d"
+
+
+@config_schema
+def _schema() -> SchemaType:
+    return {
+        "prosper-api": {
+            "watcher": {
+                Optional(
+                    ConfigKey(
+                        "poll-interval",
+                        "The number of seconds between the starts of consecutive listing polls. Polls also wait for a slot in the rate limit.",
+                        default=_DEFAULT_POLL_INTERVAL,
+                    )
+                ): float,
+                Optional(
+                    ConfigKey(
+                        "lookback",
+                        "The number of seconds before the newest listing seen that each poll re-reads, to catch listings that start out of order or change.",
+                        default=_DEFAULT_LOOKBACK,
+                    )
+                ): int,
+                Optional(
+                    ConfigKey(
+                        "max-seen",
+                        "The number of listings remembered to tell new and changed listings from ones already returned.",
+                        default=_DEFAULT_MAX_SEEN,
+                    )
+                ): int,
+            }
+        }
+    }
+
+
+def _fingerprint(listing: Listing) -> Hashable:
+    return (
+        listing.last_updated_date,
+        listing.listing_status,
+        listing.amount_remaining,
+        listing.invested,
+    )
+
+
+def _start_date(listing: Listing) -> datetime:
+    return datetime.strptime(listing.listing_start_date, _LISTING_DATE_FORMAT)
+
+
+class _BaseListingWatcher:
+    def __init__(
+        self,
+        request: Union[SearchListingsRequest, None],
+        poll_interval: float,
+        lookback: float,
+        max_seen: int,
+    ):
+        self.request = SearchListingsRequest() if request is None else request
+        # Encoded once; each poll only re-encodes the fields it changes.
+        self._query = SearchListingsQuery(self.request)
+        self.poll_interval = poll_interval
+        self.lookback = timedelta(seconds=lookback)
+        self.max_seen = max_seen
+        self._seen: "OrderedDict[int, Hashable]" = OrderedDict()
+        self._newest_start: Union[datetime, None] = None
+
+    @staticmethod
+    def _settings_from_config(config: Config) -> dict:
+        return {
+            "poll_interval": float(
+                config.get_as_decimal(
+                    _POLL_INTERVAL_CONFIG_PATH, Decimal(str(_DEFAULT_POLL_INTERVAL))
+                )
+            ),
+            "lookback": float(
+                config.get_as_decimal(_LOOKBACK_CONFIG_PATH, Decimal(_DEFAULT_LOOKBACK))
+            ),
+            "max_seen": int(
+                config.get_as_decimal(_MAX_SEEN_CONFIG_PATH, Decimal(_DEFAULT_MAX_SEEN))
+            ),
+        }
+
+    def _cutoff(self) -> Union[datetime, None]:
+        if self._newest_start is None:
+            return None
+        return self._newest_start - self.lookback
+
+    def _window_request(self) -> SearchListingsQuery:
+        update = {
+            "sort_by": SearchListingsSortBy.LISTING_START_DATE,
+            "sort_dir": SortOrder.DESCENDING,
+        }
+        cutoff = self._cutoff()
+        if cutoff is not None:
+            # The API filters by day; listings earlier in the day are skipped below.
+            update["listing_start_date_min"] = cutoff.strftime(_FILTER_DATE_FORMAT)
+        return self._query.model_copy(update=update)
+
+    def _is_before_window(
+        self, listing: Listing, cutoff: Union[datetime, None]
+    ) -> bool:
+        return cutoff is not None and _start_date(listing) < cutoff
+
+    def _is_new_or_changed(self, listing: Listing) -> bool:
+        start = _start_date(listing)
+        if self._newest_start is None or start > self._newest_start:
+            self._newest_start = start
+
+        fingerprint = _fingerprint(listing)
+        is_new_or_changed = self._seen.get(listing.listing_number) != fingerprint
+        self._seen[listing.listing_number] = fingerprint
+        self._seen.move_to_end(listing.listing_number)
+        while len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+        return is_new_or_changed
+
+    def _delay_until_next_poll(self, started_at: float) -> float:
+        return max(started_at + self.poll_interval - monotonic(), 0.0)
+
+
+class ListingWatcher(_BaseListingWatcher):
+    """Polls for listings that are new, or have changed, since they were last seen.
+
+    The first poll returns every listing matching the request; each later poll only
+    reads the listings that started within ``lookback`` seconds of the newest one
+    seen so far. Polls are searches, so they queue ahead of bulk reads in the
+    client's scheduler and never exceed its rate limit.
+    """
+
+    def __init__(
+        self,
+        client: "Client",
+        request: Union[SearchListingsRequest, None] = None,
+        poll_interval: float = _DEFAULT_POLL_INTERVAL,
+        lookback: float = _DEFAULT_LOOKBACK,
+        max_seen: int = _DEFAULT_MAX_SEEN,
+    ):
+        """Creates a ListingWatcher instance.
+
+        Args:
+            client (Client): The client to search listings with.
+            request (Union[SearchListingsRequest, None]): The filters listings must
+                match. The sort order and start date are set by the watcher.
+            poll_interval (float): The seconds between the starts of consecutive
+                polls.
+            lookback (float): The seconds before the newest listing seen that each
+                poll re-reads.
+            max_seen (int): The number of listings to remember; the least recently
+                seen are forgotten first.
+        """
+        super().__init__(request, poll_interval, lookback, max_seen)
+        self.client = client
+        self._stopped = Event()
+
+    @classmethod
+    def from_config(
+        cls, client: "Client", request: Union[SearchListingsRequest, None] = None
+    ) -> "ListingWatcher":
+        """Creates a ListingWatcher configured from the client's `prosper-api.watcher`.
+
+        Args:
+            client (Client): The client to search listings with.
+            request (Union[SearchListingsRequest, None]): The filters listings must
+                match.
+
+        Returns:
+            ListingWatcher: The configured watcher.
+        """
+        return cls(client, request, **cls._settings_from_config(client._config))
+
+    def poll(self) -> List[Listing]:
+        """Searches once for listings that are new or have changed.
+
+        Returns:
+            List[Listing]: The new and changed listings, newest first.
+        """
+        return list(self._poll_iter())
+
+    def watch(self) -> Iterator[Listing]:
+        """Polls until stopped, yielding each new or changed listing.
+
+        Yields:
+            Listing: Each new or changed listing, as soon as it's found.
+        """
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            started_at = monotonic()
+            yield from self._poll_iter()
+            self._stopped.wait(self._delay_until_next_poll(started_at))
+
+    def run(self, on_listing: Callable[[Listing], None]):
+        """Polls until stopped, calling back with each new or changed listing.
+
+        Args:
+            on_listing (Callable[[Listing], None]): Called with each new or changed
+                listing, e.g. to place an order.
+        """
+        for listing in self.watch():
+            on_listing(listing)
+
+    def stop(self):
+        """Stops watching once the current poll completes; safe to call from any thread."""
+        self._stopped.set()
+
+    def _poll_iter(self) -> Iterator[Listing]:
+        # Yields each listing as its page arrives, so a caller can act on it while
+        # the later pages of the window are still being read.
+        cutoff = self._cutoff()
+        found = 0
+        for listing in self.client.iter_listings(self._window_request()):
+            if self._is_before_window(listing, cutoff):
+                break
+            if self._is_new_or_changed(listing):
+                found += 1
+                yield listing
+        logger.debug(f"Found {found} new or changed listings")
+
+
+class AsyncListingWatcher(_BaseListingWatcher):
+    """Polls for new or changed listings without blocking the event loop.
+
+    Mirrors ``ListingWatcher`` for use with ``AsyncClient``.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncClient",
+        request: Union[SearchListingsRequest, None] = None,
+        poll_interval: float = _DEFAULT_POLL_INTERVAL,
+        lookback: float = _DEFAULT_LOOKBACK,
+        max_seen: int = _DEFAULT_MAX_SEEN,
+    ):
+        """Creates an AsyncListingWatcher instance.
+
+        Args:
+            client (AsyncClient): The client to search listings with.
+            request (Union[SearchListingsRequest, None]): The filters listings must
+                match. The sort order and start date are set by the watcher.
+            poll_interval (float): The seconds between the starts of consecutive
+                polls.
+            lookback (float): The seconds before the newest listing seen that each
+                poll re-reads.
+            max_seen (int): The number of listings to remember; the least recently
+                seen are forgotten first.
+        """
+        super().__init__(request, poll_interval, lookback, max_seen)
+        self.client = client
+        self._stopped: Union[asyncio.Event, None] = None
+
+    @classmethod
+    def from_config(
+        cls, client: "AsyncClient", request: Union[SearchListingsRequest, None] = None
+    ) -> "AsyncListingWatcher":
+        """Creates an AsyncListingWatcher configured from the client's config.
+
+        Args:
+            client (AsyncClient): The client to search listings with.
+            request (Union[SearchListingsRequest, None]): The filters listings must
+                match.
+
+        Returns:
+            AsyncListingWatcher: The configured watcher.
+        """
+        return cls(client, request, **cls._settings_from_config(client._config))
+
+    async def poll(self) -> List[Listing]:
+        """Searches once for listings that are new or have changed.
+
+        Returns:
+            List[Listing]: The new and changed listings, newest first.
+        """
+        return [listing async for listing in self._poll_iter()]
+
+    async def watch(self) -> AsyncIterator[Listing]:
+        """Polls until stopped, yielding each new or changed listing.
+
+        Yields:
+            Listing: Each new or changed listing, as soon as it's found.
+        """
+        self._stopped = asyncio.Event()
+        while not self._stopped.is_set():
+            started_at = monotonic()
+            async for listing in self._poll_iter():
+                yield listing
+            try:
+                await asyncio.wait_for(
+                    self._stopped.wait(), self._delay_until_next_poll(started_at)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        """Stops watching once the current poll completes."""
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def _poll_iter(self) -> AsyncIterator[Listing]:
+        # Yields each listing as its page arrives, like ``ListingWatcher``.
+        cutoff = self._cutoff()
+        found = 0
+        async for listing in self.client.iter_listings(self._window_request()):
+            if self._is_before_window(listing, cutoff):
+                break
+            if self._is_new_or_changed(listing):
+                found += 1
+                yield listing
+        logger.debug(f"Found {found} new or changed listings")
@@ -1,9 +1,30 @@
+import asyncio
 import builtins
 import logging
 import sys
+import time
+from pathlib import Path
 
 import pytest
 
+_WAIT_TIMEOUT = 5
+
+
+def wait_until(condition):
+    """Polls until the condition holds, failing the test after a few seconds."""
+    deadline = time.monotonic() + _WAIT_TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+async def wait_until_async(condition):
+    """Polls until the condition holds, without blocking the event loop."""
+    deadline = time.monotonic() + _WAIT_TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.001)
+
 
 @pytest.fixture(autouse=True)
 def configure_logging(caplog):
@@ -21,3 +42,13 @@ def mock_import_keyring(monkeypatch):
 
     monkeypatch.delitem(sys.modules, "win32security", raising=False)
     monkeypatch.setattr(builtins, "__import__", new_import)
+
+
+@pytest.fixture
+def response_json():
+    """Reads a canned Prosper API response from the 'data' directory."""
+
+    def read(name: str) -> str:
+        return (Path(__file__).parent / "data" / f"{name}.json").read_text()
+
+    return read
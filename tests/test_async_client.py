@@ -0,0 +1,929 @@
+import asyncio
+import json
+from decimal import Decimal
+
+import httpx
+import pytest
+from prosper_shared.omni_config import Config
+
+from prosper_api.async_client import AsyncClient
+from prosper_api.cache import ResponseCache
+from prosper_api.models import (
+    Account,
+    ListLoansRequest,
+    ListNotesRequest,
+    ListOrdersRequest,
+    ListPaymentsRequest,
+    ListPaymentsResponse,
+    SearchListingsRequest,
+)
+from prosper_api.query import SearchListingsQuery
+from prosper_api.scheduler import RequestPriority
+from tests.conftest import wait_until_async
+
+_REQUEST = httpx.Request("GET", "https://localhost/some_url")
+
+
+class TestAsyncClient:
+    @pytest.fixture
+    def auth_token_manager_mock(self, mocker):
+        auth_token_manager_mock = mocker.patch(
+            "prosper_api.async_client.AsyncAuthTokenManager"
+        )
+        auth_token_manager_mock.return_value.get_token = mocker.AsyncMock(
+            return_value="auth_token"
+        )
+        auth_token_manager_mock.return_value.stop_background_refresh = (
+            mocker.AsyncMock()
+        )
+        return auth_token_manager_mock
+
+    @pytest.fixture
+    def config_mock(self, mocker):
+        config_mock = mocker.patch("prosper_api.async_client.Config")
+        config_mock.autoconfig.return_value = Config(config_dict={})
+        return config_mock
+
+    @pytest.fixture
+    def request_mock(self, mocker):
+        request_mock = mocker.patch(
+            "httpx.AsyncClient.request", new_callable=mocker.AsyncMock
+        )
+        request_mock.return_value = mocker.MagicMock()
+        return request_mock
+
+    @pytest.fixture
+    def client_for_api_tests(self, mocker, auth_token_manager_mock, config_mock):
+        client = AsyncClient()
+        mocker.patch.object(client, "_do_get", mocker.AsyncMock())
+        mocker.patch.object(client, "_do_post", mocker.AsyncMock())
+        return client
+
+    def test_init_default(self, config_mock, auth_token_manager_mock):
+        client = AsyncClient()
+
+        config_mock.autoconfig.assert_called_once()
+        auth_token_manager_mock.assert_called_once_with(
+            config_mock.autoconfig.return_value, session=client._session
+        )
+        assert client._auth_token_manager == auth_token_manager_mock.return_value
+        assert client._session._transport._pool._max_connections == 10
+        assert client._session._transport._pool._keepalive_expiry == 300
+
+    def test_init_with_unlimited_connection_lifetime(self, auth_token_manager_mock):
+        client = AsyncClient(
+            Config(config_dict={"prosper-api": {"http": {"connection-lifetime": 0}}})
+        )
+
+        assert client._session._transport._pool._keepalive_expiry is None
+
+    def test_init_no_default(self, mocker, config_mock, auth_token_manager_mock):
+        session = mocker.MagicMock()
+
+        client = AsyncClient(
+            config_mock.return_value, auth_token_manager_mock.return_value, session
+        )
+
+        config_mock.autoconfig.assert_not_called()
+        auth_token_manager_mock.assert_not_called()
+        assert client._auth_token_manager == auth_token_manager_mock.return_value
+        assert client._session == session
+
+    def test_context_manager_closes_owned_session(
+        self, mocker, config_mock, auth_token_manager_mock
+    ):
+        aclose_mock = mocker.patch(
+            "httpx.AsyncClient.aclose", new_callable=mocker.AsyncMock
+        )
+
+        async def run():
+            async with AsyncClient() as client:
+                assert isinstance(client, AsyncClient)
+                aclose_mock.assert_not_called()
+
+        asyncio.run(run())
+
+        aclose_mock.assert_awaited_once()
+
+    def test_close_leaves_provided_session_open(
+        self, mocker, config_mock, auth_token_manager_mock
+    ):
+        session = mocker.MagicMock()
+        session.aclose = mocker.AsyncMock()
+
+        async def run():
+            async with AsyncClient(session=session):
+                pass
+
+        asyncio.run(run())
+
+        session.aclose.assert_not_awaited()
+
+    def test_background_token_refresh(self, auth_token_manager_mock):
+        manager = auth_token_manager_mock.return_value
+
+        async def run():
+            async with AsyncClient(
+                Config(config_dict={"prosper-api": {"auth": {"refresh-margin": 300}}})
+            ):
+                manager.start_background_refresh.assert_called_once()
+                manager.stop_background_refresh.assert_not_awaited()
+
+        asyncio.run(run())
+
+        manager.stop_background_refresh.assert_awaited_once()
+
+    def test_background_token_refresh_disabled_by_default(
+        self, config_mock, auth_token_manager_mock
+    ):
+        async def run():
+            async with AsyncClient():
+                pass
+
+        asyncio.run(run())
+
+        auth_token_manager_mock.return_value.start_background_refresh.assert_not_called()
+
+    def test_close_leaves_provided_auth_token_manager_running(
+        self, mocker, config_mock
+    ):
+        auth_token_manager = mocker.MagicMock()
+        auth_token_manager.stop_background_refresh = mocker.AsyncMock()
+
+        async def run():
+            async with AsyncClient(auth_token_manager=auth_token_manager):
+                pass
+
+        asyncio.run(run())
+
+        auth_token_manager.start_background_refresh.assert_not_called()
+        auth_token_manager.stop_background_refresh.assert_not_awaited()
+
+    def test_get_account_info(self, client_for_api_tests, response_json):
+        client_for_api_tests._do_get.return_value = response_json("account_response")
+
+        result = asyncio.run(client_for_api_tests.get_account_info())
+
+        client_for_api_tests._do_get.assert_awaited_once_with(
+            "https://api.prosper.com/v1/accounts/prosper/",
+            {},
+            priority=RequestPriority.SEARCH,
+        )
+        assert isinstance(result, Account)
+
+    @pytest.mark.parametrize(
+        "request_", [None, SearchListingsRequest(), SearchListingsQuery()]
+    )
+    def test_search_listings(self, client_for_api_tests, response_json, request_):
+        client_for_api_tests._do_get.return_value = response_json(
+            "search_listings_response"
+        )
+
+        result = asyncio.run(client_for_api_tests.search_listings(request_))
+
+        url, params = client_for_api_tests._do_get.await_args.args
+        assert client_for_api_tests._do_get.await_args.kwargs == {
+            "priority": RequestPriority.SEARCH
+        }
+        assert url == "https://api.prosper.com/listingsvc/v2/listings/"
+        assert params["sort_by"] == "lender_yield desc"
+        assert params["biddable"] == "true"
+        assert params["prosper_rating"] == "AA,A,B,C,D,E,HR"
+        assert result.result[0].listing_number == 11111111
+
+    @pytest.mark.parametrize("request_", [None, SearchListingsRequest()])
+    def test_search_listings_batch(self, client_for_api_tests, response_json, request_):
+        client_for_api_tests._do_get.return_value = response_json(
+            "search_listings_response"
+        )
+
+        batch = asyncio.run(client_for_api_tests.search_listings_batch(request_))
+
+        url, params = client_for_api_tests._do_get.await_args.args
+        assert url == "https://api.prosper.com/listingsvc/v2/listings/"
+        assert params["sort_by"] == "lender_yield desc"
+        assert list(batch.listing_number) == [11111111]
+
+    @pytest.mark.parametrize(
+        ["method", "args", "response_name", "fields"],
+        [
+            ("search_listings", [None], "search_listings_response", ["listing_number"]),
+            ("list_notes", [], "list_notes_response", ["loan_note_id"]),
+            ("list_orders", [], "list_orders_response", ["order_id"]),
+            ("list_loans", [], "list_loans_response", ["loan_number"]),
+            (
+                "list_payments",
+                [ListPaymentsRequest(loan_number=[2300367])],
+                "list_payments_response",
+                ["payment_amount"],
+            ),
+        ],
+    )
+    def test_list_with_fields(
+        self, client_for_api_tests, response_json, method, args, response_name, fields
+    ):
+        client_for_api_tests._do_get.return_value = response_json(response_name)
+
+        result = asyncio.run(
+            getattr(client_for_api_tests, method)(*args, fields=fields)
+        )
+
+        assert result.result
+        assert all(list(r.model_dump()) == fields for r in result.result)
+
+    @pytest.mark.parametrize(
+        ["method", "args"],
+        [
+            ("get_account_info_raw", []),
+            ("search_listings_raw", [None]),
+            ("list_notes_raw", []),
+            ("list_orders_raw", []),
+            ("list_loans_raw", []),
+            ("list_payments_raw", [ListPaymentsRequest(loan_number=[2300367])]),
+        ],
+    )
+    def test_raw(self, client_for_api_tests, method, args):
+        client_for_api_tests._do_get.return_value = b'{"result": []}'
+
+        response = asyncio.run(getattr(client_for_api_tests, method)(*args))
+
+        assert response is client_for_api_tests._do_get.return_value
+        client_for_api_tests._do_get.assert_called_once()
+
+    @pytest.mark.parametrize(
+        ["method", "args", "response_name", "fields"],
+        [
+            ("iter_listings", [], "search_listings_response", ["listing_number"]),
+            ("iter_notes", [], "list_notes_response", ["loan_note_id"]),
+            ("iter_orders", [], "list_orders_response", ["order_id"]),
+            ("iter_loans", [], "list_loans_response", ["loan_number"]),
+            (
+                "iter_payments",
+                [ListPaymentsRequest(loan_number=[2300367])],
+                "list_payments_response",
+                ["payment_amount"],
+            ),
+        ],
+    )
+    def test_iter_with_fields(
+        self, client_for_api_tests, response_json, method, args, response_name, fields
+    ):
+        client_for_api_tests._do_get.return_value = response_json(response_name)
+
+        async def collect():
+            return [
+                r
+                async for r in getattr(client_for_api_tests, method)(
+                    *args, fields=fields
+                )
+            ]
+
+        results = asyncio.run(collect())
+
+        assert results
+        assert all(list(r.model_dump()) == fields for r in results)
+
+    @pytest.mark.parametrize(
+        ["method", "list_method", "args", "response_name"],
+        [
+            ("stream_listings", "search_listings", [None], "search_listings_response"),
+            ("stream_notes", "list_notes", [], "list_notes_response"),
+            ("stream_orders", "list_orders", [], "list_orders_response"),
+            ("stream_loans", "list_loans", [], "list_loans_response"),
+            (
+                "stream_payments",
+                "list_payments",
+                [ListPaymentsRequest(loan_number=[2300367])],
+                "list_payments_response",
+            ),
+        ],
+    )
+    def test_stream(
+        self,
+        mocker,
+        client_for_api_tests,
+        response_json,
+        method,
+        list_method,
+        args,
+        response_name,
+    ):
+        raw = response_json(response_name).encode()
+
+        async def chunks(*_args, **_kwargs):
+            yield raw[:50]
+            yield raw[50:]
+
+        do_stream_mock = mocker.patch.object(
+            client_for_api_tests, "_do_stream", side_effect=chunks
+        )
+        client_for_api_tests._do_get.return_value = raw
+
+        async def run():
+            return [r async for r in getattr(client_for_api_tests, method)(*args)]
+
+        results = asyncio.run(run())
+
+        assert (
+            results
+            == asyncio.run(getattr(client_for_api_tests, list_method)(*args)).result
+        )
+        assert do_stream_mock.call_args == client_for_api_tests._do_get.call_args
+
+    def test_stream_with_fields(self, mocker, client_for_api_tests, response_json):
+        async def chunks(*_args, **_kwargs):
+            yield response_json("list_notes_response").encode()
+
+        mocker.patch.object(client_for_api_tests, "_do_stream", side_effect=chunks)
+
+        async def run():
+            return [
+                r
+                async for r in client_for_api_tests.stream_notes(
+                    fields=["loan_note_id"]
+                )
+            ]
+
+        results = asyncio.run(run())
+
+        assert results
+        assert all(list(r.model_dump()) == ["loan_note_id"] for r in results)
+
+    @pytest.mark.parametrize("request_", [None, ListNotesRequest()])
+    def test_list_notes(self, client_for_api_tests, response_json, request_):
+        client_for_api_tests._do_get.return_value = response_json("list_notes_response")
+
+        result = asyncio.run(client_for_api_tests.list_notes(request_))
+
+        client_for_api_tests._do_get.assert_awaited_once_with(
+            "https://api.prosper.com/v1/notes/",
+            {"sort_by": "prosper_rating desc", "offset": None, "limit": None},
+        )
+        assert len(result.result) == 1
+
+    def test_order(self, client_for_api_tests, response_json):
+        client_for_api_tests._do_post.return_value = response_json("order_response")
+
+        result = asyncio.run(client_for_api_tests.order(11111111, Decimal("25")))
+
+        client_for_api_tests._do_post.assert_awaited_once_with(
+            "https://api.prosper.com/v1/orders/",
+            {"bid_requests": [{"listing_id": 11111111, "bid_amount": Decimal("25")}]},
+        )
+        assert result.order_id == "AAAAAAAA-AAAA-AAAA-AAAA-AAAAAAAAAAA"
+
+    @pytest.mark.parametrize("request_", [None, ListOrdersRequest()])
+    def test_list_orders(self, client_for_api_tests, response_json, request_):
+        client_for_api_tests._do_get.return_value = response_json(
+            "list_orders_response"
+        )
+
+        result = asyncio.run(client_for_api_tests.list_orders(request_))
+
+        client_for_api_tests._do_get.assert_awaited_once_with(
+            "https://api.prosper.com/v1/orders/",
+            query_params={
+                "sort_by": "prosper_rating desc",
+                "offset": None,
+                "limit": None,
+            },
+        )
+        assert len(result.result) == 1
+
+    @pytest.mark.parametrize("request_", [None, ListLoansRequest()])
+    def test_list_loans(self, client_for_api_tests, response_json, request_):
+        client_for_api_tests._do_get.return_value = response_json("list_loans_response")
+
+        result = asyncio.run(client_for_api_tests.list_loans(request_))
+
+        client_for_api_tests._do_get.assert_awaited_once_with(
+            "https://api.prosper.com/v1/loans/",
+            query_params={
+                "sort_by": "prosper_rating desc",
+                "offset": None,
+                "limit": None,
+            },
+        )
+        assert result.result[0].loan_number == 11111
+
+    def test_list_payments(self, client_for_api_tests, response_json):
+        client_for_api_tests._do_get.return_value = response_json(
+            "list_payments_response"
+        )
+
+        result = asyncio.run(
+            client_for_api_tests.list_payments(
+                ListPaymentsRequest(loan_number=[2300367])
+            )
+        )
+
+        client_for_api_tests._do_get.assert_awaited_once_with(
+            "https://api.prosper.com/loans/payments",
+            query_params={
+                "loan_number": "2300367",
+                "transaction_effective_date": None,
+                "offset": None,
+                "limit": None,
+            },
+        )
+        assert len(result.result) == 2
+
+    @pytest.mark.parametrize(
+        ["method", "list_method", "request_", "expected_request", "response_name"],
+        [
+            (
+                "iter_listings",
+                "search_listings",
+                None,
+                SearchListingsRequest(offset=0, limit=500),
+                "search_listings_response",
+            ),
+            (
+                "iter_listings",
+                "search_listings",
+                SearchListingsQuery(SearchListingsRequest(invested=False)),
+                SearchListingsQuery(
+                    SearchListingsRequest(invested=False, offset=0, limit=500)
+                ),
+                "search_listings_response",
+            ),
+            (
+                "iter_notes",
+                "list_notes",
+                None,
+                ListNotesRequest(offset=0, limit=25),
+                "list_notes_response",
+            ),
+            (
+                "iter_orders",
+                "list_orders",
+                None,
+                ListOrdersRequest(offset=0, limit=25),
+                "list_orders_response",
+            ),
+            (
+                "iter_loans",
+                "list_loans",
+                None,
+                ListLoansRequest(offset=0, limit=25),
+                "list_loans_response",
+            ),
+            (
+                "iter_payments",
+                "list_payments",
+                ListPaymentsRequest(loan_number=[1], limit=10),
+                ListPaymentsRequest(loan_number=[1], offset=0, limit=10),
+                "list_payments_response",
+            ),
+        ],
+    )
+    def test_iter(
+        self,
+        mocker,
+        client_for_api_tests,
+        response_json,
+        method,
+        list_method,
+        request_,
+        expected_request,
+        response_name,
+    ):
+        response_type = getattr(AsyncClient, list_method).__annotations__["return"]
+        response = response_type.model_validate_json(response_json(response_name))
+        list_mock = mocker.patch.object(
+            client_for_api_tests,
+            list_method,
+            new_callable=mocker.AsyncMock,
+            return_value=response,
+        )
+
+        async def collect():
+            return [r async for r in getattr(client_for_api_tests, method)(request_)]
+
+        assert asyncio.run(collect()) == response.result
+        list_mock.assert_awaited_once_with(expected_request)
+
+    def test_iter_stopped_early_stops_reading_ahead(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock, response_json
+    ):
+        page = json.loads(response_json("list_notes_response"))
+        page["total_count"] = 100
+        request_mock.return_value = httpx.Response(200, json=page, request=_REQUEST)
+
+        async def acquire_async():
+            # Pace the calls, so the read-ahead is still fetching when the loop stops.
+            await asyncio.sleep(0.01)
+
+        rate_limiter = mocker.MagicMock()
+        rate_limiter.acquire_async = acquire_async
+        client = AsyncClient(rate_limiter=rate_limiter)
+
+        async def run():
+            async for _ in client.iter_notes(prefetch=1):
+                break
+
+            await asyncio.wait_for(client.list_notes(), 5)
+            await wait_until_async(
+                lambda: asyncio.all_tasks() == {asyncio.current_task()}
+            )
+
+        asyncio.run(run())
+
+    @pytest.mark.parametrize(
+        ["method", "list_method", "request_", "response_name", "expected_pages"],
+        [
+            (
+                "fetch_all_listings",
+                "search_listings",
+                None,
+                "search_listings_response",
+                2,
+            ),
+            ("fetch_all_notes", "list_notes", None, "list_notes_response", 24),
+            ("fetch_all_orders", "list_orders", None, "list_orders_response", 24),
+            ("fetch_all_loans", "list_loans", None, "list_loans_response", 24),
+            (
+                "fetch_all_payments",
+                "list_payments",
+                ListPaymentsRequest(loan_number=[2300367]),
+                "list_payments_response",
+                24,
+            ),
+        ],
+    )
+    def test_fetch_all(
+        self,
+        mocker,
+        client_for_api_tests,
+        response_json,
+        method,
+        list_method,
+        request_,
+        response_name,
+        expected_pages,
+    ):
+        response_type = getattr(AsyncClient, list_method).__annotations__["return"]
+        response = response_type.model_validate_json(response_json(response_name))
+        response.total_count = 600
+        list_mock = mocker.patch.object(
+            client_for_api_tests,
+            list_method,
+            new_callable=mocker.AsyncMock,
+            return_value=response,
+        )
+
+        results = asyncio.run(getattr(client_for_api_tests, method)(request_))
+
+        assert results == response.result
+        assert list_mock.await_count == expected_pages
+
+    def test_iter_payments_for_loans(self, mocker, client_for_api_tests, response_json):
+        mocker.patch("backoff._async.asyncio.sleep", new_callable=mocker.AsyncMock)
+        payment = ListPaymentsResponse.model_validate_json(
+            response_json("list_payments_response")
+        ).result[0]
+        failed = []
+
+        async def list_payments(request):
+            if request.loan_number[0] == 1_000_150 and not failed:
+                failed.append(request)
+                raise httpx.ConnectError("boom")
+            page = [
+                payment.model_copy(update={"loan_number": loan_number})
+                for loan_number in request.loan_number
+            ]
+            return ListPaymentsResponse(
+                result=page, result_count=len(page), total_count=len(page)
+            )
+
+        list_mock = mocker.patch.object(
+            client_for_api_tests, "list_payments", side_effect=list_payments
+        )
+        loan_numbers = list(range(1_000_000, 1_000_300))
+
+        async def collect():
+            return [
+                p
+                async for p in client_for_api_tests.iter_payments_for_loans(
+                    loan_numbers, "2025-02-02"
+                )
+            ]
+
+        results = asyncio.run(collect())
+
+        assert sorted(p.loan_number for p in results) == loan_numbers
+        # Only the failed chunk is fetched again.
+        assert list_mock.await_count == 3
+        assert all(
+            call.args[0].transaction_effective_date == "2025-02-02"
+            for call in list_mock.await_args_list
+        )
+
+    def test_iter_payments_for_loans_stopped_early(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock, response_json
+    ):
+        page = json.loads(response_json("list_payments_response"))
+
+        async def request(*args, params, **kwargs):
+            # The first chunk fits on one page; the rest page through far more
+            # results than the test waits for.
+            first = "1000000" in str(params)
+            total_count = len(page["result"]) if first else 10_000
+            return httpx.Response(
+                200, json={**page, "total_count": total_count}, request=_REQUEST
+            )
+
+        request_mock.side_effect = request
+
+        async def acquire_async():
+            # Pace the calls, so chunks are still in flight when the loop stops.
+            await asyncio.sleep(0.01)
+
+        rate_limiter = mocker.MagicMock()
+        rate_limiter.acquire_async = acquire_async
+        client = AsyncClient(rate_limiter=rate_limiter)
+
+        async def run():
+            async for _ in client.iter_payments_for_loans(range(1_000_000, 1_002_000)):
+                break
+
+            await asyncio.wait_for(
+                client.list_payments(ListPaymentsRequest(loan_number=[2300367])), 5
+            )
+            await wait_until_async(
+                lambda: asyncio.all_tasks() == {asyncio.current_task()}
+            )
+
+        asyncio.run(run())
+
+    def test_rate_limiter_provided(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock
+    ):
+        rate_limiter = mocker.MagicMock()
+        rate_limiter.acquire_async = mocker.AsyncMock()
+
+        client = AsyncClient(rate_limiter=rate_limiter)
+        asyncio.run(client._do_get("some_url"))
+
+        assert client.rate_limiter is rate_limiter
+        rate_limiter.acquire_async.assert_awaited_once()
+
+    def test_cached_responses_skip_api_until_order(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock, response_json
+    ):
+        request_mock.return_value = httpx.Response(
+            200, text=response_json("account_response"), request=_REQUEST
+        )
+        client = AsyncClient(cache=ResponseCache())
+        mocker.patch.object(
+            client,
+            "_do_post",
+            new_callable=mocker.AsyncMock,
+            return_value=response_json("order_response"),
+        )
+
+        async def run():
+            first = await client.get_account_info()
+            second = await client.get_account_info()
+            await client.order(11111111, Decimal("25"))
+            third = await client.get_account_info()
+            return first, second, third
+
+        first, second, third = asyncio.run(run())
+
+        assert first == second == third
+        assert request_mock.await_count == 2
+        assert client.cache.stats().hits == 1
+
+    def test_order_during_get_isnt_cached_over(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock, response_json
+    ):
+        response = httpx.Response(
+            200, text=response_json("account_response"), request=_REQUEST
+        )
+        client = AsyncClient(cache=ResponseCache())
+        mocker.patch.object(
+            client,
+            "_do_post",
+            new_callable=mocker.AsyncMock,
+            return_value=response_json("order_response"),
+        )
+
+        async def run():
+            released = asyncio.Event()
+
+            async def respond(*args, **kwargs):
+                if request_mock.await_count == 1:
+                    await released.wait()
+                return response
+
+            request_mock.side_effect = respond
+            get = asyncio.create_task(client.get_account_info())
+            while request_mock.await_count == 0:
+                await asyncio.sleep(0)
+            await client.order(11111111, Decimal("25"))
+            released.set()
+            await get
+            await client.get_account_info()
+
+        asyncio.run(run())
+
+        assert request_mock.await_count == 2
+        assert client.cache.stats().size == 1
+
+    def test_concurrent_identical_gets_share_one_call(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        request_mock.return_value = httpx.Response(
+            200, text='{"p1": "v1"}', request=_REQUEST
+        )
+        client = AsyncClient()
+
+        async def run():
+            return await asyncio.gather(
+                *(client._do_get("some_url", {"a": 1}) for _ in range(3))
+            )
+
+        assert asyncio.run(run()) == [b'{"p1": "v1"}'] * 3
+        request_mock.assert_awaited_once()
+
+    @pytest.fixture
+    def send_mock(self, mocker):
+        return mocker.patch("httpx.AsyncClient.send", new_callable=mocker.AsyncMock)
+
+    def test_do_stream(self, config_mock, auth_token_manager_mock, send_mock):
+        response = httpx.Response(200, content=b'{"result": []}', request=_REQUEST)
+        send_mock.return_value = response
+        client = AsyncClient()
+        client._STREAM_CHUNK_SIZE = 4
+
+        async def run():
+            return [
+                chunk
+                async for chunk in client._do_stream(
+                    "https://localhost/some_url",
+                    {"a": Decimal("1.5")},
+                    priority=RequestPriority.SEARCH,
+                )
+            ]
+
+        assert asyncio.run(run()) == [b'{"re', b"sult", b'": [', b"]}"]
+        assert response.is_closed
+        request = send_mock.call_args.args[0]
+        assert send_mock.call_args.kwargs == {"stream": True}
+        assert request.method == "GET"
+        assert str(request.url) == "https://localhost/some_url?a=1.5"
+        assert request.headers["Authorization"] == "bearer auth_token"
+
+    def test_throttled_stream_is_retried(
+        self, mocker, config_mock, auth_token_manager_mock, send_mock
+    ):
+        rate_limiter = mocker.MagicMock()
+        rate_limiter.acquire_async = mocker.AsyncMock()
+        throttled = httpx.Response(429, request=_REQUEST)
+        send_mock.side_effect = [
+            throttled,
+            httpx.Response(200, content=b"[]", request=_REQUEST),
+        ]
+        client = AsyncClient(rate_limiter=rate_limiter)
+
+        async def run():
+            return [chunk async for chunk in client._do_stream("some_url", {})]
+
+        assert asyncio.run(run()) == [b"[]"]
+        assert throttled.is_closed
+
+    def test_failed_stream_is_closed(
+        self, config_mock, auth_token_manager_mock, send_mock
+    ):
+        response = httpx.Response(500, request=_REQUEST)
+        send_mock.return_value = response
+
+        async def run():
+            return [chunk async for chunk in AsyncClient()._do_stream("some_url", {})]
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(run())
+        assert response.is_closed
+
+    def test_rejected_token_is_renewed_and_call_replayed(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        token_manager = auth_token_manager_mock.return_value
+        token_manager.get_token.side_effect = ["revoked_token", "renewed_token"]
+        request_mock.side_effect = [
+            httpx.Response(401, request=_REQUEST),
+            httpx.Response(200, text='{"p1": "v1"}', request=_REQUEST),
+        ]
+
+        response = asyncio.run(AsyncClient()._do_post("some_url"))
+
+        assert response == b'{"p1": "v1"}'
+        token_manager.invalidate_token.assert_called_once_with("revoked_token")
+        assert [
+            call.kwargs["headers"]["Authorization"]
+            for call in request_mock.call_args_list
+        ] == ["bearer revoked_token", "bearer renewed_token"]
+
+    def test_rejected_token_is_renewed_once(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        request_mock.side_effect = lambda *args, **kwargs: httpx.Response(
+            401, request=_REQUEST
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(AsyncClient()._do_get("some_url"))
+
+        assert request_mock.await_count == 2
+
+    def test_throttled_get_is_retried(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock
+    ):
+        rate_limiter = mocker.MagicMock()
+        rate_limiter.acquire_async = mocker.AsyncMock()
+        request_mock.side_effect = [
+            httpx.Response(429, headers={"Retry-After": "1"}, request=_REQUEST),
+            httpx.Response(200, text='{"p1": "v1"}', request=_REQUEST),
+        ]
+
+        response = asyncio.run(
+            AsyncClient(rate_limiter=rate_limiter)._do_get("some_url")
+        )
+
+        assert response == b'{"p1": "v1"}'
+        assert rate_limiter.acquire_async.await_count == 2
+        rate_limiter.throttled.assert_called_once_with(1.0)
+        rate_limiter.succeeded.assert_called_once()
+
+    @pytest.mark.parametrize(
+        ["input_val", "expected_params"],
+        [
+            (None, {}),
+            (
+                {"p1": "v1", "p2": Decimal("2.5"), "p3": None, "p4": ["A", 1]},
+                {"p1": "v1", "p2": "2.5", "p4": ["A", "1"]},
+            ),
+        ],
+    )
+    def test_do_get(
+        self,
+        auth_token_manager_mock,
+        config_mock,
+        request_mock,
+        input_val,
+        expected_params,
+    ):
+        request_mock.return_value.content = b'{"p1": "v1"}'
+
+        response = asyncio.run(AsyncClient()._do_get("some_url", input_val))
+
+        assert response == b'{"p1": "v1"}'
+        request_mock.assert_awaited_once_with(
+            "GET",
+            "some_url",
+            params=expected_params,
+            content="{}",
+            headers={
+                "Authorization": "bearer auth_token",
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+        )
+        request_mock.return_value.raise_for_status.assert_called_once()
+
+    @pytest.mark.parametrize(
+        ["input_val", "expected_content"],
+        [
+            (None, "{}"),
+            (
+                {"bid_requests": [{"listing_id": 1, "bid_amount": Decimal("25.10")}]},
+                '{"bid_requests": [{"listing_id": 1, "bid_amount": 25.10}]}',
+            ),
+            ({"bid_amount": 25.1}, '{"bid_amount": 25.1}'),
+        ],
+    )
+    def test_do_post(
+        self,
+        auth_token_manager_mock,
+        config_mock,
+        request_mock,
+        input_val,
+        expected_content,
+    ):
+        request_mock.return_value.content = b'{"p1": "v1"}'
+
+        response = asyncio.run(AsyncClient()._do_post("some_url", input_val))
+
+        assert response == b'{"p1": "v1"}'
+        request_mock.assert_awaited_once_with(
+            "POST",
+            "some_url",
+            params={},
+            content=expected_content,
+            headers={
+                "Authorization": "bearer auth_token",
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+        )
@@ -1,18 +1,91 @@
+import asyncio
 import json
+import multiprocessing
+import os
+import threading
+import time
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from os.path import join
 from tempfile import TemporaryDirectory
 
 import freezegun
+import httpx
 import pytest
 from prosper_shared.omni_config import Config
 
+from prosper_api import auth_token_manager
 from prosper_api.auth_token_manager import (
     _ACCESS_TOKEN_KEY,
     _EXPIRES_AT_KEY,
+    AsyncAuthTokenManager,
     AuthTokenManager,
     _schema,
 )
+from tests.conftest import wait_until, wait_until_async
+
+
+class _AuthServer(ThreadingHTTPServer):
+    # A local stand-in for the Prosper auth endpoint. Each call is slow enough that
+    # concurrent callers overlap, and gets a new access token.
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _AuthHandler)
+        self.grants = []
+        self._grants_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/security/oauth/token"
+
+
+class _AuthHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        time.sleep(0.05)
+        with self.server._grants_lock:
+            self.server.grants.append(body.split("&")[0])
+            access_token = f"access_token_{len(self.server.grants)}"
+        response = json.dumps(
+            {
+                "access_token": access_token,
+                "token_type": "bearer",
+                "refresh_token": "refresh_token_value",
+                "expires_in": 3599,
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+def _get_token_in_process(config_dict, auth_url, start, tokens):
+    auth_token_manager._AUTH_URL = auth_url
+    manager = AuthTokenManager(Config(config_dict=config_dict, schema=_schema()))
+    start.wait()
+    tokens.put(manager.get_token())
+
+
+def _get_token_async_in_process(config_dict, auth_url, start, tokens):
+    auth_token_manager._AUTH_URL = auth_url
+    manager = AsyncAuthTokenManager(Config(config_dict=config_dict, schema=_schema()))
+    start.wait()
+    tokens.put(asyncio.run(manager.get_token()))
+
+
+@pytest.fixture
+def auth_server(mocker):
+    server = _AuthServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    mocker.patch("prosper_api.auth_token_manager._AUTH_URL", server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
 
 
 class TestAuthTokenManager:
@@ -24,7 +97,7 @@ class TestAuthTokenManager:
     }
 
     @pytest.fixture
-    def config(self):
+    def config(self, tmp_path):
         config = Config(
             config_dict={
                 "prosper-api": {
@@ -34,7 +107,7 @@ class TestAuthTokenManager:
                         "username": "test@test.test",
                         "password": "password_value",
                     },
-                    "auth": {"token-cache": "///NOT_A_VALID_PATH///"},
+                    "auth": {"token-cache": str(tmp_path / "token-cache")},
                 },
             },
             schema=_schema(),
@@ -83,7 +156,7 @@ class TestAuthTokenManager:
 
     @pytest.fixture
     def request_mock(self, mocker):
-        return mocker.patch("requests.request")
+        return mocker.patch("requests.Session.request")
 
     @pytest.fixture
     def keyring_get_password_mock(self, mocker):
@@ -108,6 +181,13 @@ class TestAuthTokenManager:
         mocker.patch.object(auth_token_manager, "_cache_token", mocker.MagicMock())
         return auth_token_manager
 
+    def test_init_with_session(self, mocker, config):
+        session = mocker.MagicMock()
+
+        auth_token_manager = AuthTokenManager(config, session=session)
+
+        assert auth_token_manager.session == session
+
     def test_init_when_creds_not_present(self, config_with_no_creds, caplog):
         AuthTokenManager(config_with_no_creds)
 
@@ -321,6 +401,255 @@ class TestAuthTokenManager:
         auth_token_manager_for_get_token._refresh_auth.assert_called_once()
         assert actual_token is None
 
+    @pytest.mark.parametrize(
+        ["cached_token", "expected_grant"],
+        [
+            (None, "grant_type=password"),
+            ({**DEFAULT_TOKEN, _EXPIRES_AT_KEY: 0}, "grant_type=refresh_token"),
+        ],
+    )
+    def test_get_token_generates_once_for_concurrent_threads(
+        self, tmp_path, config, auth_server, cached_token, expected_grant
+    ):
+        auth_token_manager = AuthTokenManager(config)
+        auth_token_manager.token_cache_path = str(tmp_path / "token-cache")
+        auth_token_manager.token = cached_token
+        threads = 50
+        start = threading.Barrier(threads)
+        tokens = []
+
+        def get_token():
+            start.wait()
+            tokens.append(auth_token_manager.get_token())
+
+        workers = [threading.Thread(target=get_token) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert auth_server.grants == [expected_grant]
+        assert tokens == ["access_token_1"] * threads
+        with open(auth_token_manager.token_cache_path) as token_cache_file:
+            assert json.load(token_cache_file) == auth_token_manager.token
+
+    @pytest.fixture
+    def config_with_refresh_margin(self, tmp_path):
+        return Config(
+            config_dict={
+                "prosper-api": {
+                    "credentials": {
+                        "client-id": "0123456789abcdef0123456789abcdef",
+                        "client-secret": "fedcba0987654321fedcba0987654321",
+                        "username": "test@test.test",
+                        "password": "password_value",
+                    },
+                    "auth": {
+                        "token-cache": str(tmp_path / "token-cache"),
+                        "refresh-margin": 300,
+                    },
+                },
+            },
+            schema=_schema(),
+        )
+
+    def test_get_token_when_fresh_skips_lock(self, auth_token_manager):
+        auth_token_manager.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime.now().timestamp() + 3600,
+        }
+        tokens = []
+
+        with auth_token_manager._lock:
+            worker = threading.Thread(
+                target=lambda: tokens.append(auth_token_manager.get_token())
+            )
+            worker.start()
+            worker.join(5)
+
+        assert tokens == [self.DEFAULT_TOKEN[_ACCESS_TOKEN_KEY]]
+
+    def test_background_refresh(self, config_with_refresh_margin, auth_server):
+        auth_token_manager = AuthTokenManager(config_with_refresh_margin)
+        auth_token_manager.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime.now().timestamp() + 100,
+        }
+
+        auth_token_manager.start_background_refresh()
+        refresher = auth_token_manager._refresher
+        auth_token_manager.start_background_refresh()
+        wait_until(
+            lambda: auth_token_manager.token[_ACCESS_TOKEN_KEY] == "access_token_1"
+        )
+
+        assert auth_token_manager._refresher is refresher
+        assert auth_token_manager.get_token() == "access_token_1"
+        auth_token_manager.stop_background_refresh()
+        assert not refresher.is_alive()
+        assert auth_token_manager._refresher is None
+        assert auth_server.grants == ["grant_type=refresh_token"]
+
+    def test_background_refresh_retries_failures(
+        self, mocker, config_with_refresh_margin
+    ):
+        mocker.patch("prosper_api.auth_token_manager._MIN_REFRESH_INTERVAL", 0.01)
+        auth_token_manager = AuthTokenManager(config_with_refresh_margin)
+
+        def initial_auth():
+            if initial_auth_mock.call_count < 3:
+                raise Exception
+            auth_token_manager.token = {
+                **self.DEFAULT_TOKEN,
+                _EXPIRES_AT_KEY: datetime.now().timestamp() + 3600,
+            }
+
+        initial_auth_mock = mocker.patch.object(
+            auth_token_manager, "_initial_auth", side_effect=initial_auth
+        )
+
+        auth_token_manager.start_background_refresh()
+        wait_until(lambda: auth_token_manager.token is not None)
+        auth_token_manager.stop_background_refresh()
+
+        assert initial_auth_mock.call_count == 3
+
+    def test_start_background_refresh_without_margin(self, auth_token_manager):
+        with pytest.raises(ValueError):
+            auth_token_manager.start_background_refresh()
+
+    def test_stop_background_refresh_when_not_started(self, auth_token_manager):
+        auth_token_manager.stop_background_refresh()
+
+        assert auth_token_manager._refresher is None
+
+    def test_get_token_generates_once_for_concurrent_processes(
+        self, tmp_path, auth_server
+    ):
+        config_dict = {
+            "prosper-api": {
+                "credentials": {
+                    "client-id": "0123456789abcdef0123456789abcdef",
+                    "client-secret": "fedcba0987654321fedcba0987654321",
+                    "username": "test@test.test",
+                    "password": "password_value",
+                },
+                "auth": {"token-cache": str(tmp_path / "token-cache")},
+            },
+        }
+        processes = 4
+        context = multiprocessing.get_context("spawn")
+        start = context.Barrier(processes)
+        tokens = context.Queue()
+        workers = [
+            context.Process(
+                target=_get_token_in_process,
+                args=(config_dict, auth_server.url, start, tokens),
+            )
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        results = [tokens.get(timeout=30) for _ in workers]
+        for worker in workers:
+            worker.join()
+
+        assert auth_server.grants == ["grant_type=password"]
+        assert results == ["access_token_1"] * processes
+
+    @freezegun.freeze_time("2023-10-07 12:00:01")
+    def test_get_token_uses_token_cached_by_another_process(
+        self, auth_token_manager_for_get_token
+    ):
+        auth_token_manager_for_get_token.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime(2023, 10, 7, 12, 0, 1).timestamp(),
+        }
+        with open(auth_token_manager_for_get_token.token_cache_path, "w") as cache:
+            json.dump(
+                {
+                    **self.DEFAULT_TOKEN,
+                    _ACCESS_TOKEN_KEY: "renewed_token",
+                    _EXPIRES_AT_KEY: datetime(2023, 10, 7, 13).timestamp(),
+                },
+                cache,
+            )
+
+        actual_token = auth_token_manager_for_get_token.get_token()
+
+        assert actual_token == "renewed_token"
+        auth_token_manager_for_get_token._initial_auth.assert_not_called()
+        auth_token_manager_for_get_token._refresh_auth.assert_not_called()
+
+    def test_cache_token_replaces_file(self, auth_token_manager):
+        auth_token_manager.token = dict(self.DEFAULT_TOKEN)
+
+        auth_token_manager._cache_token()
+        auth_token_manager._cache_token()
+
+        cache_dir = os.path.dirname(auth_token_manager.token_cache_path)
+        assert os.listdir(cache_dir) == ["token-cache"]
+        assert auth_token_manager._read_token_cache() == auth_token_manager.token
+
+    def test_cache_token_when_write_fails(self, auth_token_manager):
+        with open(auth_token_manager.token_cache_path, "w") as cache:
+            json.dump(self.DEFAULT_TOKEN, cache)
+        auth_token_manager.token = {**self.DEFAULT_TOKEN, "unwritable": object()}
+
+        with pytest.raises(TypeError):
+            auth_token_manager._cache_token()
+
+        cache_dir = os.path.dirname(auth_token_manager.token_cache_path)
+        assert os.listdir(cache_dir) == ["token-cache"]
+        assert auth_token_manager._read_token_cache() == self.DEFAULT_TOKEN
+
+    def test_init_when_token_cache_corrupt(self, config):
+        with open(config.get_as_str("prosper-api.auth.token-cache"), "w") as cache:
+            cache.write('{"access_token": "trunc')
+
+        assert AuthTokenManager(config).token is None
+
+    @pytest.mark.parametrize(
+        ["rejected_token", "expected_refreshes"],
+        [("access_token_value", 1), ("older_token", 0)],
+    )
+    def test_invalidate_token(
+        self, auth_token_manager_for_get_token, rejected_token, expected_refreshes
+    ):
+        valid_token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime.now().timestamp() + 3600,
+        }
+        auth_token_manager_for_get_token.token = valid_token
+        # The rejected token is still in the cache file; it mustn't be reused.
+        with open(auth_token_manager_for_get_token.token_cache_path, "w") as cache:
+            json.dump(valid_token, cache)
+
+        def assign_token():
+            auth_token_manager_for_get_token.token = {
+                **valid_token,
+                _ACCESS_TOKEN_KEY: "renewed_token",
+            }
+
+        auth_token_manager_for_get_token._refresh_auth.side_effect = assign_token
+
+        auth_token_manager_for_get_token.invalidate_token(rejected_token)
+        auth_token_manager_for_get_token.invalidate_token(rejected_token)
+        actual_token = auth_token_manager_for_get_token.get_token()
+
+        assert (
+            auth_token_manager_for_get_token._refresh_auth.call_count
+            == expected_refreshes
+        )
+        assert actual_token == (
+            "renewed_token" if expected_refreshes else "access_token_value"
+        )
+
+    def test_invalidate_token_when_no_token(self, auth_token_manager):
+        auth_token_manager.invalidate_token(None)
+
+        assert auth_token_manager.token is None
+
     def test_get_cached_token(self, temp_token_cache, config_with_valid_token_cache):
         auth_token_manager = AuthTokenManager(config_with_valid_token_cache)
 
@@ -333,3 +662,454 @@ class TestAuthTokenManager:
         auth_token_manager._fetch_secret("ID")
 
         keyring_get_password_mock.assert_called_once_with("prosper-api", "ID")
+
+    def test_fetch_secret_is_memoized(
+        self, keyring_get_password_mock, config_with_no_creds
+    ):
+        keyring_get_password_mock.return_value = "secret"
+        auth_token_manager = AuthTokenManager(config_with_no_creds)
+
+        assert auth_token_manager._fetch_secret("ID") == "secret"
+        assert auth_token_manager._fetch_secret("ID") == "secret"
+
+        keyring_get_password_mock.assert_called_once_with("prosper-api", "ID")
+
+    def test_fetch_secret_when_missing(
+        self, keyring_get_password_mock, config_with_no_creds
+    ):
+        keyring_get_password_mock.side_effect = [None, "secret"]
+        auth_token_manager = AuthTokenManager(config_with_no_creds)
+
+        assert auth_token_manager._fetch_secret("ID") is None
+        assert auth_token_manager._fetch_secret("ID") == "secret"
+
+    def test_invalidate_secrets(self, keyring_get_password_mock, config_with_no_creds):
+        keyring_get_password_mock.side_effect = ["secret", "rotated"]
+        auth_token_manager = AuthTokenManager(config_with_no_creds)
+        auth_token_manager._fetch_secret("ID")
+
+        auth_token_manager.invalidate_secrets()
+
+        assert auth_token_manager._fetch_secret("ID") == "rotated"
+
+    def test_secrets_are_fetched_once_across_auths(
+        self, keyring_get_password_mock, config_with_no_creds, request_mock, mocker
+    ):
+        keyring_get_password_mock.side_effect = lambda service, id: f"{id}_secret"
+        auth_token_manager = AuthTokenManager(config_with_no_creds)
+        mocker.patch.object(auth_token_manager, "_cache_token")
+        request_mock.return_value.json.return_value = self.DEFAULT_TOKEN
+
+        auth_token_manager._initial_auth()
+        auth_token_manager._refresh_auth()
+        auth_token_manager._initial_auth()
+
+        assert keyring_get_password_mock.call_args_list == [
+            mocker.call("prosper-api", "0123456789abcdef0123456789abcdef"),
+            mocker.call("prosper-api", "test@test.test"),
+        ]
+
+    def test_preload_secrets(self, keyring_get_password_mock):
+        config = Config(
+            config_dict={
+                "prosper-api": {
+                    "credentials": {
+                        "client-id": "0123456789abcdef0123456789abcdef",
+                        "username": "test@test.test",
+                    },
+                    "auth": {
+                        "token-cache": "///NOT_A_VALID_PATH///",
+                        "preload-secrets": True,
+                    },
+                },
+            },
+            schema=_schema(),
+        )
+
+        AuthTokenManager(config)
+
+        assert keyring_get_password_mock.call_count == 2
+
+    def test_preload_secrets_when_configured(self, keyring_get_password_mock, config):
+        AuthTokenManager(config).preload_secrets()
+
+        keyring_get_password_mock.assert_not_called()
+
+    def test_secrets_are_not_preloaded_by_default(
+        self, keyring_get_password_mock, config_with_no_creds
+    ):
+        AuthTokenManager(config_with_no_creds)
+
+        keyring_get_password_mock.assert_not_called()
+
+
+class TestAsyncAuthTokenManager:
+    DEFAULT_TOKEN = TestAuthTokenManager.DEFAULT_TOKEN
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        return Config(
+            config_dict={
+                "prosper-api": {
+                    "credentials": {
+                        "client-id": "0123456789abcdef0123456789abcdef",
+                        "client-secret": "fedcba0987654321fedcba0987654321",
+                        "username": "test@test.test",
+                        "password": "password_value",
+                    },
+                    "auth": {"token-cache": str(tmp_path / "token-cache")},
+                },
+            },
+            schema=_schema(),
+        )
+
+    @pytest.fixture
+    def session(self, mocker):
+        session = mocker.MagicMock()
+        session.request = mocker.AsyncMock()
+        session.request.return_value = mocker.MagicMock()
+        session.request.return_value.json.return_value = self.DEFAULT_TOKEN
+        return session
+
+    @pytest.fixture
+    def auth_token_manager(self, mocker, config, session):
+        auth_token_manager = AsyncAuthTokenManager(config, session=session)
+        mocker.patch.object(auth_token_manager, "_cache_token", mocker.MagicMock())
+        return auth_token_manager
+
+    @pytest.fixture
+    def auth_token_manager_for_get_token(self, mocker, auth_token_manager):
+        mocker.patch.object(auth_token_manager, "_initial_auth", mocker.AsyncMock())
+        mocker.patch.object(auth_token_manager, "_refresh_auth", mocker.AsyncMock())
+        return auth_token_manager
+
+    def test_init_default_session(self, config):
+        auth_token_manager = AsyncAuthTokenManager(config)
+
+        assert isinstance(auth_token_manager.session, httpx.AsyncClient)
+
+    def test_initial_auth(self, auth_token_manager, session):
+        asyncio.run(auth_token_manager._initial_auth())
+
+        session.request.assert_awaited_once_with(
+            "POST",
+            "https://api.prosper.com/v1/security/oauth/token",
+            data={
+                "grant_type": "password",
+                "client_id": "0123456789abcdef0123456789abcdef",
+                "client_secret": "fedcba0987654321fedcba0987654321",
+                "username": "test@test.test",
+                "password": "password_value",
+            },
+            headers={"accept": "application/json"},
+        )
+        assert auth_token_manager.token == self.DEFAULT_TOKEN
+        auth_token_manager._cache_token.assert_called_once()
+
+    def test_refresh_auth(self, auth_token_manager, session):
+        auth_token_manager.token = {
+            **self.DEFAULT_TOKEN,
+            "refresh_token": "existing_refresh_token_value",
+        }
+
+        asyncio.run(auth_token_manager._refresh_auth())
+
+        session.request.assert_awaited_once_with(
+            "POST",
+            "https://api.prosper.com/v1/security/oauth/token",
+            data={
+                "grant_type": "refresh_token",
+                "client_id": "0123456789abcdef0123456789abcdef",
+                "client_secret": "fedcba0987654321fedcba0987654321",
+                "refresh_token": "existing_refresh_token_value",
+            },
+            headers={"accept": "application/json"},
+        )
+        assert auth_token_manager.token == self.DEFAULT_TOKEN
+        auth_token_manager._cache_token.assert_called_once()
+
+    def test_get_token_when_no_token(self, auth_token_manager_for_get_token):
+        def assign_token():
+            auth_token_manager_for_get_token.token = self.DEFAULT_TOKEN
+
+        auth_token_manager_for_get_token._initial_auth.side_effect = assign_token
+
+        actual_token = asyncio.run(auth_token_manager_for_get_token.get_token())
+
+        auth_token_manager_for_get_token._initial_auth.assert_awaited_once()
+        auth_token_manager_for_get_token._refresh_auth.assert_not_awaited()
+        assert actual_token == self.DEFAULT_TOKEN[_ACCESS_TOKEN_KEY]
+
+    @freezegun.freeze_time("2023-10-07 12:00:01")
+    def test_get_token_when_token_valid(self, auth_token_manager_for_get_token):
+        auth_token_manager_for_get_token.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime(2023, 10, 7, 12, 0, 2).timestamp(),
+        }
+
+        actual_token = asyncio.run(auth_token_manager_for_get_token.get_token())
+
+        auth_token_manager_for_get_token._initial_auth.assert_not_awaited()
+        auth_token_manager_for_get_token._refresh_auth.assert_not_awaited()
+        assert actual_token == self.DEFAULT_TOKEN[_ACCESS_TOKEN_KEY]
+
+    @freezegun.freeze_time("2023-10-07 12:00:01")
+    def test_get_token_when_token_expired_and_refresh_fails(
+        self, auth_token_manager_for_get_token
+    ):
+        auth_token_manager_for_get_token.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime(2023, 10, 7, 12, 0, 1).timestamp(),
+        }
+
+        def assign_token():
+            auth_token_manager_for_get_token.token = self.DEFAULT_TOKEN
+
+        auth_token_manager_for_get_token._refresh_auth.side_effect = Exception
+        auth_token_manager_for_get_token._initial_auth.side_effect = assign_token
+
+        actual_token = asyncio.run(auth_token_manager_for_get_token.get_token())
+
+        auth_token_manager_for_get_token._refresh_auth.assert_awaited_once()
+        auth_token_manager_for_get_token._initial_auth.assert_awaited_once()
+        assert actual_token == self.DEFAULT_TOKEN[_ACCESS_TOKEN_KEY]
+
+    def test_get_token_when_both_gens_fail(self, auth_token_manager_for_get_token):
+        auth_token_manager_for_get_token.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: 0,
+        }
+        auth_token_manager_for_get_token._refresh_auth.side_effect = Exception
+        auth_token_manager_for_get_token._initial_auth.side_effect = Exception
+
+        actual_token = asyncio.run(auth_token_manager_for_get_token.get_token())
+
+        assert actual_token is None
+
+    def test_invalidate_token(self, auth_token_manager_for_get_token):
+        auth_token_manager_for_get_token.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime.now().timestamp() + 3600,
+        }
+
+        auth_token_manager_for_get_token.invalidate_token(
+            self.DEFAULT_TOKEN[_ACCESS_TOKEN_KEY]
+        )
+        asyncio.run(auth_token_manager_for_get_token.get_token())
+
+        auth_token_manager_for_get_token._refresh_auth.assert_awaited_once()
+
+    def test_get_token_refreshes_once_for_concurrent_callers(
+        self, auth_token_manager_for_get_token
+    ):
+        auth_token_manager_for_get_token.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: 0,
+        }
+
+        async def refresh():
+            await asyncio.sleep(0.01)
+            auth_token_manager_for_get_token.token = {
+                **self.DEFAULT_TOKEN,
+                _EXPIRES_AT_KEY: datetime.now().timestamp() + 3600,
+            }
+
+        auth_token_manager_for_get_token._refresh_auth.side_effect = refresh
+
+        async def run():
+            return await asyncio.gather(
+                *(auth_token_manager_for_get_token.get_token() for _ in range(10))
+            )
+
+        actual_tokens = asyncio.run(run())
+
+        auth_token_manager_for_get_token._refresh_auth.assert_awaited_once()
+        assert actual_tokens == [self.DEFAULT_TOKEN[_ACCESS_TOKEN_KEY]] * 10
+
+    @pytest.fixture
+    def auth_token_manager_with_refresh_margin(self, mocker, session, tmp_path):
+        config = Config(
+            config_dict={
+                "prosper-api": {
+                    "credentials": {
+                        "client-id": "0123456789abcdef0123456789abcdef",
+                        "client-secret": "fedcba0987654321fedcba0987654321",
+                        "username": "test@test.test",
+                        "password": "password_value",
+                    },
+                    "auth": {
+                        "token-cache": str(tmp_path / "token-cache"),
+                        "refresh-margin": 300,
+                    },
+                },
+            },
+            schema=_schema(),
+        )
+        auth_token_manager = AsyncAuthTokenManager(config, session=session)
+        mocker.patch.object(auth_token_manager, "_cache_token")
+        return auth_token_manager
+
+    def test_background_refresh(self, auth_token_manager_with_refresh_margin, session):
+        auth_token_manager = auth_token_manager_with_refresh_margin
+        auth_token_manager.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime.now().timestamp() + 100,
+        }
+        renewed_token = {
+            **self.DEFAULT_TOKEN,
+            _ACCESS_TOKEN_KEY: "renewed_token",
+            _EXPIRES_AT_KEY: datetime.now().timestamp() + 3600,
+        }
+        session.request.return_value.json.return_value = renewed_token
+
+        async def run():
+            auth_token_manager.start_background_refresh()
+            refresher = auth_token_manager._refresher
+            auth_token_manager.start_background_refresh()
+            await wait_until_async(lambda: auth_token_manager.token == renewed_token)
+
+            assert auth_token_manager._refresher is refresher
+            assert await auth_token_manager.get_token() == "renewed_token"
+            await auth_token_manager.stop_background_refresh()
+            assert refresher.cancelled()
+            assert auth_token_manager._refresher is None
+
+        asyncio.run(run())
+
+        session.request.assert_awaited_once()
+        assert session.request.await_args.kwargs["data"]["grant_type"] == (
+            "refresh_token"
+        )
+
+    def test_background_refresh_retries_failures(
+        self, mocker, auth_token_manager_with_refresh_margin
+    ):
+        mocker.patch("prosper_api.auth_token_manager._MIN_REFRESH_INTERVAL", 0.01)
+        auth_token_manager = auth_token_manager_with_refresh_margin
+
+        async def initial_auth():
+            if initial_auth_mock.await_count < 3:
+                raise Exception
+            auth_token_manager.token = {
+                **self.DEFAULT_TOKEN,
+                _EXPIRES_AT_KEY: datetime.now().timestamp() + 3600,
+            }
+
+        initial_auth_mock = mocker.patch.object(
+            auth_token_manager, "_initial_auth", side_effect=initial_auth
+        )
+
+        async def run():
+            auth_token_manager.start_background_refresh()
+            await wait_until_async(lambda: auth_token_manager.token is not None)
+            await auth_token_manager.stop_background_refresh()
+
+        asyncio.run(run())
+
+        assert initial_auth_mock.await_count == 3
+
+    def test_start_background_refresh_without_margin(self, auth_token_manager):
+        with pytest.raises(ValueError):
+            auth_token_manager.start_background_refresh()
+
+    def test_stop_background_refresh_when_not_started(self, auth_token_manager):
+        asyncio.run(auth_token_manager.stop_background_refresh())
+
+        assert auth_token_manager._refresher is None
+
+    def test_get_token_when_fresh_skips_lock(self, auth_token_manager):
+        auth_token_manager.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime.now().timestamp() + 3600,
+        }
+
+        async def run():
+            async with auth_token_manager._get_lock():
+                return await asyncio.wait_for(auth_token_manager.get_token(), 5)
+
+        assert asyncio.run(run()) == self.DEFAULT_TOKEN[_ACCESS_TOKEN_KEY]
+
+    def test_get_token_generates_once_for_concurrent_processes(
+        self, tmp_path, auth_server
+    ):
+        config_dict = {
+            "prosper-api": {
+                "credentials": {
+                    "client-id": "0123456789abcdef0123456789abcdef",
+                    "client-secret": "fedcba0987654321fedcba0987654321",
+                    "username": "test@test.test",
+                    "password": "password_value",
+                },
+                "auth": {"token-cache": str(tmp_path / "token-cache")},
+            },
+        }
+        processes = 4
+        context = multiprocessing.get_context("spawn")
+        start = context.Barrier(processes)
+        tokens = context.Queue()
+        workers = [
+            context.Process(
+                target=_get_token_async_in_process,
+                args=(config_dict, auth_server.url, start, tokens),
+            )
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        results = [tokens.get(timeout=30) for _ in workers]
+        for worker in workers:
+            worker.join()
+
+        assert auth_server.grants == ["grant_type=password"]
+        assert results == ["access_token_1"] * processes
+
+    @freezegun.freeze_time("2023-10-07 12:00:01")
+    def test_get_token_uses_token_cached_by_another_process(
+        self, auth_token_manager_for_get_token
+    ):
+        auth_token_manager_for_get_token.token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime(2023, 10, 7, 12, 0, 1).timestamp(),
+        }
+        with open(auth_token_manager_for_get_token.token_cache_path, "w") as cache:
+            json.dump(
+                {
+                    **self.DEFAULT_TOKEN,
+                    _ACCESS_TOKEN_KEY: "renewed_token",
+                    _EXPIRES_AT_KEY: datetime(2023, 10, 7, 13).timestamp(),
+                },
+                cache,
+            )
+
+        actual_token = asyncio.run(auth_token_manager_for_get_token.get_token())
+
+        assert actual_token == "renewed_token"
+        auth_token_manager_for_get_token._initial_auth.assert_not_awaited()
+        auth_token_manager_for_get_token._refresh_auth.assert_not_awaited()
+
+    def test_invalidated_token_is_not_read_back_from_cache(
+        self, auth_token_manager_for_get_token
+    ):
+        valid_token = {
+            **self.DEFAULT_TOKEN,
+            _EXPIRES_AT_KEY: datetime.now().timestamp() + 3600,
+        }
+        auth_token_manager_for_get_token.token = valid_token
+        with open(auth_token_manager_for_get_token.token_cache_path, "w") as cache:
+            json.dump(valid_token, cache)
+
+        async def refresh_auth():
+            auth_token_manager_for_get_token.token = {
+                **valid_token,
+                _ACCESS_TOKEN_KEY: "renewed_token",
+            }
+
+        auth_token_manager_for_get_token._refresh_auth.side_effect = refresh_auth
+
+        auth_token_manager_for_get_token.invalidate_token(
+            self.DEFAULT_TOKEN[_ACCESS_TOKEN_KEY]
+        )
+        actual_token = asyncio.run(auth_token_manager_for_get_token.get_token())
+
+        auth_token_manager_for_get_token._refresh_auth.assert_awaited_once()
+        assert actual_token == "renewed_token"
@@ -0,0 +1,123 @@
+import json
+import math
+from datetime import datetime, timezone
+
+import numpy
+import pytest
+
+from prosper_api.batch import (
+    DATE_COLUMNS,
+    ENUM_COLUMNS,
+    MISSING_CODE,
+    NUMERIC_COLUMNS,
+    ListingBatch,
+)
+from prosper_api.models import SearchListingsResponse
+from prosper_api.models.enums import BorrowerState, FICOScore, ProsperRating
+
+
+class TestListingBatch:
+    @pytest.fixture
+    def response_text(self, response_json):
+        return response_json("search_listings_response")
+
+    @pytest.fixture
+    def response(self, response_text):
+        return SearchListingsResponse.model_validate_json(response_text)
+
+    def test_columns(self):
+        assert "lender_yield" in NUMERIC_COLUMNS
+        assert "at02s_open_accounts" in NUMERIC_COLUMNS
+        assert "listing_number" not in NUMERIC_COLUMNS
+        assert "listing_title" not in NUMERIC_COLUMNS
+        assert ENUM_COLUMNS["prosper_rating"] is ProsperRating
+        assert ENUM_COLUMNS["borrower_state"] is BorrowerState
+        assert ENUM_COLUMNS["fico_score"] is FICOScore
+        assert "listing_start_date" in DATE_COLUMNS
+        assert "credit_report_date" in DATE_COLUMNS
+        assert "listing_start_date" not in NUMERIC_COLUMNS
+
+    def test_from_response(self, response):
+        listing = response.result[0]
+
+        batch = ListingBatch.from_response(response)
+
+        assert len(batch) == 1
+        assert list(batch.listing_number) == [listing.listing_number]
+        assert batch.columns["lender_yield"][0] == float(listing.lender_yield)
+        assert batch.columns["invested"][0] == float(listing.invested)
+        assert batch.columns["at02s_open_accounts"][0] == float(
+            listing.credit_bureau_values_transunion_indexed.at02s_open_accounts
+        )
+        assert (
+            batch.columns["listing_start_date"][0]
+            == datetime(2023, 8, 28, 22, 0, 47, tzinfo=timezone.utc).timestamp()
+        )
+        assert batch.decode("prosper_rating") == [listing.prosper_rating]
+        assert batch.decode("fico_score") == [
+            listing.credit_bureau_values_transunion_indexed.fico_score
+        ]
+
+    def test_from_raw_response_matches_models(self, response, response_text):
+        from_models = ListingBatch.from_response(response)
+        from_text = ListingBatch.from_response(response_text)
+        from_bytes = ListingBatch.from_response(response_text.encode())
+
+        for batch in (from_text, from_bytes):
+            assert batch.listing_number == from_models.listing_number
+            for name, column in from_models.columns.items():
+                assert all(
+                    a == b or (math.isnan(a) and math.isnan(b))
+                    for a, b in zip(batch.columns[name], column)
+                ), name
+
+    def test_missing_and_unknown_values(self, response_text):
+        record = json.loads(response_text)["result"][0]
+        record["amount_remaining"] = None
+        record["listing_end_date"] = None
+        record["prosper_rating"] = "Z"
+        del record["occupation"]
+        del record["credit_bureau_values_transunion_indexed"]
+
+        batch = ListingBatch.from_records([record])
+
+        assert math.isnan(batch.columns["amount_remaining"][0])
+        assert math.isnan(batch.columns["at02s_open_accounts"][0])
+        assert math.isnan(batch.columns["listing_end_date"][0])
+        assert batch.columns["prosper_rating"][0] == MISSING_CODE
+        assert batch.decode("occupation") == [None]
+        assert batch.decode("fico_score") == [None]
+
+    def test_to_numpy_shares_memory(self, response):
+        batch = ListingBatch.from_listings(response.result * 3)
+
+        arrays = batch.to_numpy()
+
+        assert arrays["listing_number"].dtype == numpy.int64
+        assert arrays["lender_yield"].dtype == numpy.float64
+        assert arrays["prosper_rating"].dtype == numpy.int16
+        assert arrays["lender_yield"].shape == (3,)
+        arrays["lender_yield"][0] = 0.5
+        assert batch.columns["lender_yield"][0] == 0.5
+        with pytest.raises(BufferError):
+            batch.listing_number.append(1)
+
+    def test_vectorized_filter(self, response):
+        listings = [
+            response.result[0].model_copy(
+                update={"listing_number": n, "prosper_rating": rating}
+            )
+            for n, rating in enumerate([ProsperRating.AA, ProsperRating.HR])
+        ]
+        arrays = ListingBatch.from_listings(listings).to_numpy()
+
+        aa = list(ProsperRating).index(ProsperRating.AA)
+        selected = arrays["listing_number"][arrays["prosper_rating"] == aa]
+
+        assert selected.tolist() == [0]
+
+    def test_empty(self):
+        batch = ListingBatch.from_records([])
+
+        assert len(batch) == 0
+        assert batch.to_numpy()["lender_yield"].shape == (0,)
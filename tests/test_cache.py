@@ -0,0 +1,126 @@
+import pytest
+from prosper_shared.omni_config import Config
+
+from prosper_api.cache import (
+    ACCOUNT_ENDPOINT,
+    LISTINGS_ENDPOINT,
+    NOTES_ENDPOINT,
+    PAYMENTS_ENDPOINT,
+    CacheStats,
+    ResponseCache,
+    _schema,
+)
+
+
+class TestResponseCache:
+    @pytest.fixture
+    def monotonic_mock(self, mocker):
+        monotonic_mock = mocker.patch("prosper_api.cache.monotonic")
+        monotonic_mock.return_value = 1000.0
+        return monotonic_mock
+
+    def test_get_and_put(self, monotonic_mock):
+        cache = ResponseCache()
+
+        assert cache.get(NOTES_ENDPOINT, {"offset": 0}) is None
+        cache.put(NOTES_ENDPOINT, {"offset": 0}, "response")
+
+        assert cache.get(NOTES_ENDPOINT, {"offset": 0}) == "response"
+        assert cache.get(NOTES_ENDPOINT, {"offset": 25}) is None
+        assert cache.get(ACCOUNT_ENDPOINT, {"offset": 0}) is None
+        assert cache.stats() == CacheStats(hits=1, misses=3, evictions=0, size=1)
+        assert cache.stats().hit_rate == 0.25
+
+    def test_key_ignores_param_order_and_unset_params(self, monotonic_mock):
+        cache = ResponseCache()
+
+        cache.put(NOTES_ENDPOINT, {"offset": 0, "limit": 25, "sort_by": None}, "r")
+
+        assert cache.get(NOTES_ENDPOINT, {"limit": 25, "offset": 0}) == "r"
+
+    def test_responses_expire_after_endpoint_ttl(self, monotonic_mock):
+        cache = ResponseCache(ttls={ACCOUNT_ENDPOINT: 5, NOTES_ENDPOINT: 60})
+        cache.put(ACCOUNT_ENDPOINT, {}, "account")
+        cache.put(NOTES_ENDPOINT, {}, "notes")
+
+        monotonic_mock.return_value = 1004.9
+        assert cache.get(ACCOUNT_ENDPOINT, {}) == "account"
+
+        monotonic_mock.return_value = 1005.0
+        assert cache.get(ACCOUNT_ENDPOINT, {}) is None
+        assert cache.get(NOTES_ENDPOINT, {}) == "notes"
+        assert cache.stats().size == 1
+
+    def test_least_recently_used_is_evicted(self, monotonic_mock):
+        cache = ResponseCache(max_size=2)
+        cache.put(NOTES_ENDPOINT, {"offset": 0}, "first")
+        cache.put(NOTES_ENDPOINT, {"offset": 25}, "second")
+        cache.get(NOTES_ENDPOINT, {"offset": 0})
+
+        cache.put(NOTES_ENDPOINT, {"offset": 50}, "third")
+
+        assert cache.get(NOTES_ENDPOINT, {"offset": 0}) == "first"
+        assert cache.get(NOTES_ENDPOINT, {"offset": 25}) is None
+        assert cache.get(NOTES_ENDPOINT, {"offset": 50}) == "third"
+        assert cache.stats().evictions == 1
+
+    @pytest.mark.parametrize(
+        ["max_size", "endpoint"],
+        [(256, LISTINGS_ENDPOINT), (256, "unknown"), (0, NOTES_ENDPOINT)],
+    )
+    def test_uncached_endpoints(self, monotonic_mock, max_size, endpoint):
+        cache = ResponseCache(max_size=max_size)
+
+        cache.put(endpoint, {}, "response")
+
+        assert cache.get(endpoint, {}) is None
+        assert cache.stats() == CacheStats(hits=0, misses=0, evictions=0, size=0)
+
+    def test_clear(self, monotonic_mock):
+        cache = ResponseCache()
+        cache.put(NOTES_ENDPOINT, {}, "notes")
+
+        cache.clear()
+
+        assert cache.get(NOTES_ENDPOINT, {}) is None
+        assert cache.stats().size == 0
+
+    def test_put_from_before_clear_is_dropped(self, monotonic_mock):
+        cache = ResponseCache()
+        generation = cache.generation
+
+        cache.clear()
+        cache.put(NOTES_ENDPOINT, {}, "stale", generation)
+        cache.put(ACCOUNT_ENDPOINT, {}, "fresh", cache.generation)
+
+        assert cache.generation == generation + 1
+        assert cache.get(NOTES_ENDPOINT, {}) is None
+        assert cache.get(ACCOUNT_ENDPOINT, {}) == "fresh"
+
+    def test_hit_rate_without_lookups(self):
+        assert ResponseCache().stats().hit_rate == 0.0
+
+    def test_from_config_disabled_by_default(self):
+        assert ResponseCache.from_config(Config(config_dict={})) is None
+
+    def test_from_config(self):
+        cache = ResponseCache.from_config(
+            Config(
+                config_dict={
+                    "prosper-api": {
+                        "cache": {
+                            "enabled": True,
+                            "max-size": 10,
+                            "account-ttl": 1,
+                            "listings-ttl": 2,
+                        }
+                    }
+                },
+                schema=_schema(),
+            )
+        )
+
+        assert cache.max_size == 10
+        assert cache.ttls[ACCOUNT_ENDPOINT] == 1
+        assert cache.ttls[LISTINGS_ENDPOINT] == 2
+        assert cache.ttls[PAYMENTS_ENDPOINT] == 300
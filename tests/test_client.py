@@ -1,12 +1,47 @@
+import io
+import threading
+import time
 from copy import deepcopy
-from datetime import datetime
 from decimal import Decimal
 from json import dumps
 
 import pytest
+import requests
+from prosper_shared.omni_config import Config
 
-from prosper_api.client import Client, _bool_val
-from prosper_api.models import BidStatus, ListPaymentsRequest, SearchListingsRequest
+from prosper_api.cache import ResponseCache
+from prosper_api.client import Client, _chunk_loan_numbers
+from prosper_api.models import (
+    BidStatus,
+    ListLoansRequest,
+    ListNotesRequest,
+    ListNotesResponse,
+    ListOrdersRequest,
+    ListPaymentsRequest,
+    ListPaymentsResponse,
+    SearchListingsRequest,
+)
+from prosper_api.query import SearchListingsQuery
+from prosper_api.rate_limit import FileRateLimiter, TokenBucketRateLimiter
+from prosper_api.scheduler import RequestPriority
+from prosper_api.session import PooledSession
+
+
+def _response(status_code, text="{}", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "Too Many Requests" if status_code == 429 else "OK"
+    response.url = "some_url"
+    response.headers.update(headers or {})
+    response._content = text.encode()
+    return response
+
+
+def _streamed_response(status_code, body=b"{}", headers=None):
+    response = _response(status_code, headers=headers)
+    response._content = False
+    response.raw = io.BytesIO(body)
+    return response
 
 
 class TestClient:
@@ -16,11 +51,13 @@ class TestClient:
 
     @pytest.fixture
     def config_mock(self, mocker):
-        return mocker.patch("prosper_api.client.Config")
+        config_mock = mocker.patch("prosper_api.client.Config")
+        config_mock.autoconfig.return_value = Config(config_dict={})
+        return config_mock
 
     @pytest.fixture
     def request_mock(self, mocker):
-        return mocker.patch("requests.request")
+        return mocker.patch("requests.Session.request")
 
     @pytest.fixture
     def client_for_api_tests(self, mocker, auth_token_manager_mock, config_mock):
@@ -34,9 +71,10 @@ class TestClient:
 
         config_mock.autoconfig.assert_called_once()
         auth_token_manager_mock.assert_called_once_with(
-            config_mock.autoconfig.return_value
+            config_mock.autoconfig.return_value, session=client._session
         )
         assert client._auth_token_manager == auth_token_manager_mock.return_value
+        assert isinstance(client._session, PooledSession)
 
     def test_init_default_auth_token_manager(
         self, config_mock, auth_token_manager_mock
@@ -44,7 +82,9 @@ class TestClient:
         client = Client(config_mock.return_value)
 
         config_mock.assert_not_called()
-        auth_token_manager_mock.assert_called_once_with(config_mock.return_value)
+        auth_token_manager_mock.assert_called_once_with(
+            config_mock.return_value, session=client._session
+        )
         assert client._auth_token_manager == auth_token_manager_mock.return_value
 
     def test_init_no_default(self, config_mock, auth_token_manager_mock):
@@ -54,6 +94,62 @@ class TestClient:
         auth_token_manager_mock.assert_not_called()
         assert client._auth_token_manager == auth_token_manager_mock.return_value
 
+    def test_init_with_session(self, mocker, config_mock, auth_token_manager_mock):
+        session = mocker.MagicMock()
+
+        client = Client(session=session)
+
+        auth_token_manager_mock.assert_called_once_with(
+            config_mock.autoconfig.return_value, session=session
+        )
+        assert client._session == session
+
+    def test_context_manager_closes_owned_session(
+        self, mocker, config_mock, auth_token_manager_mock
+    ):
+        close_mock = mocker.patch.object(PooledSession, "close")
+
+        with Client() as client:
+            assert isinstance(client, Client)
+            close_mock.assert_not_called()
+
+        close_mock.assert_called_once()
+
+    def test_close_leaves_provided_session_open(
+        self, mocker, config_mock, auth_token_manager_mock
+    ):
+        session = mocker.MagicMock()
+
+        with Client(session=session):
+            pass
+
+        session.close.assert_not_called()
+
+    def test_background_token_refresh(self, auth_token_manager_mock):
+        client = Client(
+            Config(config_dict={"prosper-api": {"auth": {"refresh-margin": 300}}})
+        )
+
+        auth_token_manager_mock.return_value.start_background_refresh.assert_called_once()
+        client.close()
+        auth_token_manager_mock.return_value.stop_background_refresh.assert_called_once()
+
+    def test_background_token_refresh_disabled_by_default(
+        self, config_mock, auth_token_manager_mock
+    ):
+        Client().close()
+
+        auth_token_manager_mock.return_value.start_background_refresh.assert_not_called()
+
+    def test_close_leaves_provided_auth_token_manager_running(
+        self, mocker, config_mock
+    ):
+        auth_token_manager = mocker.MagicMock()
+
+        Client(auth_token_manager=auth_token_manager).close()
+
+        auth_token_manager.stop_background_refresh.assert_not_called()
+
     _DEFAULT_SEARCH_FILTERS = {
         "amount_funded_max": None,
         "amount_funded_min": None,
@@ -451,6 +547,7 @@ class TestClient:
         client_for_api_tests._do_get.assert_called_once_with(
             "https://api.prosper.com/listingsvc/v2/listings/",
             {**self._DEFAULT_SEARCH_FILTERS, **expected_call},
+            priority=RequestPriority.SEARCH,
         )
         assert len(result.result) == 1
         assert result.result[0].listing_number == 11111111
@@ -468,6 +565,7 @@ class TestClient:
         client_for_api_tests._do_get.assert_called_once_with(
             "https://api.prosper.com/listingsvc/v2/listings/",
             {**self._DEFAULT_SEARCH_FILTERS, "invested": "true"},
+            priority=RequestPriority.SEARCH,
         )
         assert len(result.result) == 1
         assert result.result[0].listing_number == 11111111
@@ -483,11 +581,168 @@ class TestClient:
         client_for_api_tests._do_get.assert_called_once_with(
             "https://api.prosper.com/listingsvc/v2/listings/",
             {**self._DEFAULT_SEARCH_FILTERS, "invested": "false"},
+            priority=RequestPriority.SEARCH,
         )
         assert len(result.result) == 1
         assert result.result[0].listing_number == 11111111
         assert result.result[0].borrower_rate == Decimal("0.1395")
 
+    def test_search_with_query(self, client_for_api_tests):
+        client_for_api_tests._do_get.return_value = self._SEARCH_LISTINGS_RESULT
+        query = SearchListingsQuery(SearchListingsRequest(invested=False))
+
+        result = client_for_api_tests.search_listings(
+            query.model_copy(update={"offset": 25})
+        )
+
+        client_for_api_tests._do_get.assert_called_once_with(
+            "https://api.prosper.com/listingsvc/v2/listings/",
+            {**self._DEFAULT_SEARCH_FILTERS, "invested": "false", "offset": 25},
+            priority=RequestPriority.SEARCH,
+        )
+        assert result.result[0].listing_number == 11111111
+
+    @pytest.mark.parametrize(
+        "request_",
+        [
+            None,
+            SearchListingsRequest(invested=False),
+            SearchListingsQuery(SearchListingsRequest(invested=False)),
+        ],
+    )
+    def test_search_listings_batch(self, client_for_api_tests, response_json, request_):
+        client_for_api_tests._do_get.return_value = response_json(
+            "search_listings_response"
+        )
+
+        batch = client_for_api_tests.search_listings_batch(request_)
+
+        url, params = client_for_api_tests._do_get.call_args.args
+        assert client_for_api_tests._do_get.call_args.kwargs == {
+            "priority": RequestPriority.SEARCH
+        }
+        assert url == "https://api.prosper.com/listingsvc/v2/listings/"
+        assert params["sort_by"] == "lender_yield desc"
+        assert list(batch.listing_number) == [11111111]
+        assert batch.columns["borrower_rate"][0] == 0.1395
+
+    @pytest.mark.parametrize(
+        ["method", "args", "response_name", "fields"],
+        [
+            ("search_listings", [None], "search_listings_response", ["listing_number"]),
+            ("list_notes", [], "list_notes_response", ["loan_note_id"]),
+            ("list_orders", [], "list_orders_response", ["order_id"]),
+            ("list_loans", [], "list_loans_response", ["loan_number"]),
+            (
+                "list_payments",
+                [ListPaymentsRequest(loan_number=[2300367])],
+                "list_payments_response",
+                ["payment_amount"],
+            ),
+        ],
+    )
+    def test_list_with_fields(
+        self, client_for_api_tests, response_json, method, args, response_name, fields
+    ):
+        client_for_api_tests._do_get.return_value = response_json(response_name)
+
+        result = getattr(client_for_api_tests, method)(*args, fields=fields)
+
+        assert result.result
+        assert all(list(r.model_dump()) == fields for r in result.result)
+
+    @pytest.mark.parametrize(
+        ["method", "args"],
+        [
+            ("get_account_info_raw", []),
+            ("search_listings_raw", [None]),
+            ("list_notes_raw", []),
+            ("list_orders_raw", []),
+            ("list_loans_raw", []),
+            ("list_payments_raw", [ListPaymentsRequest(loan_number=[2300367])]),
+        ],
+    )
+    def test_raw(self, client_for_api_tests, method, args):
+        client_for_api_tests._do_get.return_value = b'{"result": []}'
+
+        response = getattr(client_for_api_tests, method)(*args)
+
+        assert response is client_for_api_tests._do_get.return_value
+        client_for_api_tests._do_get.assert_called_once()
+
+    @pytest.mark.parametrize(
+        ["method", "args", "response_name", "fields"],
+        [
+            ("iter_listings", [], "search_listings_response", ["listing_number"]),
+            ("iter_notes", [], "list_notes_response", ["loan_note_id"]),
+            ("iter_orders", [], "list_orders_response", ["order_id"]),
+            ("iter_loans", [], "list_loans_response", ["loan_number"]),
+            (
+                "iter_payments",
+                [ListPaymentsRequest(loan_number=[2300367])],
+                "list_payments_response",
+                ["payment_amount"],
+            ),
+        ],
+    )
+    def test_iter_with_fields(
+        self, client_for_api_tests, response_json, method, args, response_name, fields
+    ):
+        client_for_api_tests._do_get.return_value = response_json(response_name)
+
+        results = list(getattr(client_for_api_tests, method)(*args, fields=fields))
+
+        assert results
+        assert all(list(r.model_dump()) == fields for r in results)
+
+    @pytest.mark.parametrize(
+        ["method", "list_method", "args", "response_name"],
+        [
+            ("stream_listings", "search_listings", [None], "search_listings_response"),
+            ("stream_notes", "list_notes", [], "list_notes_response"),
+            ("stream_orders", "list_orders", [], "list_orders_response"),
+            ("stream_loans", "list_loans", [], "list_loans_response"),
+            (
+                "stream_payments",
+                "list_payments",
+                [ListPaymentsRequest(loan_number=[2300367])],
+                "list_payments_response",
+            ),
+        ],
+    )
+    def test_stream(
+        self,
+        mocker,
+        client_for_api_tests,
+        response_json,
+        method,
+        list_method,
+        args,
+        response_name,
+    ):
+        raw = response_json(response_name).encode()
+        do_stream_mock = mocker.patch.object(
+            client_for_api_tests, "_do_stream", return_value=iter([raw[:50], raw[50:]])
+        )
+        client_for_api_tests._do_get.return_value = raw
+
+        results = list(getattr(client_for_api_tests, method)(*args))
+
+        assert results == getattr(client_for_api_tests, list_method)(*args).result
+        assert do_stream_mock.call_args == client_for_api_tests._do_get.call_args
+
+    def test_stream_with_fields(self, mocker, client_for_api_tests, response_json):
+        mocker.patch.object(
+            client_for_api_tests,
+            "_do_stream",
+            return_value=iter([response_json("list_notes_response").encode()]),
+        )
+
+        results = list(client_for_api_tests.stream_notes(fields=["loan_note_id"]))
+
+        assert results
+        assert all(list(r.model_dump()) == ["loan_note_id"] for r in results)
+
     def test_list_notes(self, client_for_api_tests):
         client_for_api_tests._do_get.return_value = dumps(
             {
@@ -591,7 +846,9 @@ class TestClient:
         account = client_for_api_tests.get_account_info()
 
         client_for_api_tests._do_get.assert_called_once_with(
-            "https://api.prosper.com/v1/accounts/prosper/", {}
+            "https://api.prosper.com/v1/accounts/prosper/",
+            {},
+            priority=RequestPriority.SEARCH,
         )
         assert account.total_account_value == Decimal("1111.11")
         assert account.invested_notes.E == Decimal("1111.056157")
@@ -793,27 +1050,27 @@ class TestClient:
             (
                 True,
                 None,
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
             (
                 True,
                 {"param1": "value1", "param2": 2.0},
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
             (
                 False,
                 {"param1": "value1", "param2": 2.0},
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
             (
                 True,
                 {"param1": "value1", "param2": Decimal(2.0)},
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
             (
                 False,
                 {"param1": "value1", "param2": Decimal(2.0)},
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
         ],
     )
@@ -825,13 +1082,10 @@ class TestClient:
         caplog,
         parse_decimals_config: bool,
         input_val: dict,
-        return_val: str,
+        return_val: bytes,
     ):
         auth_token_manager_mock.return_value.get_token.return_value = "auth_token"
-        request_mock.return_value.text = return_val
-        config_mock.autoconfig.return_value.get_as_bool.return_value = (
-            parse_decimals_config
-        )
+        request_mock.return_value.content = return_val
 
         response = Client()._do_get("some_url", input_val)
 
@@ -845,6 +1099,7 @@ class TestClient:
                 "Authorization": "bearer auth_token",
                 "Accept": "application/json",
             },
+            stream=False,
         )
 
     @pytest.mark.parametrize(
@@ -857,27 +1112,27 @@ class TestClient:
             (
                 True,
                 None,
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
             (
                 True,
                 {"param1": "value1", "param2": 2.0},
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
             (
                 False,
                 {"param1": "value1", "param2": 2.0},
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
             (
                 True,
                 {"param1": "value1", "param2": Decimal(2.0)},
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
             (
                 False,
                 {"param1": "value1", "param2": Decimal(2.0)},
-                '{"p1": "v1", "p2": 2.0}',
+                b'{"p1": "v1", "p2": 2.0}',
             ),
         ],
     )
@@ -889,13 +1144,10 @@ class TestClient:
         caplog,
         parse_decimals_config: bool,
         input_val: dict,
-        return_val: str,
+        return_val: bytes,
     ):
         auth_token_manager_mock.return_value.get_token.return_value = "auth_token"
-        request_mock.return_value.text = return_val
-        config_mock.autoconfig.return_value.get_as_bool.return_value = (
-            parse_decimals_config
-        )
+        request_mock.return_value.content = return_val
 
         response = Client()._do_post("some_url", input_val)
 
@@ -909,19 +1161,577 @@ class TestClient:
                 "Authorization": "bearer auth_token",
                 "Accept": "application/json",
             },
+            stream=False,
         )
 
-    def test_bool_val_when_invalid(self):
-        with pytest.raises(ValueError):
-            _bool_val("blah")
+    def test_rate_limiting(
+        self, mocker, auth_token_manager_mock, config_mock, request_mock
+    ):
+        monotonic_mock = mocker.patch("prosper_api.rate_limit.monotonic")
+        monotonic_mock.return_value = 1000.0
+        sleep_mock = mocker.patch("prosper_api.rate_limit.sleep")
 
-    @pytest.mark.skip("Takes too long; refactor to mock the sleeps")
-    def test_rate_limiting(self, auth_token_manager_mock, request_mock):
-        client: Client = Client()
-        start_time = datetime.now().timestamp()
+        def advance_clock(seconds):
+            monotonic_mock.return_value += seconds
+
+        sleep_mock.side_effect = advance_clock
+        client: Client = Client(rate_limiter=TokenBucketRateLimiter())
         for i in range(41):
             client._do_request("GET", "http://localhost:12345")
-        end_time = datetime.now().timestamp()
 
-        # We allow 20 requests per second; 41 requests are required to ensure the test lasts at least 1 seconds in case it starts at an unlucky time
-        assert end_time - start_time >= 1
+        # We allow 20 requests per second, evenly spaced
+        assert monotonic_mock.return_value - 1000.0 == pytest.approx(2.0)
+        assert request_mock.call_count == 41
+
+    def test_rate_limiter_shared_by_default(self, config_mock, auth_token_manager_mock):
+        client = Client()
+        other_client = Client()
+
+        assert isinstance(client.rate_limiter, TokenBucketRateLimiter)
+        assert client.rate_limiter is other_client.rate_limiter
+
+    @pytest.mark.parametrize(
+        ["method", "list_method", "request_", "expected_request", "response_name"],
+        [
+            (
+                "iter_listings",
+                "search_listings",
+                None,
+                SearchListingsRequest(offset=0, limit=500),
+                "search_listings_response",
+            ),
+            (
+                "iter_listings",
+                "search_listings",
+                SearchListingsQuery(SearchListingsRequest(invested=False)),
+                SearchListingsQuery(
+                    SearchListingsRequest(invested=False, offset=0, limit=500)
+                ),
+                "search_listings_response",
+            ),
+            (
+                "iter_notes",
+                "list_notes",
+                None,
+                ListNotesRequest(offset=0, limit=25),
+                "list_notes_response",
+            ),
+            (
+                "iter_orders",
+                "list_orders",
+                None,
+                ListOrdersRequest(offset=0, limit=25),
+                "list_orders_response",
+            ),
+            (
+                "iter_loans",
+                "list_loans",
+                None,
+                ListLoansRequest(offset=0, limit=25),
+                "list_loans_response",
+            ),
+            (
+                "iter_payments",
+                "list_payments",
+                ListPaymentsRequest(loan_number=[2300367]),
+                ListPaymentsRequest(loan_number=[2300367], offset=0, limit=25),
+                "list_payments_response",
+            ),
+        ],
+    )
+    def test_iter(
+        self,
+        mocker,
+        client_for_api_tests,
+        response_json,
+        method,
+        list_method,
+        request_,
+        expected_request,
+        response_name,
+    ):
+        response_type = getattr(Client, list_method).__annotations__["return"]
+        response = response_type.model_validate_json(response_json(response_name))
+        list_mock = mocker.patch.object(
+            client_for_api_tests, list_method, return_value=response
+        )
+
+        results = list(getattr(client_for_api_tests, method)(request_))
+
+        assert results == response.result
+        list_mock.assert_called_once_with(expected_request)
+
+    def test_iter_with_prefetch(self, mocker, client_for_api_tests, response_json):
+        response = ListNotesResponse.model_validate_json(
+            response_json("list_notes_response")
+        )
+        paginate_mock = mocker.patch(
+            "prosper_api.client.paginate", return_value=iter(response.result)
+        )
+
+        results = list(client_for_api_tests.iter_notes(prefetch=2))
+
+        assert results == response.result
+        paginate_mock.assert_called_once_with(
+            client_for_api_tests.list_notes, ListNotesRequest(), 25, 2
+        )
+
+    @pytest.mark.parametrize(
+        ["method", "list_method", "request_", "response_name", "expected_pages"],
+        [
+            (
+                "fetch_all_listings",
+                "search_listings",
+                None,
+                "search_listings_response",
+                2,
+            ),
+            ("fetch_all_notes", "list_notes", None, "list_notes_response", 24),
+            ("fetch_all_orders", "list_orders", None, "list_orders_response", 24),
+            ("fetch_all_loans", "list_loans", None, "list_loans_response", 24),
+            (
+                "fetch_all_payments",
+                "list_payments",
+                ListPaymentsRequest(loan_number=[2300367]),
+                "list_payments_response",
+                24,
+            ),
+        ],
+    )
+    def test_fetch_all(
+        self,
+        mocker,
+        client_for_api_tests,
+        response_json,
+        method,
+        list_method,
+        request_,
+        response_name,
+        expected_pages,
+    ):
+        response_type = getattr(Client, list_method).__annotations__["return"]
+        response = response_type.model_validate_json(response_json(response_name))
+        # Every page repeats the same results.
+        response.total_count = 600
+        list_mock = mocker.patch.object(
+            client_for_api_tests, list_method, return_value=response
+        )
+
+        results = getattr(client_for_api_tests, method)(request_)
+
+        assert results == response.result
+        assert list_mock.call_count == expected_pages
+
+    @pytest.fixture
+    def list_payments_for_chunk(self, response_json):
+        payment = ListPaymentsResponse.model_validate_json(
+            response_json("list_payments_response")
+        ).result[0]
+
+        def list_payments(request):
+            page = [
+                payment.model_copy(update={"loan_number": loan_number})
+                for loan_number in request.loan_number
+            ]
+            return ListPaymentsResponse(
+                result=page, result_count=len(page), total_count=len(page)
+            )
+
+        return list_payments
+
+    def test_iter_payments_for_loans(
+        self, mocker, client_for_api_tests, list_payments_for_chunk
+    ):
+        list_mock = mocker.patch.object(
+            client_for_api_tests, "list_payments", side_effect=list_payments_for_chunk
+        )
+        loan_numbers = list(range(1_000_000, 1_001_000))
+
+        results = list(
+            client_for_api_tests.iter_payments_for_loans(
+                loan_numbers + loan_numbers[:10], "2025-02-02"
+            )
+        )
+
+        assert sorted(p.loan_number for p in results) == loan_numbers
+        requests_ = [call.args[0] for call in list_mock.call_args_list]
+        assert len(requests_) == 7
+        assert all(len(r.loan_number) <= 150 for r in requests_)
+        assert all(r.transaction_effective_date == "2025-02-02" for r in requests_)
+
+    def test_iter_payments_for_loans_retries_failed_chunk(
+        self, mocker, client_for_api_tests, list_payments_for_chunk
+    ):
+        sleep_mock = mocker.patch("backoff._sync.time.sleep")
+        failed = []
+
+        def list_payments(request):
+            if request.loan_number[0] == 1_000_150 and not failed:
+                failed.append(request)
+                raise requests.ConnectionError("boom")
+            return list_payments_for_chunk(request)
+
+        list_mock = mocker.patch.object(
+            client_for_api_tests, "list_payments", side_effect=list_payments
+        )
+        loan_numbers = list(range(1_000_000, 1_000_300))
+
+        results = list(client_for_api_tests.iter_payments_for_loans(loan_numbers))
+
+        assert sorted(p.loan_number for p in results) == loan_numbers
+        # Only the failed chunk is fetched again.
+        assert list_mock.call_count == 3
+        sleep_mock.assert_called_once()
+
+    @pytest.mark.parametrize(
+        ["status_code", "expected_tries"], [(400, 1), (429, 3), (500, 3)]
+    )
+    def test_iter_payments_for_loans_gives_up(
+        self, mocker, client_for_api_tests, status_code, expected_tries
+    ):
+        mocker.patch("backoff._sync.time.sleep")
+        list_mock = mocker.patch.object(
+            client_for_api_tests,
+            "list_payments",
+            side_effect=requests.HTTPError(response=_response(status_code)),
+        )
+
+        with pytest.raises(requests.HTTPError):
+            list(client_for_api_tests.iter_payments_for_loans([2300367]))
+
+        assert list_mock.call_count == expected_tries
+
+    @pytest.mark.parametrize(
+        ["loan_numbers", "max_length", "expected_chunks"],
+        [
+            ([], 10, []),
+            ([1, 22, 333], 10, [[1, 22], [333]]),
+            ([1, 22, 1, 333], 100, [[1, 22, 333]]),
+            ([1234567890], 5, [[1234567890]]),
+        ],
+    )
+    def test_chunk_loan_numbers(self, loan_numbers, max_length, expected_chunks):
+        assert list(_chunk_loan_numbers(loan_numbers, max_length)) == expected_chunks
+
+    def test_cached_responses_skip_api_until_order(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock, response_json
+    ):
+        request_mock.return_value = _response(200, response_json("account_response"))
+        client = Client(cache=ResponseCache())
+        mocker.patch.object(
+            client, "_do_post", return_value=response_json("order_response")
+        )
+
+        first = client.get_account_info()
+        second = client.get_account_info()
+        client.order(11111111, Decimal("25"))
+        third = client.get_account_info()
+
+        assert first == second == third
+        assert request_mock.call_count == 2
+        assert client.cache.stats().hits == 1
+        assert client.cache.stats().misses == 2
+
+    def test_order_during_get_isnt_cached_over(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock, response_json
+    ):
+        in_flight = threading.Event()
+        released = threading.Event()
+        response = _response(200, response_json("account_response"))
+
+        def respond(*args, **kwargs):
+            if request_mock.call_count == 1:
+                in_flight.set()
+                released.wait(5)
+            return response
+
+        request_mock.side_effect = respond
+        client = Client(cache=ResponseCache())
+        mocker.patch.object(
+            client, "_do_post", return_value=response_json("order_response")
+        )
+
+        get = threading.Thread(target=client.get_account_info)
+        get.start()
+        in_flight.wait(5)
+        client.order(11111111, Decimal("25"))
+        released.set()
+        get.join(5)
+        client.get_account_info()
+
+        assert request_mock.call_count == 2
+        assert client.cache.stats().size == 1
+
+    def test_trusted_parsing_from_config(
+        self, mocker, auth_token_manager_mock, response_json
+    ):
+        client = Client(
+            Config(config_dict={"prosper-api": {"parsing": {"trusted": True}}})
+        )
+        raw = response_json("list_notes_response")
+        mocker.patch.object(client, "_do_get", return_value=raw)
+        parse_mock = mocker.patch("prosper_api.client.parse_response")
+
+        client.list_notes()
+
+        parse_mock.assert_called_once_with(ListNotesResponse, raw, None, True)
+
+    def test_cache_from_config(self, auth_token_manager_mock):
+        client = Client(
+            Config(config_dict={"prosper-api": {"cache": {"enabled": True}}})
+        )
+
+        assert isinstance(client.cache, ResponseCache)
+
+    def test_cache_disabled_by_default(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        request_mock.return_value = _response(200)
+        client = Client()
+
+        client._do_get("some_url")
+        client._do_get("some_url")
+        client._invalidate_cache()
+
+        assert client.cache is None
+        assert request_mock.call_count == 2
+
+    def test_concurrent_identical_gets_share_one_call(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        release = threading.Event()
+
+        def respond(*args, **kwargs):
+            release.wait(5)
+            return _response(200, '{"p1": "v1"}')
+
+        request_mock.side_effect = respond
+        client = Client()
+        responses = []
+        threads = [
+            threading.Thread(
+                target=lambda: responses.append(
+                    client._do_get("some_url", {"b": 2, "a": 1})
+                )
+            )
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        while client._single_flight.coalesced < 2:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert responses == [b'{"p1": "v1"}'] * 3
+        request_mock.assert_called_once()
+
+    def test_calls_scheduled_by_priority(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        request_mock.return_value.content = b"{}"
+        client = Client()
+
+        client._do_post("some_url")
+        client._do_get("some_url")
+        client._do_get("some_url", priority=RequestPriority.SEARCH)
+        client._do_get("some_url")
+
+        stats = client.scheduler.stats()
+        assert stats[RequestPriority.ORDER].served == 1
+        assert stats[RequestPriority.SEARCH].served == 1
+        assert stats[RequestPriority.BULK].served == 2
+
+    def test_throttled_get_is_retried(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock
+    ):
+        rate_limiter = mocker.MagicMock()
+        request_mock.side_effect = [
+            _response(429, headers={"Retry-After": "2"}),
+            _response(429),
+            _response(200, '{"p1": "v1"}'),
+        ]
+
+        response = Client(rate_limiter=rate_limiter)._do_get("some_url")
+
+        assert response == b'{"p1": "v1"}'
+        assert request_mock.call_count == 3
+        assert rate_limiter.acquire.call_count == 3
+        assert rate_limiter.throttled.call_args_list == [
+            mocker.call(2.0),
+            mocker.call(None),
+        ]
+        rate_limiter.succeeded.assert_called_once()
+
+    def test_throttled_get_gives_up_after_max_retries(
+        self, mocker, auth_token_manager_mock, request_mock
+    ):
+        rate_limiter = mocker.MagicMock()
+        request_mock.return_value = _response(429)
+        client = Client(
+            Config(config_dict={"prosper-api": {"rate-limit": {"max-retries": 2}}}),
+            rate_limiter=rate_limiter,
+        )
+
+        with pytest.raises(requests.HTTPError):
+            client._do_get("some_url")
+
+        assert request_mock.call_count == 3
+        assert rate_limiter.throttled.call_count == 3
+
+    def test_throttled_post_is_not_retried(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock
+    ):
+        rate_limiter = mocker.MagicMock()
+        request_mock.return_value = _response(429)
+
+        with pytest.raises(requests.HTTPError):
+            Client(rate_limiter=rate_limiter)._do_post("some_url")
+
+        request_mock.assert_called_once()
+        rate_limiter.throttled.assert_called_once_with(None)
+
+    def test_do_stream(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock
+    ):
+        auth_token_manager_mock.return_value.get_token.return_value = "auth_token"
+        response = _streamed_response(200, b'{"result": []}')
+        close_spy = mocker.spy(response, "close")
+        request_mock.return_value = response
+        client = Client()
+        client._STREAM_CHUNK_SIZE = 4
+
+        chunks = list(
+            client._do_stream("some_url", {"a": 1}, priority=RequestPriority.SEARCH)
+        )
+
+        assert chunks == [b'{"re', b"sult", b'": [', b"]}"]
+        close_spy.assert_called_once()
+        request_mock.assert_called_once_with(
+            "GET",
+            "some_url",
+            params={"a": 1},
+            json={},
+            headers={
+                "Authorization": "bearer auth_token",
+                "Accept": "application/json",
+            },
+            stream=True,
+        )
+
+    def test_do_stream_skips_cache(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        request_mock.side_effect = lambda *args, **kwargs: _streamed_response(200)
+        client = Client(cache=ResponseCache())
+
+        for _ in range(2):
+            list(client._do_stream("https://api.prosper.com/v1/notes/", {}))
+
+        assert request_mock.call_count == 2
+
+    def test_throttled_stream_is_retried(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock
+    ):
+        throttled = _streamed_response(429)
+        request_mock.side_effect = [throttled, _streamed_response(200, b"[]")]
+
+        chunks = list(
+            Client(rate_limiter=mocker.MagicMock())._do_stream("some_url", {})
+        )
+
+        assert chunks == [b"[]"]
+        assert throttled.raw.closed
+
+    def test_failed_stream_is_closed(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        response = _streamed_response(500)
+        request_mock.return_value = response
+
+        with pytest.raises(requests.HTTPError):
+            list(Client()._do_stream("some_url", {}))
+
+        assert response.raw.closed
+
+    @pytest.mark.parametrize("method", ["GET", "POST"])
+    def test_rejected_token_is_renewed_and_call_replayed(
+        self, config_mock, auth_token_manager_mock, request_mock, method
+    ):
+        token_manager = auth_token_manager_mock.return_value
+        token_manager.get_token.side_effect = ["revoked_token", "renewed_token"]
+        request_mock.side_effect = [_response(401), _response(200, '{"p1": "v1"}')]
+
+        response = Client()._do_request(method, "some_url")
+
+        assert response == b'{"p1": "v1"}'
+        token_manager.invalidate_token.assert_called_once_with("revoked_token")
+        assert [
+            call.kwargs["headers"]["Authorization"]
+            for call in request_mock.call_args_list
+        ] == ["bearer revoked_token", "bearer renewed_token"]
+
+    def test_rejected_token_is_renewed_once(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        auth_token_manager_mock.return_value.get_token.return_value = "auth_token"
+        request_mock.return_value = _response(401)
+
+        with pytest.raises(requests.HTTPError):
+            Client()._do_get("some_url")
+
+        assert request_mock.call_count == 2
+
+    def test_rejected_token_is_not_replayed_when_renewal_fails(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        auth_token_manager_mock.return_value.get_token.side_effect = [
+            "revoked_token",
+            None,
+        ]
+        request_mock.return_value = _response(401)
+
+        with pytest.raises(requests.HTTPError):
+            Client()._do_get("some_url")
+
+        request_mock.assert_called_once()
+
+    def test_rejected_token_is_renewed_for_stream(
+        self, config_mock, auth_token_manager_mock, request_mock
+    ):
+        rejected = _streamed_response(401)
+        request_mock.side_effect = [rejected, _streamed_response(200, b"[]")]
+
+        chunks = list(Client()._do_stream("some_url", {}))
+
+        assert chunks == [b"[]"]
+        assert rejected.raw.closed
+
+    def test_rate_limiter_from_config(self, tmp_path, auth_token_manager_mock):
+        client = Client(
+            Config(
+                config_dict={
+                    "prosper-api": {
+                        "rate-limit": {
+                            "backend": "file",
+                            "state-file": str(tmp_path / "rate-limit"),
+                        }
+                    }
+                }
+            )
+        )
+
+        assert isinstance(client.rate_limiter, FileRateLimiter)
+        assert client.rate_limiter.path == str(tmp_path / "rate-limit")
+
+    def test_rate_limiter_provided(
+        self, mocker, config_mock, auth_token_manager_mock, request_mock
+    ):
+        rate_limiter = mocker.MagicMock()
+
+        client = Client(rate_limiter=rate_limiter)
+        client._do_get("some_url")
+
+        assert client.rate_limiter is rate_limiter
+        rate_limiter.acquire.assert_called_once()
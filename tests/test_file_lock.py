@@ -0,0 +1,36 @@
+import threading
+
+from prosper_api.file_lock import FileLock
+
+
+class TestFileLock:
+    def test_creates_missing_file(self, tmp_path):
+        path = tmp_path / "nested" / "lock"
+
+        with FileLock(str(path)) as lock_file:
+            lock_file.write(b"contents")
+
+        assert path.read_bytes() == b"contents"
+
+    def test_preserves_existing_contents(self, tmp_path):
+        path = tmp_path / "lock"
+        path.write_bytes(b"contents")
+
+        with FileLock(str(path)) as lock_file:
+            assert lock_file.read() == b"contents"
+
+    def test_excludes_other_holders(self, tmp_path):
+        path = str(tmp_path / "lock")
+        acquired = threading.Event()
+
+        def hold_lock():
+            with FileLock(path):
+                acquired.set()
+
+        with FileLock(path):
+            thread = threading.Thread(target=hold_lock)
+            thread.start()
+            assert not acquired.wait(0.1)
+
+        thread.join(1)
+        assert acquired.is_set()
@@ -0,0 +1,187 @@
+from decimal import Decimal
+
+import pytest
+
+from prosper_api.batch import ListingBatch
+from prosper_api.local_search import LocalListingSearch
+from prosper_api.models import SearchListingsRequest, SearchListingsResponse
+from prosper_api.models.enums import (
+    BorrowerState,
+    ListingCategory,
+    ProsperRating,
+    SearchListingsSortBy,
+    SortOrder,
+)
+
+
+class TestLocalListingSearch:
+    @pytest.fixture
+    def listing(self, response_json):
+        return SearchListingsResponse.model_validate_json(
+            response_json("search_listings_response")
+        ).result[0]
+
+    @pytest.fixture
+    def listings(self, listing):
+        def make(listing_number, lender_yield, rating, state, start, **update):
+            return listing.model_copy(
+                update={
+                    "listing_number": listing_number,
+                    "lender_yield": lender_yield,
+                    "prosper_rating": rating,
+                    "borrower_state": state,
+                    "listing_start_date": f"2023-08-{start} +0000",
+                    "biddable": True,
+                    "invested": False,
+                    "listing_term": 36,
+                    "listing_category_id": ListingCategory.DEBT_CONSOLIDATION.value,
+                    **update,
+                }
+            )
+
+        return [
+            make(
+                1,
+                Decimal("0.10"),
+                ProsperRating.AA,
+                BorrowerState.CALIFORNIA,
+                "27 10:00:00",
+            ),
+            make(
+                2,
+                Decimal("0.20"),
+                ProsperRating.C,
+                BorrowerState.NEW_YORK,
+                "28 00:00:00",
+            ),
+            make(
+                3,
+                Decimal("0.15"),
+                ProsperRating.HR,
+                BorrowerState.CALIFORNIA,
+                "28 23:59:59",
+            ),
+            make(4, None, ProsperRating.B, BorrowerState.TEXAS, "29 00:00:00"),
+            make(
+                5,
+                Decimal("0.30"),
+                ProsperRating.NA,
+                BorrowerState.CALIFORNIA,
+                "29 12:00:00",
+            ),
+            make(
+                6,
+                Decimal("0.25"),
+                ProsperRating.A,
+                BorrowerState.NEW_YORK,
+                "30 12:00:00",
+                biddable=False,
+            ),
+            make(
+                7,
+                Decimal("0.05"),
+                ProsperRating.D,
+                BorrowerState.CALIFORNIA,
+                "30 13:00:00",
+                invested=True,
+                listing_term=60,
+                listing_category_id=ListingCategory.BUSINESS.value,
+            ),
+        ]
+
+    @pytest.fixture
+    def search(self, listings):
+        return LocalListingSearch.from_listings(listings)
+
+    def test_default_request(self, search, listings):
+        # Biddable listings with a rating, by descending lender yield.
+        assert search.listing_numbers() == [2, 3, 1, 7, 4]
+        assert search.search() == [listings[i] for i in (1, 2, 0, 6, 3)]
+
+    def test_min_max_filters_exclude_missing_values(self, search):
+        request = SearchListingsRequest(
+            lender_yield_min=Decimal("0.10"), lender_yield_max=Decimal("0.15")
+        )
+
+        assert search.listing_numbers(request) == [3, 1]
+
+    def test_list_filters(self, search):
+        assert search.listing_numbers(
+            SearchListingsRequest(
+                borrower_state=[BorrowerState.CALIFORNIA, BorrowerState.TEXAS],
+                prosper_rating=[ProsperRating.AA, ProsperRating.HR, ProsperRating.B],
+            )
+        ) == [3, 1, 4]
+        assert search.listing_numbers(SearchListingsRequest(listing_term=[60])) == [7]
+        assert search.listing_numbers(
+            SearchListingsRequest(listing_category_id=[ListingCategory.BUSINESS])
+        ) == [7]
+        assert search.listing_numbers(SearchListingsRequest(listing_number=[1, 4])) == [
+            1,
+            4,
+        ]
+
+    def test_empty_list_filter_matches_everything(self, search):
+        request = SearchListingsRequest(prosper_rating=[], borrower_state=[])
+
+        assert search.listing_numbers(request) == [5, 2, 3, 1, 7, 4]
+
+    def test_boolean_filters(self, search):
+        assert search.listing_numbers(SearchListingsRequest(invested=True)) == [7]
+        assert search.listing_numbers(SearchListingsRequest(biddable=False)) == [6]
+
+    def test_date_filters(self, search):
+        # A date without a time covers the whole day.
+        assert search.listing_numbers(
+            SearchListingsRequest(
+                listing_start_date_min="2023-08-28",
+                listing_start_date_max="2023-08-28",
+                sort_by=SearchListingsSortBy.LISTING_NUMBER,
+                sort_dir=SortOrder.ASCENDING,
+            )
+        ) == [2, 3]
+        assert search.listing_numbers(
+            SearchListingsRequest(
+                listing_start_date_min="2023-08-28 00:00:01 +0000",
+                listing_start_date_max="2023-08-29 00:00:00 +0000",
+                sort_by=SearchListingsSortBy.LISTING_START_DATE,
+            )
+        ) == [4, 3]
+
+    def test_sort_and_pagination(self, search):
+        by_rating = SearchListingsRequest(
+            sort_by=SearchListingsSortBy.PROSPER_RATING,
+            sort_dir=SortOrder.ASCENDING,
+        )
+        by_yield = SearchListingsRequest(
+            sort_dir=SortOrder.ASCENDING, offset=1, limit=3
+        )
+
+        assert search.listing_numbers(by_rating) == [3, 7, 2, 4, 1]
+        assert search.listing_numbers(by_yield) == [1, 3, 2]
+
+    def test_missing_enum_values_sort_last(self, listings):
+        records = [listing.model_dump(mode="json") for listing in listings[:3]]
+        records[0]["prosper_rating"] = "Z"
+        search = LocalListingSearch(ListingBatch.from_records(records))
+
+        for sort_dir in SortOrder:
+            request = SearchListingsRequest(
+                prosper_rating=[],
+                sort_by=SearchListingsSortBy.PROSPER_RATING,
+                sort_dir=sort_dir,
+            )
+            assert search.listing_numbers(request)[-1] == 1
+
+    def test_whole_loan_dates_are_unsupported(self, search):
+        request = SearchListingsRequest(whole_loan_start_date_min="2023-08-28")
+
+        with pytest.raises(ValueError, match="whole_loan_start_date_min"):
+            search.matches(request)
+
+    def test_search_needs_listings(self, listings):
+        search = LocalListingSearch(ListingBatch.from_listings(listings))
+
+        assert search.listing_numbers() == [2, 3, 1, 7, 4]
+        with pytest.raises(ValueError):
+            search.search()
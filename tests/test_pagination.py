@@ -0,0 +1,359 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from prosper_api.models import ListNotesRequest, ListNotesResponse, Note
+from prosper_api.pagination import (
+    fetch_all,
+    fetch_all_async,
+    map_unordered,
+    map_unordered_async,
+    paginate,
+    paginate_async,
+)
+from tests.conftest import wait_until
+
+
+def _prefetch_threads():
+    return [t for t in threading.enumerate() if t.name == "prosper-api-prefetch"]
+
+
+def _note_key(note):
+    return note.loan_note_id
+
+
+class TestPagination:
+    @pytest.fixture
+    def note(self, response_json):
+        return ListNotesResponse.model_validate_json(
+            response_json("list_notes_response")
+        ).result[0]
+
+    @pytest.fixture
+    def notes(self, note):
+        return [note.model_copy(update={"loan_note_id": f"note-{i}"}) for i in range(7)]
+
+    @pytest.fixture
+    def list_page(self, mocker, notes):
+        def list_notes(request: ListNotesRequest) -> ListNotesResponse:
+            page = notes[request.offset : request.offset + request.limit]
+            return ListNotesResponse(
+                result=page, result_count=len(page), total_count=len(notes)
+            )
+
+        return mocker.MagicMock(side_effect=list_notes)
+
+    @staticmethod
+    def _requested_pages(list_page):
+        return [
+            (call.args[0].offset, call.args[0].limit)
+            for call in list_page.call_args_list
+        ]
+
+    def test_paginate(self, list_page, notes):
+        results = list(paginate(list_page, ListNotesRequest(), 3))
+
+        assert results == notes
+        assert self._requested_pages(list_page) == [(0, 3), (3, 3), (6, 3)]
+
+    def test_paginate_is_lazy(self, list_page, notes):
+        results = paginate(list_page, ListNotesRequest(), 3)
+
+        list_page.assert_not_called()
+        assert next(results) == notes[0]
+        assert list_page.call_count == 1
+
+    @pytest.mark.parametrize(
+        ["request_", "expected_pages"],
+        [
+            (ListNotesRequest(limit=2, offset=3), [(3, 2), (5, 2)]),
+            (ListNotesRequest(limit=50), [(0, 3), (3, 3), (6, 3)]),
+        ],
+    )
+    def test_paginate_honors_offset_and_limit(
+        self, list_page, request_, expected_pages
+    ):
+        list(paginate(list_page, request_, 3))
+
+        assert self._requested_pages(list_page) == expected_pages
+
+    def test_paginate_preserves_request_params(self, list_page):
+        list(paginate(list_page, ListNotesRequest(sort_by="age_in_months"), 25))
+
+        assert list_page.call_args.args[0].sort_by.value == "age_in_months"
+
+    def test_paginate_stops_when_results_shrink(self, mocker, note):
+        list_page = mocker.MagicMock(
+            side_effect=[
+                ListNotesResponse(result=[note], result_count=1, total_count=5),
+                ListNotesResponse(result=[], result_count=0, total_count=5),
+            ]
+        )
+
+        assert list(paginate(list_page, ListNotesRequest(), 1)) == [note]
+        assert list_page.call_count == 2
+
+    def test_paginate_async(self, mocker, list_page, notes):
+        async def collect():
+            return [
+                note
+                async for note in paginate_async(
+                    mocker.AsyncMock(side_effect=list_page), ListNotesRequest(), 3
+                )
+            ]
+
+        assert asyncio.run(collect()) == notes
+        assert all(isinstance(note, Note) for note in notes)
+        assert self._requested_pages(list_page) == [(0, 3), (3, 3), (6, 3)]
+
+    def test_paginate_with_prefetch(self, list_page, notes):
+        results = list(paginate(list_page, ListNotesRequest(), 3, prefetch=1))
+
+        assert results == notes
+        assert self._requested_pages(list_page) == [(0, 3), (3, 3), (6, 3)]
+
+    def test_prefetch_reads_ahead_within_bound(self, list_page, notes):
+        results = paginate(list_page, ListNotesRequest(), 1, prefetch=2)
+
+        assert next(results) == notes[0]
+        # One page being consumed, two buffered, and one waiting to be buffered.
+        wait_until(lambda: list_page.call_count == 4)
+        time.sleep(0.2)
+        assert list_page.call_count == 4
+
+        assert list(results) == notes[1:]
+        assert list_page.call_count == 7
+
+    def test_prefetch_raises_errors_from_background_thread(self, mocker, notes):
+        list_page = mocker.MagicMock(
+            side_effect=[
+                ListNotesResponse(result=notes[:3], result_count=3, total_count=7),
+                ValueError("boom"),
+            ]
+        )
+
+        results = paginate(list_page, ListNotesRequest(), 3, prefetch=1)
+
+        assert [next(results) for _ in range(3)] == notes[:3]
+        with pytest.raises(ValueError, match="boom"):
+            next(results)
+
+    def test_prefetch_stops_when_consumer_stops(self, list_page):
+        results = paginate(list_page, ListNotesRequest(), 1, prefetch=1)
+        next(results)
+
+        results.close()
+
+        wait_until(lambda: not _prefetch_threads())
+        assert list_page.call_count < 7
+
+    def test_fetch_all(self, list_page, notes):
+        results = fetch_all(list_page, ListNotesRequest(), 3, _note_key, 2)
+
+        assert results == notes
+        assert sorted(self._requested_pages(list_page)) == [(0, 3), (3, 3), (6, 3)]
+
+    def test_fetch_all_requests_pages_concurrently(self, list_page, notes):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def list_notes(request):
+            if request.offset:
+                # Both remaining pages must be in flight at once to pass the barrier.
+                barrier.wait()
+            return list_page(request)
+
+        results = fetch_all(list_notes, ListNotesRequest(), 3, _note_key, 2)
+
+        assert results == notes
+
+    def test_fetch_all_from_offset(self, list_page, notes):
+        results = fetch_all(list_page, ListNotesRequest(offset=2), 3, _note_key, 2)
+
+        assert results == notes[2:]
+
+    def test_fetch_all_drops_records_that_shift_between_pages(
+        self, mocker, notes, caplog
+    ):
+        def response(page):
+            return ListNotesResponse(result=page, result_count=len(page), total_count=7)
+
+        # A note was added ahead of notes[2] after the first page was read, pushing
+        # notes[2] onto the second page as well.
+        pages = {
+            0: response(notes[0:3]),
+            3: response(notes[2:5]),
+            6: response(notes[5:7]),
+        }
+        list_page = mocker.MagicMock(side_effect=lambda r: pages[r.offset])
+
+        results = fetch_all(list_page, ListNotesRequest(), 3, _note_key, 2)
+
+        assert results == notes
+        assert "Dropped 1 results that moved between pages" in caplog.text
+        assert "changed while they were being fetched" not in caplog.text
+
+    def test_fetch_all_warns_when_records_are_missed(self, mocker, notes, caplog):
+        def response(page):
+            return ListNotesResponse(result=page, result_count=len(page), total_count=7)
+
+        # notes[3] was removed after the first page was read, pulling notes[6] onto
+        # the second page.
+        pages = {
+            0: response(notes[0:3]),
+            3: response([notes[4], notes[5], notes[6]]),
+            6: response([]),
+        }
+        list_page = mocker.MagicMock(side_effect=lambda r: pages[r.offset])
+
+        results = fetch_all(list_page, ListNotesRequest(), 3, _note_key, 2)
+
+        assert results == notes[0:3] + notes[4:7]
+        assert "Expected 7 results but got 6" in caplog.text
+
+    def test_fetch_all_async(self, mocker, list_page, notes):
+        results = asyncio.run(
+            fetch_all_async(
+                mocker.AsyncMock(side_effect=list_page),
+                ListNotesRequest(),
+                3,
+                _note_key,
+                2,
+            )
+        )
+
+        assert results == notes
+        assert sorted(self._requested_pages(list_page)) == [(0, 3), (3, 3), (6, 3)]
+
+    def test_paginate_async_with_prefetch(self, mocker, list_page, notes):
+        async def collect():
+            return [
+                note
+                async for note in paginate_async(
+                    mocker.AsyncMock(side_effect=list_page),
+                    ListNotesRequest(),
+                    3,
+                    prefetch=2,
+                )
+            ]
+
+        assert asyncio.run(collect()) == notes
+        assert self._requested_pages(list_page) == [(0, 3), (3, 3), (6, 3)]
+
+    def test_async_prefetch_raises_errors_from_background_task(self, mocker):
+        async def collect():
+            return [
+                note
+                async for note in paginate_async(
+                    mocker.AsyncMock(side_effect=ValueError("boom")),
+                    ListNotesRequest(),
+                    3,
+                    prefetch=1,
+                )
+            ]
+
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(collect())
+
+    def test_async_prefetch_stops_when_consumer_stops(self, mocker, list_page):
+        async def consume_one():
+            results = paginate_async(
+                mocker.AsyncMock(side_effect=list_page),
+                ListNotesRequest(),
+                1,
+                prefetch=1,
+            )
+            await results.__anext__()
+            await results.aclose()
+            # Give a cancelled producer the chance to run, if it weren't cancelled.
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+        asyncio.run(consume_one())
+
+        assert list_page.call_count < 7
+
+    def test_map_unordered(self):
+        results = map_unordered(lambda item: item * 2, range(10), 3)
+
+        assert sorted(results) == [item * 2 for item in range(10)]
+
+    def test_map_unordered_bounds_work_in_flight(self):
+        in_flight = []
+        lock = threading.Lock()
+        max_in_flight = 0
+
+        def work(item):
+            nonlocal max_in_flight
+            with lock:
+                in_flight.append(item)
+                max_in_flight = max(max_in_flight, len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.remove(item)
+            return item
+
+        assert sorted(map_unordered(work, range(10), 3)) == list(range(10))
+        assert max_in_flight <= 3
+
+    def test_map_unordered_yields_as_work_finishes(self):
+        slow_item_may_finish = threading.Event()
+
+        def work(item):
+            if item == 0:
+                slow_item_may_finish.wait(5)
+            return item
+
+        results = map_unordered(work, range(3), 3)
+
+        assert {next(results), next(results)} == {1, 2}
+        slow_item_may_finish.set()
+        assert list(results) == [0]
+
+    def test_map_unordered_cancels_pending_work_when_consumer_stops(self):
+        started = []
+
+        def work(item):
+            started.append(item)
+            return item
+
+        results = map_unordered(work, range(100), 2)
+        next(results)
+        results.close()
+
+        assert len(started) < 100
+
+    def test_map_unordered_async(self):
+        async def work(item):
+            await asyncio.sleep(0.01 if item == 0 else 0)
+            return item * 2
+
+        async def collect():
+            return [result async for result in map_unordered_async(work, range(5), 2)]
+
+        results = asyncio.run(collect())
+
+        assert sorted(results) == [0, 2, 4, 6, 8]
+        assert results[0] != 0
+
+    def test_map_unordered_async_cancels_pending_work_when_consumer_stops(self):
+        cancelled = []
+
+        async def work(item):
+            try:
+                await asyncio.sleep(0 if item == 0 else 5)
+            except asyncio.CancelledError:
+                cancelled.append(item)
+                raise
+            return item
+
+        async def consume_one():
+            results = map_unordered_async(work, range(10), 3)
+            assert await results.__anext__() == 0
+            await results.aclose()
+            await asyncio.sleep(0)
+
+        asyncio.run(consume_one())
+
+        assert sorted(cancelled) == [1, 2]
@@ -0,0 +1,171 @@
+from decimal import Decimal
+
+import pytest
+from prosper_shared.omni_config import Config
+from pydantic import ValidationError
+
+from prosper_api.models import (
+    CreditBureauValues,
+    Listing,
+    ListLoansResponse,
+    ListNotesResponse,
+    ListOrdersResponse,
+    ListPaymentsResponse,
+    SearchListingsResponse,
+)
+from prosper_api.models.enums import FICOScore, ProsperRating
+from prosper_api.projection import (
+    _schema,
+    _trusted_parsing_from_config,
+    parse_response,
+    project_model,
+)
+
+
+class TestProjection:
+    def test_project_model(self):
+        projection = project_model(
+            Listing,
+            [
+                "lender_yield",
+                "listing_number",
+                "credit_bureau_values_transunion_indexed.fico_score",
+            ],
+        )
+
+        assert projection.__name__ == "ListingProjection"
+        assert list(projection.model_fields) == [
+            "listing_number",
+            "credit_bureau_values_transunion_indexed",
+            "lender_yield",
+        ]
+        nested = projection.model_fields[
+            "credit_bureau_values_transunion_indexed"
+        ].annotation
+        assert nested.__name__ == "CreditBureauValuesProjection"
+        assert list(nested.model_fields) == ["fico_score"]
+
+    def test_project_model_is_cached(self):
+        assert project_model(Listing, ["listing_number"]) is project_model(
+            Listing, ("listing_number",)
+        )
+
+    def test_whole_nested_model_wins(self):
+        projection = project_model(
+            Listing,
+            [
+                "credit_bureau_values_transunion_indexed.fico_score",
+                "credit_bureau_values_transunion_indexed",
+            ],
+        )
+
+        assert (
+            projection.model_fields[
+                "credit_bureau_values_transunion_indexed"
+            ].annotation
+            is CreditBureauValues
+        )
+
+    @pytest.mark.parametrize(
+        "fields", [["not_a_field"], ["listing_number.digits"], ["prosper_rating.x"]]
+    )
+    def test_invalid_fields(self, fields):
+        with pytest.raises(ValueError):
+            project_model(Listing, fields)
+
+    def test_parse_response(self, response_json):
+        response = parse_response(
+            SearchListingsResponse,
+            response_json("search_listings_response"),
+            [
+                "listing_number",
+                "prosper_rating",
+                "lender_yield",
+                "credit_bureau_values_transunion_indexed.fico_score",
+            ],
+        )
+
+        assert isinstance(response, SearchListingsResponse)
+        assert response.result_count == 1
+        listing = response.result[0]
+        assert listing.listing_number == 11111111
+        assert listing.prosper_rating == ProsperRating.AA
+        assert listing.lender_yield == Decimal("0.1295")
+        assert (
+            listing.credit_bureau_values_transunion_indexed.fico_score
+            == FICOScore.BETWEEN_780_AND_799
+        )
+        assert not hasattr(listing, "borrower_rate")
+
+    @pytest.mark.parametrize(
+        ["response_type", "response_name", "fields"],
+        [
+            (ListNotesResponse, "list_notes_response", ["loan_note_id"]),
+            (ListPaymentsResponse, "list_payments_response", ["payment_amount"]),
+        ],
+    )
+    def test_parse_list_responses(
+        self, response_json, response_type, response_name, fields
+    ):
+        raw = response_json(response_name)
+
+        projected = parse_response(response_type, raw, fields)
+        full = parse_response(response_type, raw)
+
+        assert type(full) is response_type
+        assert projected.total_count == full.total_count
+        assert [result.model_dump() for result in projected.result] == [
+            result.model_dump(include=set(fields)) for result in full.result
+        ]
+
+    @pytest.mark.parametrize(
+        ["response_type", "response_name"],
+        [
+            (SearchListingsResponse, "search_listings_response"),
+            (ListNotesResponse, "list_notes_response"),
+            (ListOrdersResponse, "list_orders_response"),
+            (ListLoansResponse, "list_loans_response"),
+            (ListPaymentsResponse, "list_payments_response"),
+        ],
+    )
+    def test_trusted_parse_matches_strict(
+        self, response_json, response_type, response_name
+    ):
+        raw = response_json(response_name)
+
+        trusted = parse_response(response_type, raw, trusted=True)
+
+        assert type(trusted) is response_type
+        assert trusted == parse_response(response_type, raw)
+
+    def test_trusted_parse_with_fields(self, response_json):
+        raw = response_json("search_listings_response")
+        fields = [
+            "listing_number",
+            "credit_bureau_values_transunion_indexed.fico_score",
+        ]
+
+        trusted = parse_response(SearchListingsResponse, raw, fields, trusted=True)
+
+        assert trusted == parse_response(SearchListingsResponse, raw, fields)
+
+    def test_trusted_parse_validates_what_it_cant_build(self, response_json):
+        raw = response_json("search_listings_response").replace('"AA"', '"ZZ"')
+
+        with pytest.raises(ValidationError):
+            parse_response(SearchListingsResponse, raw, trusted=True)
+
+    @pytest.mark.parametrize(
+        ["parsing", "expected"],
+        [
+            ({}, False),
+            ({"trusted": True}, True),
+            ({"trusted": True, "strict": True}, False),
+        ],
+    )
+    def test_trusted_parsing_from_config(self, parsing, expected):
+        config = Config(
+            config_dict={"prosper-api": {"parsing": parsing}}, schema=_schema()
+        )
+
+        assert _trusted_parsing_from_config(config) is expected
@@ -0,0 +1,120 @@
+import copy
+import pickle
+from decimal import Decimal
+
+import pytest
+
+from prosper_api.models import SearchListingsRequest
+from prosper_api.models.enums import (
+    BorrowerState,
+    ProsperRating,
+    SearchListingsSortBy,
+    SortOrder,
+)
+from prosper_api.query import (
+    _PARAM_ENCODERS,
+    SearchListingsQuery,
+    _bool_val,
+    _search_listings_params,
+)
+
+
+class TestSearchListingsQuery:
+    _REQUEST = SearchListingsRequest(
+        sort_by=SearchListingsSortBy.LISTING_START_DATE,
+        sort_dir=SortOrder.ASCENDING,
+        invested=False,
+        has_mortgage=True,
+        borrower_state=[BorrowerState.CALIFORNIA],
+        prosper_rating=[ProsperRating.AA, ProsperRating.A],
+        lender_yield_min=Decimal("0.1"),
+        listing_term=[36, 60],
+    )
+
+    def test_every_field_is_sent(self):
+        params = set(_PARAM_ENCODERS)
+
+        assert params == set(SearchListingsRequest.model_fields) - {"sort_dir"}
+
+    def test_params(self):
+        params = SearchListingsQuery(self._REQUEST).params
+
+        assert params == _search_listings_params(self._REQUEST)
+        assert params["sort_by"] == "listing_start_date asc"
+        assert params["biddable"] == "true"
+        assert params["invested"] == "false"
+        assert params["has_mortgage"] is True
+        assert params["borrower_state"] == [BorrowerState.CALIFORNIA]
+        assert params["prosper_rating"] == "AA,A"
+        assert params["lender_yield_min"] == Decimal("0.1")
+        assert params["listing_term"] == "36,60"
+        assert params["listing_number"] is None
+
+    def test_params_for_query(self):
+        query = SearchListingsQuery(self._REQUEST)
+
+        assert _search_listings_params(query) is query.params
+
+    def test_default_request(self):
+        assert SearchListingsQuery().request == SearchListingsRequest()
+
+    @pytest.mark.parametrize(
+        "update",
+        [
+            {"offset": 100, "limit": 25},
+            {"listing_start_date_min": "2023-08-28"},
+            {"sort_dir": SortOrder.DESCENDING},
+            {"prosper_rating": [ProsperRating.HR], "invested": None},
+            {},
+        ],
+    )
+    def test_model_copy(self, update):
+        query = SearchListingsQuery(self._REQUEST)
+        params = dict(query.params)
+
+        updated = query.model_copy(update=update)
+
+        assert updated.params == _search_listings_params(
+            self._REQUEST.model_copy(update=update)
+        )
+        assert query.params == params
+
+    def test_model_copy_only_encodes_changed_fields(self, mocker):
+        query = SearchListingsQuery(self._REQUEST)
+        encode_mock = mocker.patch.dict(
+            "prosper_api.query._PARAM_ENCODERS",
+            {"sort_by": mocker.MagicMock(return_value="sorted")},
+        )
+
+        updated = query.model_copy(
+            update={"sort_by": SearchListingsSortBy.LISTING_NUMBER}
+        )
+
+        assert updated.params["sort_by"] == "sorted"
+        encode_mock["sort_by"].assert_called_once_with(updated.request)
+
+    def test_fields(self):
+        query = SearchListingsQuery(self._REQUEST).model_copy(update={"offset": 50})
+
+        assert query.offset == 50
+        assert query.invested is False
+        with pytest.raises(AttributeError):
+            query.not_a_field
+
+    def test_equality_and_repr(self):
+        query = SearchListingsQuery(self._REQUEST)
+
+        assert query == SearchListingsQuery(self._REQUEST)
+        assert query != SearchListingsQuery()
+        assert query != self._REQUEST
+        assert repr(query) == f"SearchListingsQuery({self._REQUEST!r})"
+
+    def test_copy_and_pickle(self):
+        query = SearchListingsQuery(self._REQUEST)
+
+        assert copy.deepcopy(query) == query
+        assert pickle.loads(pickle.dumps(query)).params == query.params
+
+    def test_bool_val_when_invalid(self):
+        with pytest.raises(ValueError):
+            _bool_val("blah")
@@ -0,0 +1,361 @@
+import asyncio
+import json
+import multiprocessing
+
+import pytest
+from freezegun import freeze_time
+from prosper_shared.omni_config import Config
+
+from prosper_api.rate_limit import (
+    FileRateLimiter,
+    TokenBucketRateLimiter,
+    _max_retries_from_config,
+    _parse_retry_after,
+    _schema,
+    shared_rate_limiter,
+)
+
+
+def _reserve_from_file(path, count):
+    limiter = FileRateLimiter(path, calls=20, period=1, burst=1)
+    slots = []
+    for _ in range(count):
+        delay = limiter.reserve()
+        # The time the slot can be used, by the clock reading it was reserved at.
+        slots.append(limiter._updated_at + delay)
+    return slots
+
+
+class TestTokenBucketRateLimiter:
+    @pytest.fixture
+    def monotonic_mock(self, mocker):
+        monotonic_mock = mocker.patch("prosper_api.rate_limit.monotonic")
+        monotonic_mock.return_value = 1000.0
+        return monotonic_mock
+
+    @pytest.fixture
+    def sleep_mock(self, mocker):
+        return mocker.patch("prosper_api.rate_limit.sleep")
+
+    @pytest.fixture
+    def async_sleep_mock(self, mocker):
+        return mocker.patch(
+            "prosper_api.rate_limit.asyncio.sleep", new_callable=mocker.AsyncMock
+        )
+
+    def test_reserve_spaces_calls_evenly(self, monotonic_mock):
+        limiter = TokenBucketRateLimiter(calls=20, period=1, burst=1)
+
+        delays = [limiter.reserve() for _ in range(4)]
+
+        assert delays == pytest.approx([0, 0.05, 0.1, 0.15])
+
+    def test_reserve_allows_burst_after_idle(self, monotonic_mock):
+        limiter = TokenBucketRateLimiter(calls=20, period=1, burst=3)
+        limiter.reserve()
+        limiter.reserve()
+        limiter.reserve()
+
+        monotonic_mock.return_value = 1010.0
+
+        assert [limiter.reserve() for _ in range(4)] == pytest.approx([0, 0, 0, 0.05])
+
+    def test_remaining(self, monotonic_mock):
+        limiter = TokenBucketRateLimiter(calls=10, period=1, burst=5)
+        assert limiter.remaining == 5
+
+        for _ in range(7):
+            limiter.reserve()
+        assert limiter.remaining == 0
+
+        monotonic_mock.return_value = 1000.3
+        assert limiter.remaining == pytest.approx(1)
+
+    def test_acquire_sleeps_until_token_available(self, monotonic_mock, sleep_mock):
+        limiter = TokenBucketRateLimiter(calls=4, period=2, burst=1)
+
+        assert limiter.acquire() == 0
+        sleep_mock.assert_not_called()
+
+        assert limiter.acquire() == pytest.approx(0.5)
+        sleep_mock.assert_called_once_with(pytest.approx(0.5))
+
+    def test_acquire_async_sleeps_until_token_available(
+        self, monotonic_mock, async_sleep_mock
+    ):
+        limiter = TokenBucketRateLimiter(calls=4, period=2, burst=1)
+
+        assert asyncio.run(limiter.acquire_async()) == 0
+        async_sleep_mock.assert_not_awaited()
+
+        assert asyncio.run(limiter.acquire_async()) == pytest.approx(0.5)
+        async_sleep_mock.assert_awaited_once_with(pytest.approx(0.5))
+
+    def test_sustains_configured_rate(self, monotonic_mock, sleep_mock):
+        limiter = TokenBucketRateLimiter(calls=20, period=1, burst=1)
+
+        def advance_clock(seconds):
+            monotonic_mock.return_value += seconds
+
+        sleep_mock.side_effect = advance_clock
+
+        for _ in range(41):
+            limiter.acquire()
+
+        assert monotonic_mock.return_value == pytest.approx(1002.0)
+
+    def test_throttled_slows_down(self, monotonic_mock):
+        limiter = TokenBucketRateLimiter(calls=20, period=1, burst=1)
+
+        limiter.throttled()
+        assert limiter.rate == 10
+        assert [limiter.reserve() for _ in range(3)] == pytest.approx([0, 0.1, 0.2])
+
+        for _ in range(10):
+            limiter.throttled()
+        assert limiter.rate == 1
+
+    def test_throttled_waits_for_retry_after(self, monotonic_mock):
+        limiter = TokenBucketRateLimiter(calls=20, period=1, burst=1)
+
+        limiter.throttled(retry_after=2)
+
+        assert limiter.remaining == 0
+        assert [limiter.reserve() for _ in range(2)] == pytest.approx([2, 2.1])
+
+    def test_succeeded_recovers_rate(self, monotonic_mock):
+        limiter = TokenBucketRateLimiter(
+            calls=20, period=1, burst=1, throttle_factor=0.5, recovery_step=0.1
+        )
+        limiter.throttled()
+
+        limiter.succeeded()
+        assert limiter.rate == pytest.approx(12)
+
+        for _ in range(10):
+            limiter.succeeded()
+        assert limiter.rate == 20
+
+    def test_succeeded_at_full_rate_skips_lock(self, monotonic_mock, mocker):
+        limiter = TokenBucketRateLimiter(calls=20, period=1, burst=1)
+        state_mock = mocker.patch.object(limiter, "_state")
+
+        limiter.succeeded()
+
+        state_mock.assert_not_called()
+
+    def test_from_config_defaults(self, monotonic_mock):
+        limiter = TokenBucketRateLimiter.from_config(Config(config_dict={}))
+
+        assert limiter._rate == 20
+        assert limiter._burst == 1
+        assert limiter._throttle_factor == 0.5
+        assert limiter._recovery_step == 0.01
+        assert _max_retries_from_config(Config(config_dict={})) == 5
+
+    def test_from_config(self, monotonic_mock):
+        limiter = TokenBucketRateLimiter.from_config(
+            Config(
+                config_dict={
+                    "prosper-api": {
+                        "rate-limit": {
+                            "calls": 30,
+                            "period": 2,
+                            "burst": 5,
+                            "throttle-factor": 0.8,
+                            "recovery-step": 0.05,
+                            "max-retries": 2,
+                        }
+                    }
+                },
+                schema=_schema(),
+            )
+        )
+
+        assert limiter._rate == 15
+        assert limiter._burst == 5
+        assert limiter._throttle_factor == 0.8
+        assert limiter._recovery_step == 0.05
+        assert limiter.remaining == 5
+
+
+class TestFileRateLimiter:
+    @pytest.fixture
+    def time_mock(self, mocker):
+        time_mock = mocker.patch("prosper_api.rate_limit.time")
+        time_mock.return_value = 1000.0
+        return time_mock
+
+    @pytest.fixture
+    def state_file(self, tmp_path):
+        return str(tmp_path / "state" / "rate-limit")
+
+    def test_instances_share_budget(self, time_mock, state_file):
+        limiter = FileRateLimiter(state_file, calls=20, period=1, burst=1)
+        other_limiter = FileRateLimiter(state_file, calls=20, period=1, burst=1)
+
+        delays = [limiter.reserve(), other_limiter.reserve(), limiter.reserve()]
+
+        assert delays == pytest.approx([0, 0.05, 0.1])
+        assert other_limiter.remaining == 0
+
+    def test_refills_from_stored_state(self, time_mock, state_file):
+        limiter = FileRateLimiter(state_file, calls=10, period=1, burst=5)
+        for _ in range(5):
+            limiter.reserve()
+
+        time_mock.return_value = 1000.3
+
+        assert FileRateLimiter(state_file, calls=10, period=1, burst=5).remaining == (
+            pytest.approx(3)
+        )
+
+    def test_clock_going_backwards_does_not_remove_tokens(self, time_mock, state_file):
+        limiter = FileRateLimiter(state_file, calls=10, period=1, burst=5)
+        limiter.reserve()
+
+        time_mock.return_value = 900.0
+
+        assert limiter.remaining == 4
+
+    def test_instances_share_throttled_rate(self, time_mock, state_file):
+        limiter = FileRateLimiter(state_file, calls=20, period=1, burst=1)
+        other_limiter = FileRateLimiter(state_file, calls=20, period=1, burst=1)
+
+        limiter.throttled()
+        assert other_limiter.rate == 10
+
+        other_limiter.succeeded()
+        assert limiter.rate == pytest.approx(10.2)
+
+    def test_succeeded_at_full_rate_skips_file(self, time_mock, state_file, mocker):
+        limiter = FileRateLimiter(state_file, calls=20, period=1, burst=1)
+        limiter.reserve()
+        file_lock_mock = mocker.patch("prosper_api.rate_limit.FileLock")
+
+        limiter.succeeded()
+
+        file_lock_mock.assert_not_called()
+
+    def test_unchanged_state_is_not_rewritten(self, time_mock, state_file, mocker):
+        limiter = FileRateLimiter(state_file, calls=20, period=1, burst=1)
+        limiter.reserve()
+        store_spy = mocker.spy(limiter, "_store")
+
+        assert limiter.rate == 20
+        store_spy.assert_not_called()
+
+        limiter.reserve()
+        store_spy.assert_called_once()
+
+    def test_reads_state_without_rate(self, time_mock, tmp_path):
+        state_file = tmp_path / "rate-limit"
+        state_file.write_text('{"tokens": 0.5, "updated_at": 1000.0}')
+        limiter = FileRateLimiter(str(state_file), calls=10, period=1, burst=5)
+
+        assert limiter.rate == 10
+        assert limiter.remaining == 0.5
+
+    @pytest.mark.parametrize("contents", ["", "not json", '{"tokens": 1}', "[]"])
+    def test_unreadable_state_starts_new_budget(self, time_mock, tmp_path, contents):
+        state_file = tmp_path / "rate-limit"
+        state_file.write_text(contents)
+        limiter = FileRateLimiter(str(state_file), calls=10, period=1, burst=5)
+
+        assert limiter.reserve() == 0
+        assert json.loads(state_file.read_text()) == {
+            "tokens": 4,
+            "updated_at": 1000.0,
+            "rate": 10,
+        }
+
+    def test_processes_share_budget(self, tmp_path):
+        state_file = str(tmp_path / "rate-limit")
+
+        with multiprocessing.get_context("spawn").Pool(4) as pool:
+            results = pool.starmap(_reserve_from_file, [(state_file, 5)] * 4)
+
+        slots = sorted(slot for result in results for slot in result)
+        # Together the processes were held to 20 calls per second. Only allow for
+        # rounding, as epoch times are large floats.
+        assert len(slots) == 20
+        assert all(b - a >= 0.05 - 1e-6 for a, b in zip(slots, slots[1:]))
+
+    def test_from_config(self, time_mock, state_file):
+        limiter = FileRateLimiter.from_config(
+            Config(
+                config_dict={
+                    "prosper-api": {
+                        "rate-limit": {
+                            "calls": 30,
+                            "period": 2,
+                            "burst": 5,
+                            "backend": "file",
+                            "state-file": state_file,
+                        }
+                    }
+                },
+                schema=_schema(),
+            )
+        )
+
+        assert limiter.path == state_file
+        assert limiter._rate == 15
+        assert limiter._burst == 5
+
+
+class TestParseRetryAfter:
+    @pytest.mark.parametrize(
+        ["value", "expected"],
+        [
+            (None, None),
+            ("", None),
+            ("soon", None),
+            ("2", 2),
+            ("1.5", 1.5),
+            ("-1", 0),
+            ("Wed, 21 Oct 2015 07:28:30 GMT", 30),
+            ("Wed, 21 Oct 2015 07:28:05 -0000", 5),
+            ("Wed, 21 Oct 2015 07:27:00 GMT", 0),
+        ],
+    )
+    @freeze_time("2015-10-21 07:28:00")
+    def test_parse_retry_after(self, value, expected):
+        assert _parse_retry_after(value) == expected
+
+
+class TestSharedRateLimiter:
+    def test_same_budget_shares_limiter(self):
+        config = Config(
+            config_dict={"prosper-api": {"rate-limit": {"calls": 7, "period": 1}}}
+        )
+        equivalent_config = Config(
+            config_dict={"prosper-api": {"rate-limit": {"calls": 7}}}
+        )
+
+        assert shared_rate_limiter(config) is shared_rate_limiter(equivalent_config)
+
+    def test_different_budget_gets_own_limiter(self):
+        config = Config(config_dict={"prosper-api": {"rate-limit": {"calls": 8}}})
+        other_config = Config(config_dict={"prosper-api": {"rate-limit": {"calls": 9}}})
+
+        assert shared_rate_limiter(config) is not shared_rate_limiter(other_config)
+
+    def test_file_backend(self, tmp_path):
+        config = Config(
+            config_dict={
+                "prosper-api": {
+                    "rate-limit": {
+                        "backend": "file",
+                        "state-file": str(tmp_path / "rate-limit"),
+                    }
+                }
+            }
+        )
+        memory_config = Config(config_dict={})
+
+        limiter = shared_rate_limiter(config)
+
+        assert isinstance(limiter, FileRateLimiter)
+        assert limiter is shared_rate_limiter(config)
+        assert limiter is not shared_rate_limiter(memory_config)
@@ -0,0 +1,272 @@
+import asyncio
+import threading
+
+import pytest
+from prosper_shared.omni_config import Config
+
+from prosper_api.scheduler import (
+    LaneStats,
+    PriorityScheduler,
+    RequestPriority,
+    _schema,
+)
+from tests.conftest import wait_until
+
+
+class _GatedRateLimiter:
+    """Holds the first call at the gate, then records the lane of every call."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.async_gate = None
+        self.lanes = []
+        self.current_lane = threading.local()
+
+    def acquire(self):
+        self.lanes.append(self.current_lane.value)
+        if len(self.lanes) == 1:
+            self.gate.wait(5)
+        return 0
+
+    async def acquire_async(self):
+        self.lanes.append(RequestPriority[asyncio.current_task().get_name()])
+        if len(self.lanes) == 1:
+            await self.async_gate.wait()
+        return 0
+
+
+def _depth(scheduler):
+    return sum(stats.depth for stats in scheduler.stats().values())
+
+
+class TestPriorityScheduler:
+    def _run_threads(self, scheduler, rate_limiter, priorities):
+        def call(priority):
+            rate_limiter.current_lane.value = priority
+            scheduler.acquire(priority)
+
+        first = threading.Thread(target=call, args=(RequestPriority.BULK,))
+        first.start()
+        wait_until(lambda: scheduler._busy)
+
+        threads = []
+        for priority in priorities:
+            thread = threading.Thread(target=call, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            # Start the threads in order so lanes are filled first come, first served.
+            wait_until(lambda: _depth(scheduler) == len(threads))
+
+        rate_limiter.gate.set()
+        for thread in [first, *threads]:
+            thread.join(5)
+
+        return rate_limiter.lanes[1:]
+
+    def test_higher_priority_jumps_queue(self):
+        rate_limiter = _GatedRateLimiter()
+        scheduler = PriorityScheduler(
+            rate_limiter, search_min_share=0, bulk_min_share=0
+        )
+
+        lanes = self._run_threads(
+            scheduler,
+            rate_limiter,
+            [
+                RequestPriority.BULK,
+                RequestPriority.BULK,
+                RequestPriority.SEARCH,
+                RequestPriority.ORDER,
+            ],
+        )
+
+        assert lanes == [
+            RequestPriority.ORDER,
+            RequestPriority.SEARCH,
+            RequestPriority.BULK,
+            RequestPriority.BULK,
+        ]
+
+    def test_lower_priority_gets_minimum_share(self):
+        rate_limiter = _GatedRateLimiter()
+        scheduler = PriorityScheduler(
+            rate_limiter, search_min_share=0, bulk_min_share=0.25
+        )
+
+        lanes = self._run_threads(
+            scheduler,
+            rate_limiter,
+            [RequestPriority.BULK] * 2 + [RequestPriority.ORDER] * 10,
+        )
+
+        o, b = RequestPriority.ORDER, RequestPriority.BULK
+        assert lanes == [o, o, o, o, b, o, o, o, b, o, o, o]
+
+    def test_idle_lane_does_not_bank_share(self):
+        rate_limiter = _GatedRateLimiter()
+        scheduler = PriorityScheduler(
+            rate_limiter, search_min_share=0, bulk_min_share=0.5
+        )
+        rate_limiter.gate.set()
+        rate_limiter.current_lane.value = RequestPriority.BULK
+        for _ in range(4):
+            scheduler.acquire(RequestPriority.BULK)
+        rate_limiter.gate.clear()
+        rate_limiter.lanes.clear()
+
+        lanes = self._run_threads(
+            scheduler,
+            rate_limiter,
+            [RequestPriority.BULK, RequestPriority.ORDER, RequestPriority.ORDER],
+        )
+
+        assert lanes == [
+            RequestPriority.ORDER,
+            RequestPriority.ORDER,
+            RequestPriority.BULK,
+        ]
+
+    def test_stats(self, mocker):
+        monotonic_mock = mocker.patch("prosper_api.scheduler.monotonic")
+        monotonic_mock.side_effect = [10.0, 10.5, 20.0, 20.1]
+        scheduler = PriorityScheduler(mocker.MagicMock())
+
+        assert scheduler.acquire(RequestPriority.ORDER) == pytest.approx(0.5)
+        assert scheduler.acquire(RequestPriority.ORDER) == pytest.approx(0.1)
+
+        stats = scheduler.stats()
+        assert stats[RequestPriority.ORDER] == LaneStats(
+            depth=0, served=2, total_wait=pytest.approx(0.6), max_wait=0.5
+        )
+        assert stats[RequestPriority.ORDER].mean_wait == pytest.approx(0.3)
+        assert stats[RequestPriority.BULK] == LaneStats(
+            depth=0, served=0, total_wait=0.0, max_wait=0.0
+        )
+        assert stats[RequestPriority.BULK].mean_wait == 0
+
+    def test_releases_slot_when_rate_limiter_fails(self, mocker):
+        rate_limiter = mocker.MagicMock()
+        rate_limiter.acquire.side_effect = [KeyboardInterrupt(), 0]
+        scheduler = PriorityScheduler(rate_limiter)
+
+        with pytest.raises(KeyboardInterrupt):
+            scheduler.acquire(RequestPriority.ORDER)
+        scheduler.acquire(RequestPriority.BULK)
+
+        assert scheduler.stats()[RequestPriority.ORDER].served == 1
+        assert scheduler.stats()[RequestPriority.BULK].served == 1
+
+    def test_interrupted_waiter_leaves_queue(self, mocker):
+        rate_limiter = _GatedRateLimiter()
+        scheduler = PriorityScheduler(rate_limiter)
+
+        def call(*priorities):
+            for priority in priorities:
+                rate_limiter.current_lane.value = priority
+                scheduler.acquire(priority)
+
+        first = threading.Thread(target=call, args=(RequestPriority.BULK,))
+        first.start()
+        wait_until(lambda: scheduler._busy)
+
+        mocker.patch.object(
+            scheduler._condition, "wait_for", side_effect=KeyboardInterrupt()
+        )
+        with pytest.raises(KeyboardInterrupt):
+            scheduler.acquire(RequestPriority.ORDER)
+        mocker.stopall()
+        rate_limiter.gate.set()
+        first.join(5)
+
+        assert _depth(scheduler) == 0
+
+        thread = threading.Thread(target=call, args=tuple(RequestPriority))
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+        assert rate_limiter.lanes[1:] == list(RequestPriority)
+
+    def test_cancelled_async_waiter_leaves_queue(self):
+        rate_limiter = _GatedRateLimiter()
+        scheduler = PriorityScheduler(rate_limiter)
+
+        async def run():
+            rate_limiter.async_gate = asyncio.Event()
+            first = asyncio.create_task(
+                scheduler.acquire_async(RequestPriority.BULK), name="BULK"
+            )
+            waiter = asyncio.create_task(
+                scheduler.acquire_async(RequestPriority.ORDER), name="ORDER"
+            )
+            while scheduler.stats()[RequestPriority.ORDER].depth == 0:
+                await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            rate_limiter.async_gate.set()
+            await first
+
+            assert _depth(scheduler) == 0
+            for priority in RequestPriority:
+                await asyncio.wait_for(
+                    asyncio.create_task(
+                        scheduler.acquire_async(priority), name=priority.name
+                    ),
+                    5,
+                )
+
+        asyncio.run(run())
+
+        assert rate_limiter.lanes == [RequestPriority.BULK, *RequestPriority]
+
+    def test_acquire_async_orders_by_priority(self):
+        rate_limiter = _GatedRateLimiter()
+        scheduler = PriorityScheduler(
+            rate_limiter, search_min_share=0, bulk_min_share=0
+        )
+
+        async def run():
+            rate_limiter.async_gate = asyncio.Event()
+            tasks = [
+                asyncio.create_task(
+                    scheduler.acquire_async(priority), name=priority.name
+                )
+                for priority in [
+                    RequestPriority.BULK,
+                    RequestPriority.BULK,
+                    RequestPriority.SEARCH,
+                    RequestPriority.ORDER,
+                ]
+            ]
+            while scheduler.stats()[RequestPriority.ORDER].depth == 0:
+                await asyncio.sleep(0)
+            rate_limiter.async_gate.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+        assert rate_limiter.lanes == [
+            RequestPriority.BULK,
+            RequestPriority.ORDER,
+            RequestPriority.SEARCH,
+            RequestPriority.BULK,
+        ]
+
+    def test_from_config(self, mocker):
+        rate_limiter = mocker.MagicMock()
+
+        scheduler = PriorityScheduler.from_config(
+            rate_limiter,
+            Config(
+                config_dict={
+                    "prosper-api": {
+                        "scheduler": {"search-min-share": 0.3, "bulk-min-share": 0.05}
+                    }
+                },
+                schema=_schema(),
+            ),
+        )
+
+        assert scheduler.rate_limiter is rate_limiter
+        assert scheduler._lanes[RequestPriority.SEARCH].min_share == 0.3
+        assert scheduler._lanes[RequestPriority.BULK].min_share == 0.05
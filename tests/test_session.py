@@ -0,0 +1,87 @@
+import pytest
+from prosper_shared.omni_config import Config
+
+from prosper_api.session import PooledSession, _schema
+
+
+class TestPooledSession:
+    @pytest.fixture
+    def request_mock(self, mocker):
+        return mocker.patch("requests.Session.request")
+
+    @pytest.fixture
+    def monotonic_mock(self, mocker):
+        monotonic_mock = mocker.patch("prosper_api.session.monotonic")
+        monotonic_mock.return_value = 1000.0
+        return monotonic_mock
+
+    def test_from_config_defaults(self):
+        session = PooledSession.from_config(Config(config_dict={}))
+
+        adapter = session.get_adapter("https://api.prosper.com")
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 10
+        assert adapter._pool_block is False
+        assert session._connection_lifetime == 300
+        assert session.get_adapter("http://localhost") is adapter
+
+    def test_from_config(self):
+        session = PooledSession.from_config(
+            Config(
+                config_dict={
+                    "prosper-api": {
+                        "http": {
+                            "pool-connections": 2,
+                            "pool-maxsize": 20,
+                            "pool-block": True,
+                            "connection-lifetime": 60,
+                        }
+                    }
+                },
+                schema=_schema(),
+            )
+        )
+
+        adapter = session.get_adapter("https://api.prosper.com")
+        assert adapter._pool_connections == 2
+        assert adapter._pool_maxsize == 20
+        assert adapter._pool_block is True
+        assert session._connection_lifetime == 60
+
+    def test_request_reuses_pool_within_lifetime(self, request_mock, monotonic_mock):
+        session = PooledSession(connection_lifetime=60)
+        adapter = session.get_adapter("https://api.prosper.com")
+
+        monotonic_mock.return_value = 1059.0
+        response = session.request("GET", "https://api.prosper.com", params={})
+
+        assert response == request_mock.return_value
+        request_mock.assert_called_once_with(
+            "GET", "https://api.prosper.com", params={}
+        )
+        assert session.get_adapter("https://api.prosper.com") is adapter
+
+    def test_request_recycles_expired_pool(self, mocker, request_mock, monotonic_mock):
+        session = PooledSession(connection_lifetime=60)
+        adapter = session.get_adapter("https://api.prosper.com")
+        close_mock = mocker.patch.object(adapter, "close")
+
+        monotonic_mock.return_value = 1060.0
+        session.request("GET", "https://api.prosper.com")
+
+        close_mock.assert_called_once()
+        new_adapter = session.get_adapter("https://api.prosper.com")
+        assert new_adapter is not adapter
+        assert session.get_adapter("http://localhost") is new_adapter
+        assert session._pool_created_at == 1060.0
+
+    def test_request_never_recycles_without_lifetime(
+        self, mocker, request_mock, monotonic_mock
+    ):
+        session = PooledSession(connection_lifetime=0)
+        adapter = session.get_adapter("https://api.prosper.com")
+
+        monotonic_mock.return_value = 1000000.0
+        session.request("GET", "https://api.prosper.com")
+
+        assert session.get_adapter("https://api.prosper.com") is adapter
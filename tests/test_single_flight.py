@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+import pytest
+
+from prosper_api.single_flight import SingleFlight
+from tests.conftest import wait_until
+
+
+class TestSingleFlight:
+    def _run_concurrently(self, single_flight, fn, callers=5):
+        release = threading.Event()
+        calls = []
+        outcomes = []
+
+        def slow_fn():
+            calls.append(threading.current_thread())
+            release.wait(5)
+            return fn()
+
+        def caller():
+            try:
+                outcomes.append(single_flight.do("key", slow_fn))
+            except Exception as e:
+                outcomes.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: single_flight.coalesced == callers - 1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        return calls, outcomes
+
+    def test_concurrent_calls_share_one_call(self):
+        single_flight = SingleFlight()
+
+        calls, outcomes = self._run_concurrently(single_flight, lambda: "result")
+
+        assert len(calls) == 1
+        assert outcomes == ["result"] * 5
+
+    def test_concurrent_calls_share_error(self):
+        single_flight = SingleFlight()
+        error = ValueError("boom")
+
+        def fail():
+            raise error
+
+        calls, outcomes = self._run_concurrently(single_flight, fail)
+
+        assert len(calls) == 1
+        assert outcomes == [error] * 5
+
+    def test_sequential_calls_are_not_coalesced(self, mocker):
+        single_flight = SingleFlight()
+        fn = mocker.MagicMock(side_effect=["first", "second"])
+
+        assert single_flight.do("key", fn) == "first"
+        assert single_flight.do("key", fn) == "second"
+        assert single_flight.coalesced == 0
+
+    def test_different_keys_are_not_coalesced(self):
+        single_flight = SingleFlight()
+        barrier = threading.Barrier(2, timeout=5)
+        outcomes = []
+
+        def caller(key):
+            outcomes.append(single_flight.do(key, lambda: barrier.wait() >= 0))
+
+        threads = [threading.Thread(target=caller, args=(key,)) for key in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert outcomes == [True, True]
+
+    def test_do_async_shares_one_call(self, mocker):
+        single_flight = SingleFlight()
+        fn = mocker.AsyncMock(return_value="result")
+
+        async def run():
+            return await asyncio.gather(
+                *(single_flight.do_async("key", fn) for _ in range(5))
+            )
+
+        assert asyncio.run(run()) == ["result"] * 5
+        fn.assert_awaited_once()
+        assert single_flight.coalesced == 4
+        assert not single_flight._async_calls
+
+    def test_do_async_call_survives_cancelled_caller(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(None)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def run():
+            first = asyncio.ensure_future(single_flight.do_async("key", fn))
+            second = asyncio.ensure_future(single_flight.do_async("key", fn))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(run()) == "result"
+        assert len(calls) == 1
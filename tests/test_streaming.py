@@ -0,0 +1,153 @@
+import asyncio
+import json
+
+import pytest
+
+from prosper_api.models import (
+    Listing,
+    ListNotesResponse,
+    ListPaymentsResponse,
+    Loan,
+    Note,
+    Payment,
+    SearchListingsResponse,
+)
+from prosper_api.streaming import _ResultParser, stream_results, stream_results_async
+
+
+def _chunks(raw: bytes, size: int):
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+async def _async_chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestStreaming:
+    @pytest.mark.parametrize("size", [1, 7, 1000, 1000000])
+    @pytest.mark.parametrize(
+        ["response_type", "result_type", "response_name"],
+        [
+            (SearchListingsResponse, Listing, "search_listings_response"),
+            (ListNotesResponse, Note, "list_notes_response"),
+            (ListPaymentsResponse, Payment, "list_payments_response"),
+        ],
+    )
+    def test_stream_results(
+        self, response_json, response_type, result_type, response_name, size
+    ):
+        raw = response_json(response_name).encode()
+
+        results = list(stream_results(_chunks(raw, size), result_type))
+
+        assert results == response_type.model_validate_json(raw).result
+
+    def test_stream_results_in_order(self, response_json):
+        note = json.loads(response_json("list_notes_response"))["result"][0]
+        raw = json.dumps(
+            {
+                "total_count": 3,
+                "result_count": 3,
+                "result": [{**note, "loan_note_id": f"{i}-ünïcode"} for i in range(3)],
+            },
+            ensure_ascii=False,
+        ).encode()
+
+        results = stream_results(_chunks(raw, 3), Note)
+
+        assert [r.loan_note_id for r in results] == [
+            "0-ünïcode",
+            "1-ünïcode",
+            "2-ünïcode",
+        ]
+
+    def test_stream_results_yields_before_the_body_ends(self, response_json):
+        raw = response_json("list_notes_response").encode()
+        chunks = iter([raw])
+
+        results = stream_results(chunks, Note)
+
+        assert next(results).loan_note_id
+        assert next(chunks, None) is None
+
+    def test_stream_results_with_fields(self, response_json):
+        raw = response_json("list_notes_response").encode()
+
+        results = list(stream_results(_chunks(raw, 10), Note, ["loan_note_id"]))
+
+        assert [r.model_dump() for r in results] == [
+            {"loan_note_id": n.loan_note_id}
+            for n in ListNotesResponse.model_validate_json(raw).result
+        ]
+
+    @pytest.mark.parametrize(
+        "raw",
+        [b'{"result": [], "result_count": 0}', b' { "result" : [ ] } ', b"{}"],
+    )
+    def test_stream_results_when_empty(self, raw):
+        assert list(stream_results(_chunks(raw, 2), Loan)) == []
+
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            b"",
+            b'{"result": [',
+            b'{"result": [{"loan_number": 1',
+            b'{"result": [], "total_count": 1',
+            b'{"result": [] "total_count": 1}',
+            b'{"result": {}}',
+            b"{1: []}",
+            b"[]",
+            b'{"result": []} {}',
+        ],
+    )
+    def test_stream_results_when_invalid(self, raw):
+        with pytest.raises(json.JSONDecodeError):
+            list(stream_results(_chunks(raw, 4), Loan))
+
+    @pytest.mark.parametrize("size", range(1, 12))
+    def test_result_boundaries_in_strings(self, size):
+        results = [
+            {"a": 'x{"[', "b": ["]}", "\\", '\\"}'], "c": {"d": "é\u00e9"}},
+            {"e": [1.5, -2e3, True, None, [], {}], "f": "\\\\"},
+            {'"g{': "]", "h": '\\"]'},
+        ]
+        raw = json.dumps(
+            {"total_count": 3, "a{": '"}]', "result": results, "b": ["]"]}
+        ).encode()
+        parser = _ResultParser()
+
+        texts = [text for chunk in _chunks(raw, size) for text in parser.feed(chunk)]
+        parser.close()
+
+        assert [json.loads(text) for text in texts] == results
+
+    def test_large_result_is_scanned_once(self):
+        raw = json.dumps({"result": [{"a": "x" * 100000, "b": [1, 2]}]}).encode()
+        parser = _ResultParser()
+        chunks = _chunks(raw, 1000)
+
+        for chunk in chunks[:-1]:
+            assert parser.feed(chunk) == []
+            # Everything received of the open result has been scanned, so the next
+            # chunk's scan starts where this one ended.
+            assert parser._pos + parser._scanned == len(parser._buffer)
+
+        assert len(parser.feed(chunks[-1])) == 1
+
+    def test_stream_results_async(self, response_json):
+        raw = response_json("search_listings_response").encode()
+
+        async def run():
+            return [
+                listing
+                async for listing in stream_results_async(
+                    _async_chunks(_chunks(raw, 100)), Listing, ["listing_number"]
+                )
+            ]
+
+        assert [r.listing_number for r in asyncio.run(run())] == [
+            r.listing_number
+            for r in SearchListingsResponse.model_validate_json(raw).result
+        ]
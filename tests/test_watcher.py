@@ -0,0 +1,190 @@
+import asyncio
+import threading
+from decimal import Decimal
+
+import pytest
+from prosper_shared.omni_config import Config
+
+from prosper_api.models import SearchListingsRequest, SearchListingsResponse
+from prosper_api.models.enums import SearchListingsSortBy, SortOrder
+from prosper_api.watcher import AsyncListingWatcher, ListingWatcher, _schema
+
+
+class TestListingWatcher:
+    @pytest.fixture
+    def listing(self, response_json):
+        return SearchListingsResponse.model_validate_json(
+            response_json("search_listings_response")
+        ).result[0]
+
+    @pytest.fixture
+    def make_listing(self, listing):
+        def make(listing_number, start, **update):
+            return listing.model_copy(
+                update={
+                    "listing_number": listing_number,
+                    "listing_start_date": f"2023-08-28 {start} +0000",
+                    **update,
+                }
+            )
+
+        return make
+
+    @pytest.fixture
+    def client(self, mocker):
+        client = mocker.MagicMock()
+        client._config = Config(config_dict={})
+        client.polls = []
+        client.requests = []
+
+        def iter_listings(request):
+            client.requests.append(request)
+            return iter(client.polls.pop(0))
+
+        client.iter_listings.side_effect = iter_listings
+        return client
+
+    def test_first_poll_returns_all_listings(self, client, make_listing):
+        listings = [make_listing(2, "22:00:02"), make_listing(1, "22:00:01")]
+        client.polls = [listings]
+
+        results = ListingWatcher(client, SearchListingsRequest(invested=False)).poll()
+
+        assert results == listings
+        request = client.requests[0]
+        assert request.sort_by == SearchListingsSortBy.LISTING_START_DATE
+        assert request.sort_dir == SortOrder.DESCENDING
+        assert request.invested is False
+        assert request.listing_start_date_min is None
+
+    def test_later_polls_only_return_new_or_changed_listings(
+        self, client, make_listing
+    ):
+        first = make_listing(1, "22:00:01")
+        second = make_listing(2, "22:00:02")
+        changed_first = make_listing(1, "22:00:01", amount_remaining=Decimal("10"))
+        client.polls = [[first], [second, first], [second, changed_first]]
+        watcher = ListingWatcher(client)
+
+        assert watcher.poll() == [first]
+        assert watcher.poll() == [second]
+        assert watcher.poll() == [changed_first]
+
+    def test_later_polls_stop_reading_before_window(self, client, make_listing):
+        newest = make_listing(3, "22:10:00")
+        in_window = make_listing(2, "22:05:00")
+        before_window = make_listing(1, "22:04:59")
+        client.polls = [[newest], [in_window, before_window]]
+        watcher = ListingWatcher(client, lookback=300)
+        watcher.poll()
+
+        assert watcher.poll() == [in_window]
+        assert client.requests[1].listing_start_date_min == "2023-08-28"
+        assert 1 not in watcher._seen
+
+    def test_seen_listings_are_bounded(self, client, make_listing):
+        listings = [make_listing(n, f"22:00:0{n}") for n in range(3, 0, -1)]
+        client.polls = [listings, [listings[2]]]
+        watcher = ListingWatcher(client, max_seen=2)
+
+        watcher.poll()
+
+        assert list(watcher._seen) == [2, 1]
+        assert watcher.poll() == []
+
+    def test_watch_polls_on_cadence_until_stopped(self, mocker, client, make_listing):
+        wait_mock = mocker.patch.object(threading.Event, "wait")
+        mocker.patch("prosper_api.watcher.monotonic", side_effect=[10.0, 10.25])
+        first = make_listing(1, "22:00:01")
+        client.polls = [[first]]
+        watcher = ListingWatcher(client, poll_interval=1.0)
+
+        results = []
+        watcher.run(lambda listing: (results.append(listing), watcher.stop()))
+
+        assert results == [first]
+        wait_mock.assert_called_once_with(0.75)
+
+    def test_watch_yields_listings_as_they_are_read(self, client, make_listing):
+        read = []
+        listings = [make_listing(2, "22:00:02"), make_listing(1, "22:00:01")]
+
+        def pages():
+            for listing in listings:
+                read.append(listing)
+                yield listing
+
+        client.iter_listings.side_effect = lambda request: pages()
+        watcher = ListingWatcher(client)
+
+        assert next(watcher.watch()) == listings[0]
+        assert read == listings[:1]
+
+    def test_from_config(self, client):
+        client._config = Config(
+            config_dict={
+                "prosper-api": {
+                    "watcher": {"poll-interval": 0.5, "lookback": 60, "max-seen": 5}
+                }
+            },
+            schema=_schema(),
+        )
+
+        watcher = ListingWatcher.from_config(client)
+
+        assert watcher.client is client
+        assert watcher.poll_interval == 0.5
+        assert watcher.lookback.total_seconds() == 60
+        assert watcher.max_seen == 5
+        assert watcher.request == SearchListingsRequest()
+
+    def test_async_watcher(self, mocker, client, make_listing):
+        first = make_listing(1, "22:00:01")
+        second = make_listing(2, "22:00:02")
+        before_window = make_listing(0, "21:00:00")
+        client.polls = [[first], [second, first, before_window]]
+
+        async def iter_listings(request):
+            for listing in client.iter_listings(request):
+                yield listing
+
+        async_client = mocker.MagicMock()
+        async_client._config = Config(
+            config_dict={"prosper-api": {"watcher": {"poll-interval": 0.01}}}
+        )
+        async_client.iter_listings = iter_listings
+        watcher = AsyncListingWatcher.from_config(async_client)
+        watcher.stop()
+
+        async def collect():
+            results = []
+            async for listing in watcher.watch():
+                results.append(listing)
+                if len(results) == 2:
+                    watcher.stop()
+            return results
+
+        assert asyncio.run(collect()) == [first, second]
+        assert watcher.poll_interval == 0.01
+
+    def test_async_watch_yields_listings_as_they_are_read(
+        self, mocker, client, make_listing
+    ):
+        read = []
+        listings = [make_listing(2, "22:00:02"), make_listing(1, "22:00:01")]
+
+        async def iter_listings(request):
+            for listing in listings:
+                read.append(listing)
+                yield listing
+
+        async_client = mocker.MagicMock()
+        async_client.iter_listings = iter_listings
+        watcher = AsyncListingWatcher(async_client)
+
+        async def first():
+            listing = await watcher.watch().__anext__()
+            return listing, list(read)
+
+        assert asyncio.run(first()) == (listings[0], listings[:1])
+        assert asyncio.run(AsyncListingWatcher(async_client).poll()) == listings